@@ -0,0 +1,51 @@
+"""
+Gunicorn configuration for production deployment
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With a Postgres DATABASE_URL workers default to gevent: the standard library is monkey-patched
+so sockets, sleeps and locks yield to other requests, and psycopg2 is made
+cooperative with psycogreen. One worker then keeps many requests in flight
+while they wait on Google, Postgres or an SSE poll, instead of blocking a
+process or thread per request. The number of concurrent database queries is
+still bounded by the connection pool (DB_POOL_SIZE + DB_MAX_OVERFLOW per
+worker); requests beyond it wait in the pool (see /api/metrics/db-pool).
+
+SQLite calls do not yield, so a writer waiting on SQLite's busy timeout would
+stall its whole gevent worker; with any other database workers default to
+gthread. GUNICORN_WORKER_CLASS overrides the choice.
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+# The worker class depends on DATABASE_URL, which may come from .env
+load_dotenv()
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv(
+    'GUNICORN_WORKER_CLASS', 'gevent' if os.getenv('DATABASE_URL', '').startswith('postgres') else 'gthread'
+)
+# Concurrent requests per gevent worker
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+# Threads per worker for the gthread worker class (gunicorn turns sync workers
+# with more than one thread into gthread workers, so others get exactly one)
+threads = int(os.getenv('GUNICORN_THREADS', 8)) if worker_class == 'gthread' else 1
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+
+
+def post_fork(server, worker):
+    """Make psycopg2 wait for the database through the gevent hub"""
+    if worker_class != 'gevent':
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        server.log.warning('psycogreen or psycopg2 is not installed; Postgres queries will block gevent workers')
+        return
+    patch_psycopg()
@@ -8,14 +8,32 @@ load_dotenv()
 # DON\'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from src.models.user import db
+from src.models.routing import replica_binds, init_read_replicas
+from src.utils.json_provider import FastJSONProvider
+from src.utils.db_engine import init_sqlite_profile, pool_options_from_env
+from src.utils.static_assets import StaticManifest
+from src.utils.compression import init_compression
+from src.utils.jobs import init_jobs
+from src.utils.profiling import init_request_profiling
+from src.utils.slow_queries import init_slow_query_log
+from src.utils.analytics import init_analytics
+from src.utils.catalog import init_catalog
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.internships import internships_bp
+from src.routes.batch import batch_bp
+from src.routes.metrics import metrics_bp
+from src.routes.files import files_bp
+from src.routes.jobs import jobs_bp
+from src.routes.analytics import analytics_bp
+from src.utils.tracking_partitions import init_tracking_partitions
+from src.utils.migrations import upgrade_schema
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+app.json = FastJSONProvider(app)
 
 # Load configuration from environment variables
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
@@ -24,6 +42,8 @@ app.config['SUPABASE_ANON_KEY'] = os.getenv('SUPABASE_ANON_KEY')
 app.config['SUPABASE_SERVICE_ROLE_KEY'] = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 app.config['GOOGLE_CLIENT_ID'] = os.getenv('GOOGLE_CLIENT_ID')
 app.config['GOOGLE_CLIENT_SECRET'] = os.getenv('GOOGLE_CLIENT_SECRET')
+app.config['GOOGLE_TOKENINFO_URL'] = os.getenv('GOOGLE_TOKENINFO_URL', 'https://oauth2.googleapis.com/tokeninfo')
+app.config['GOOGLE_HTTP_TIMEOUT'] = float(os.getenv('GOOGLE_HTTP_TIMEOUT', 5))
 
 # للحصول على عنوان URL للواجهة الأمامية من متغيرات البيئة
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://auto-intern-ai.vercel.app') # استخدم الرابط الجديد
@@ -31,9 +51,10 @@ FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://auto-intern-ai.vercel.app') #
 # للسماح بالطلبات من الواجهة الأمامية قم بتكوين CORS
 CORS(app, resources={
     r"/*": {
-        "origins": ["https://auto-intern-ai-5poo.vercel.app/", "http://localhost:3000", "http://127.0.0.1:3000"],
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"]
+        "origins": ["https://auto-intern-ai-5poo.vercel.app", "http://localhost:3000", "http://127.0.0.1:3000"],
+        "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+        "allow_headers": ["Content-Type", "Authorization", "If-Match", "X-Primary-Until"],
+        "expose_headers": ["ETag", "X-Primary-Until"]
     }
 } )
 
@@ -42,77 +63,181 @@ CORS(app, resources={
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(internships_bp, url_prefix='/api')
+app.register_blueprint(batch_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp, url_prefix='/api')
+app.register_blueprint(files_bp, url_prefix='/api')
+app.register_blueprint(jobs_bp, url_prefix='/api')
+app.register_blueprint(analytics_bp, url_prefix='/api')
 
 # Database configuration
 app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Postgres pool sizing, pre-ping, recycle and statement timeout (DB_POOL_* / DB_STATEMENT_TIMEOUT_MS)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = pool_options_from_env(app.config["SQLALCHEMY_DATABASE_URI"])
+
+# Optional read replicas (comma-separated URLs) for read-only endpoints
+replica_urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+app.config['SQLALCHEMY_BINDS'] = replica_binds(replica_urls)
+app.config['REPLICA_STICKY_SECONDS'] = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
 db.init_app(app)
+init_read_replicas(app)
+
+# SQLite engine profile (applies only when DATABASE_URL is a SQLite file)
+for key in ('SQLITE_BUSY_TIMEOUT_MS', 'SQLITE_MMAP_SIZE', 'SQLITE_CACHE_SIZE_KB',
+            'SQLITE_CHECKPOINT_INTERVAL', 'SQLITE_OPTIMIZE_INTERVAL'):
+    if os.getenv(key):
+        app.config[key] = int(os.getenv(key))
+if os.getenv('SQLITE_SYNCHRONOUS'):
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS')
+init_sqlite_profile(app)
+
+# Application tracking partitioning and rollup settings
+app.config['TRACKING_PARTITIONS_AHEAD'] = int(os.getenv('TRACKING_PARTITIONS_AHEAD', 3))
+app.config['TRACKING_HOT_MONTHS'] = int(os.getenv('TRACKING_HOT_MONTHS', 2))
+app.config['TRACKING_ROLLUP_AFTER_MONTHS'] = int(os.getenv('TRACKING_ROLLUP_AFTER_MONTHS', 12))
+
+# Users allowed to read operational metrics
+app.config['ADMIN_EMAILS'] = [email.strip() for email in os.getenv('ADMIN_EMAILS', '').split(',') if email.strip()]
+
+# Response compression (gzip always, brotli/zstd when installed)
+app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', 6))
+app.config['COMPRESS_BR_LEVEL'] = int(os.getenv('COMPRESS_BR_LEVEL', 4))
+app.config['COMPRESS_ZSTD_LEVEL'] = int(os.getenv('COMPRESS_ZSTD_LEVEL', 3))
+app.config['COMPRESS_STREAMING'] = os.getenv('COMPRESS_STREAMING', 'true').lower() == 'true'
+init_compression(app)
+
+# Server-Timing header (auth/sql/orm/json/total) on every response; admins can
+# profile single requests with X-Profile: 1 (stored in PROFILE_DIR) or X-Profile: text
+app.config['SERVER_TIMING'] = os.getenv('SERVER_TIMING', 'false').lower() == 'true'
+app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR', os.path.join(os.path.dirname(__file__), 'profiles'))
+init_request_profiling(app)
+
+# Slow-query log: statements over SLOW_QUERY_MS (negative disables) with their plans, as JSON lines
+app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', 250))
+app.config['SLOW_QUERY_LOG'] = os.getenv('SLOW_QUERY_LOG', os.path.join(os.path.dirname(__file__), 'logs', 'slow_queries.log'))
+app.config['SLOW_QUERY_LOG_MAX_BYTES'] = int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024))
+app.config['SLOW_QUERY_LOG_BACKUPS'] = int(os.getenv('SLOW_QUERY_LOG_BACKUPS', 5))
+app.config['SLOW_QUERY_EXPLAIN_INTERVAL'] = int(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 60))
+init_slow_query_log(app)
+
+# Delta sync: changes this recent (seconds) are sent again by the next sync, in case
+# a transaction that set updated_at earlier had not committed yet
+app.config['SYNC_OVERLAP_SECONDS'] = int(os.getenv('SYNC_OVERLAP_SECONDS', 30))
+
+# Server-Sent Events: database poll interval and maximum stream length (seconds)
+app.config['SSE_POLL_INTERVAL'] = int(os.getenv('SSE_POLL_INTERVAL', 5))
+app.config['SSE_MAX_DURATION'] = int(os.getenv('SSE_MAX_DURATION', 300))
 
-# Create tables and add sample data
+# Background jobs (run scripts/run_worker.py, or JOBS_EAGER=true to run them inline)
+app.config['JOBS_EAGER'] = os.getenv('JOBS_EAGER', 'false').lower() == 'true'
+app.config['JOBS_MAX_ATTEMPTS'] = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+app.config['JOBS_RETRY_BASE_SECONDS'] = int(os.getenv('JOBS_RETRY_BASE_SECONDS', 10))
+app.config['JOBS_LOCK_TIMEOUT'] = int(os.getenv('JOBS_LOCK_TIMEOUT', 300))
+app.config['JOBS_POLL_INTERVAL'] = float(os.getenv('JOBS_POLL_INTERVAL', 1))
+init_jobs(app)
+
+# Batch auto-apply: larger batches are queued as a job; letters render on N processes (0 = inline)
+app.config['AUTO_APPLY_SYNC_LIMIT'] = int(os.getenv('AUTO_APPLY_SYNC_LIMIT', 25))
+app.config['AUTO_APPLY_MAX_INTERNSHIPS'] = int(os.getenv('AUTO_APPLY_MAX_INTERNSHIPS', 500))
+app.config['AUTO_APPLY_RENDER_PROCESSES'] = int(os.getenv('AUTO_APPLY_RENDER_PROCESSES', 0))
+
+# Funnel analytics: per-worker snapshot refreshed incrementally every ANALYTICS_REFRESH_SECONDS,
+# rebuilt every ANALYTICS_FULL_REFRESH_SECONDS; smaller groups than ANALYTICS_MIN_GROUP_SIZE are hidden
+app.config['ANALYTICS_REFRESH_SECONDS'] = int(os.getenv('ANALYTICS_REFRESH_SECONDS', 60))
+app.config['ANALYTICS_FULL_REFRESH_SECONDS'] = int(os.getenv('ANALYTICS_FULL_REFRESH_SECONDS', 3600))
+app.config['ANALYTICS_MIN_GROUP_SIZE'] = int(os.getenv('ANALYTICS_MIN_GROUP_SIZE', 5))
+app.config['ANALYTICS_BATCH_SIZE'] = int(os.getenv('ANALYTICS_BATCH_SIZE', 50000))
+init_analytics(app)
+
+# Shared-memory internship catalog written by scripts/build_catalog.py and mapped by every
+# worker; snapshots older than CATALOG_MAX_AGE_SECONDS are ignored
+app.config['CATALOG_PATH'] = os.getenv('CATALOG_PATH', os.path.join(os.path.dirname(__file__), 'catalog', 'internships.bin'))
+app.config['CATALOG_CHECK_INTERVAL'] = float(os.getenv('CATALOG_CHECK_INTERVAL', 1))
+app.config['CATALOG_MAX_AGE_SECONDS'] = int(os.getenv('CATALOG_MAX_AGE_SECONDS', 900))
+init_catalog(app)
+
+# Resume and avatar uploads (stored once per content hash under UPLOAD_FOLDER)
+app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', os.path.join(os.path.dirname(__file__), 'uploads'))
+app.config['UPLOAD_MAX_RESUME_BYTES'] = int(os.getenv('UPLOAD_MAX_RESUME_BYTES', 10 * 1024 * 1024))
+app.config['UPLOAD_MAX_AVATAR_BYTES'] = int(os.getenv('UPLOAD_MAX_AVATAR_BYTES', 2 * 1024 * 1024))
+# Let the front proxy send file bodies (X-Sendfile) instead of the worker
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+
+# Schema migrations (migrations/versions): upgrade to the latest revision at start
+# unless deployments run `alembic upgrade head` themselves (DB_AUTO_MIGRATE=false).
+# DDL waits at most MIGRATION_LOCK_TIMEOUT_MS for a table lock and is retried.
+app.config['DB_AUTO_MIGRATE'] = os.getenv('DB_AUTO_MIGRATE', 'true').lower() == 'true'
+app.config['MIGRATION_LOCK_TIMEOUT_MS'] = int(os.getenv('MIGRATION_LOCK_TIMEOUT_MS', 5000))
+app.config['MIGRATION_RETRIES'] = int(os.getenv('MIGRATION_RETRIES', 5))
+
+# Migrate and add sample data (the alembic command line imports the app without both)
 with app.app_context():
-    db.create_all()
+    if app.config['DB_AUTO_MIGRATE']:
+        upgrade_schema()
+        init_tracking_partitions(db.engine)
     
-    # Add sample internships if none exist
-    from src.models.user import Internship
-    if Internship.query.count() == 0:
-        sample_internships = [
-            Internship(
-                title="Software Engineering Intern",
-                company="Google",
-                location="Mountain View, CA",
-                description="Join our team to work on cutting-edge technology and build products used by billions of people worldwide.",
-                url="https://careers.google.com/jobs/results/123456789/"
-             ),
-            Internship(
-                title="Data Science Intern",
-                company="Microsoft",
-                location="Seattle, WA",
-                description="Work with our data science team to analyze large datasets and build machine learning models.",
-                url="https://careers.microsoft.com/us/en/job/123456"
-             ),
-            Internship(
-                title="Product Management Intern",
-                company="Apple",
-                location="Cupertino, CA",
-                description="Help shape the future of Apple products by working closely with engineering and design teams.",
-                url="https://jobs.apple.com/en-us/details/123456789"
-             ),
-            Internship(
-                title="Frontend Developer Intern",
-                company="Meta",
-                location="Menlo Park, CA",
-                description="Build user interfaces for Facebook, Instagram, and other Meta products using React and modern web technologies.",
-                url="https://www.metacareers.com/jobs/123456789/"
-             ),
-            Internship(
-                title="Machine Learning Intern",
-                company="OpenAI",
-                location="San Francisco, CA",
-                description="Research and develop advanced AI systems that benefit humanity.",
-                url="https://openai.com/careers/123456"
-             )
-        ]
+        # Add sample internships if none exist
+        from src.models.user import Internship
+        if Internship.query.count() == 0:
+            sample_internships = [
+                Internship(
+                    title="Software Engineering Intern",
+                    company="Google",
+                    location="Mountain View, CA",
+                    description="Join our team to work on cutting-edge technology and build products used by billions of people worldwide.",
+                    url="https://careers.google.com/jobs/results/123456789/"
+                 ),
+                Internship(
+                    title="Data Science Intern",
+                    company="Microsoft",
+                    location="Seattle, WA",
+                    description="Work with our data science team to analyze large datasets and build machine learning models.",
+                    url="https://careers.microsoft.com/us/en/job/123456"
+                 ),
+                Internship(
+                    title="Product Management Intern",
+                    company="Apple",
+                    location="Cupertino, CA",
+                    description="Help shape the future of Apple products by working closely with engineering and design teams.",
+                    url="https://jobs.apple.com/en-us/details/123456789"
+                 ),
+                Internship(
+                    title="Frontend Developer Intern",
+                    company="Meta",
+                    location="Menlo Park, CA",
+                    description="Build user interfaces for Facebook, Instagram, and other Meta products using React and modern web technologies.",
+                    url="https://www.metacareers.com/jobs/123456789/"
+                 ),
+                Internship(
+                    title="Machine Learning Intern",
+                    company="OpenAI",
+                    location="San Francisco, CA",
+                    description="Research and develop advanced AI systems that benefit humanity.",
+                    url="https://openai.com/careers/123456"
+                 )
+            ]
         
-        for internship in sample_internships:
-            db.session.add(internship)
+            for internship in sample_internships:
+                db.session.add(internship)
         
-        db.session.commit()
+            db.session.commit()
+
+# Static folder manifest, built once so requests never touch the filesystem index
+static_manifest = StaticManifest(app.static_folder)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    if app.static_folder is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    # Pick up frontend rebuilds during development
+    if app.debug:
+        static_manifest.reload()
+
+    return static_manifest.serve(path)
 
 
 if __name__ == '__main__':
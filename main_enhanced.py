@@ -8,14 +8,19 @@ load_dotenv()
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from src.models.user import db
+from src.utils.json_provider import FastJSONProvider
+from src.utils.db_engine import init_sqlite_profile
+from src.utils.static_assets import StaticManifest
+from src.utils.migrations import upgrade_schema
 from src.routes.user import user_bp
 from src.routes.auth_enhanced import auth_bp
 from src.routes.internships_enhanced import internships_bp
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+app.json = FastJSONProvider(app)
 
 # Load configuration from environment variables
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
@@ -37,10 +42,11 @@ app.register_blueprint(internships_bp, url_prefix='/api')
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
+init_sqlite_profile(app)
 
-# Create tables and add sample data
+# Migrate and add sample data
 with app.app_context():
-    db.create_all()
+    upgrade_schema()
     
     # Add sample internships if none exist
     from src.models.user import Internship
@@ -88,21 +94,20 @@ with app.app_context():
         
         db.session.commit()
 
+# Static folder manifest, built once so requests never touch the filesystem index
+static_manifest = StaticManifest(app.static_folder)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    if app.static_folder is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    # Pick up frontend rebuilds during development
+    if app.debug:
+        static_manifest.reload()
+
+    return static_manifest.serve(path)
 
 
 if __name__ == '__main__':
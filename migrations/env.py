@@ -0,0 +1,67 @@
+"""
+Alembic environment
+
+The app runs migrations through src.utils.migrations.upgrade_schema on a
+connection that already holds the migration lock. From the command line
+(`alembic upgrade head`) the app is imported without migrating at start and
+the same lock and session settings are taken here.
+"""
+import os
+
+from alembic import context
+
+from src.models.user import db
+from src.utils.tracking_partitions import PARTITION_PATTERN, TRACKING_TABLE
+
+config = context.config
+target_metadata = db.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Leave tracking partitions and shards (managed by tracking_partitions) out of autogenerate"""
+    if type_ == 'table' and (PARTITION_PATTERN.match(name) or name == f'{TRACKING_TABLE}_default'):
+        return False
+    return True
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        compare_type=True,
+        # SQLite alters tables by copying them
+        render_as_batch=connection.dialect.name == 'sqlite',
+        transaction_per_migration=True
+    )
+    context.run_migrations()
+
+
+def run_migrations_offline():
+    context.configure(
+        url=os.getenv('DATABASE_URL'),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        transaction_per_migration=True
+    )
+    context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    os.environ['DB_AUTO_MIGRATE'] = 'false'
+    from main import app
+    from src.utils.migrations import migration_connection
+
+    with app.app_context(), migration_connection(db.engine) as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,119 @@
+"""baseline schema
+
+The schema as db.create_all() built it before migrations: users,
+user_profiles, internships, applications (cover letters and notes inline)
+and application_tracking. Every table is created only if missing, so
+databases created by create_all() or scripts/setup_database.py are adopted
+as they are; the following revisions bring them up to the current models.
+A fresh Postgres database gets application_tracking range-partitioned
+(tracking_partitions); an existing plain table is kept.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 05:20:30.178965
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from src.utils.tracking_partitions import TRACKING_TABLE, create_partitioned_table
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=True),
+        sa.Column('google_id', sa.String(length=255), nullable=True),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'user_profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=True),
+        sa.Column('last_name', sa.String(length=100), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('linkedin_url', sa.String(length=500), nullable=True),
+        sa.Column('github_url', sa.String(length=500), nullable=True),
+        sa.Column('portfolio_url', sa.String(length=500), nullable=True),
+        sa.Column('skills', sa.Text(), nullable=True),
+        sa.Column('education', sa.Text(), nullable=True),
+        sa.Column('experience', sa.Text(), nullable=True),
+        sa.Column('bio', sa.Text(), nullable=True),
+        sa.Column('avatar_url', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'internships',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('company', sa.String(length=255), nullable=False),
+        sa.Column('location', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('url', sa.String(length=500), nullable=True),
+        sa.Column('requirements', sa.Text(), nullable=True),
+        sa.Column('salary_range', sa.String(length=100), nullable=True),
+        sa.Column('duration', sa.String(length=100), nullable=True),
+        sa.Column('application_deadline', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'applications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('internship_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('applied_date', sa.DateTime(), nullable=True),
+        sa.Column('cover_letter', sa.Text(), nullable=True),
+        sa.Column('resume_url', sa.String(length=500), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('interview_date', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['internship_id'], ['internships.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Range-partitioned by month; tracking_partitions adds the partitions
+        if context.is_offline_mode() or not sa.inspect(op.get_bind()).has_table(TRACKING_TABLE):
+            create_partitioned_table(op.get_bind())
+    else:
+        op.create_table(
+            TRACKING_TABLE,
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('application_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=False),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('changed_by', sa.Integer(), nullable=True),
+            sa.Column('changed_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['application_id'], ['applications.id']),
+            sa.ForeignKeyConstraint(['changed_by'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    for table in (TRACKING_TABLE, 'applications', 'internships', 'user_profiles', 'users'):
+        op.drop_table(table, if_exists=True)
@@ -0,0 +1,38 @@
+"""indexes for the listing, apply and login queries
+
+Built online so applications and internships stay writable while they build:
+
+    idx_internships_created           GET /internships orders by created_at
+    idx_applications_user_internship  the already-applied check of apply and auto-apply
+    idx_applications_user_applied     GET /applications orders a user's rows by applied_date
+    idx_applications_internship_id    deleting an internship finds its applications
+    idx_users_google_id               Google login looks users up by google_id
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 05:41:12.512304
+"""
+from src.utils.migrations import create_index_online, drop_index_online
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('idx_internships_created', 'internships', ['created_at']),
+    ('idx_applications_user_internship', 'applications', ['user_id', 'internship_id']),
+    ('idx_applications_user_applied', 'applications', ['user_id', 'applied_date']),
+    ('idx_applications_internship_id', 'applications', ['internship_id']),
+    ('idx_users_google_id', 'users', ['google_id']),
+)
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        drop_index_online(name, table)
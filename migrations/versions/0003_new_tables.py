@@ -0,0 +1,146 @@
+"""tables and indexes added since the baseline
+
+crawl_sources (feed crawler), text_blobs (deduplicated cover letters and
+notes), application_tracking_daily (tracking rollups), tombstones (delta
+sync), uploaded_files and jobs, plus the delta-sync and tracking timeline
+indexes on the existing tables, built online. Tables that db.create_all()
+already made in earlier releases are kept.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 06:02:41.530114
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from src.utils.migrations import create_index_online, drop_index_online
+from src.utils.tracking_partitions import TRACKING_TABLE, is_partitioned
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+ONLINE_INDEXES = (
+    ('idx_internships_updated', 'internships', ['updated_at', 'id']),
+    ('idx_applications_user_updated', 'applications', ['user_id', 'updated_at', 'id']),
+)
+TRACKING_INDEX = ('idx_application_tracking_application_changed', TRACKING_TABLE, ['application_id', 'changed_at'])
+
+
+def tracking_is_partitioned():
+    """Whether application_tracking is a partitioned table, which got its index with the table"""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return False
+    if context.is_offline_mode():
+        return True
+    return is_partitioned(bind)
+
+
+def upgrade():
+    op.create_table(
+        'crawl_sources',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('url', sa.String(length=500), nullable=False),
+        sa.Column('enabled', sa.Boolean(), nullable=False),
+        sa.Column('etag', sa.String(length=255), nullable=True),
+        sa.Column('last_modified', sa.String(length=100), nullable=True),
+        sa.Column('cursor', sa.String(length=500), nullable=True),
+        sa.Column('last_crawled_at', sa.DateTime(), nullable=True),
+        sa.Column('last_status', sa.Integer(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('items_ingested', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('url'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'text_blobs',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('hash'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'application_tracking_daily',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('application_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('first_changed_at', sa.DateTime(), nullable=True),
+        sa.Column('last_changed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'application_id', 'status', name='uq_application_tracking_daily'),
+        if_not_exists=True
+    )
+    op.create_index('idx_application_tracking_daily_day', 'application_tracking_daily', ['day'], if_not_exists=True)
+
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('idx_tombstones_entity_user', 'tombstones', ['entity', 'user_id', 'id'], if_not_exists=True)
+
+    op.create_table(
+        'uploaded_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('idx_uploaded_files_user_kind', 'uploaded_files', ['user_id', 'kind'], if_not_exists=True)
+    op.create_index('idx_uploaded_files_sha256', 'uploaded_files', ['sha256'], if_not_exists=True)
+
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_by', sa.String(length=64), nullable=True),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('idx_jobs_status_run_at', 'jobs', ['status', 'run_at'], if_not_exists=True)
+
+    for name, table, columns in ONLINE_INDEXES:
+        create_index_online(name, table, columns)
+    if not tracking_is_partitioned():
+        create_index_online(*TRACKING_INDEX)
+
+
+def downgrade():
+    if not tracking_is_partitioned():
+        drop_index_online(*TRACKING_INDEX[:2])
+    for name, table, _ in reversed(ONLINE_INDEXES):
+        drop_index_online(name, table)
+    for table in ('jobs', 'uploaded_files', 'tombstones', 'application_tracking_daily', 'text_blobs', 'crawl_sources'):
+        op.drop_table(table, if_exists=True)
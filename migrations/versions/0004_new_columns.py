@@ -0,0 +1,60 @@
+"""columns added since the baseline, nullable first
+
+    internships.source_id, external_id   feed crawler upserts, unique per source
+    user_profiles.version                 optimistic concurrency (If-Match)
+    applications.version
+    applications.cover_letter_hash       references into text_blobs
+    applications.notes_hash
+
+All are added nullable and without a default, so only the catalog changes;
+0005 fills them and 0006 makes version NOT NULL. On Postgres version gets
+its default now so rows the previous release inserts meanwhile get one.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 06:04:17.092385
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.utils.migrations import (
+    add_column_online, add_unique_constraint_online, create_index_online, drop_index_online
+)
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('user_profiles', 'applications')
+TEXT_FIELDS = ('cover_letter', 'notes')
+
+
+def upgrade():
+    add_column_online('internships', sa.Column('source_id', sa.Integer(), sa.ForeignKey('crawl_sources.id')))
+    add_column_online('internships', sa.Column('external_id', sa.String(length=255)))
+    add_unique_constraint_online('uq_internships_source_external', 'internships', ['source_id', 'external_id'])
+
+    for table in VERSIONED_TABLES:
+        add_column_online(table, sa.Column('version', sa.Integer()))
+        if op.get_bind().dialect.name == 'postgresql':
+            op.alter_column(table, 'version', server_default='1')
+
+    for field in TEXT_FIELDS:
+        add_column_online('applications', sa.Column(f'{field}_hash', sa.String(length=64), sa.ForeignKey('text_blobs.hash')))
+        create_index_online(f'idx_applications_{field}_hash', 'applications', [f'{field}_hash'])
+
+
+def downgrade():
+    for field in reversed(TEXT_FIELDS):
+        drop_index_online(f'idx_applications_{field}_hash', 'applications')
+    with op.batch_alter_table('applications') as batch:
+        for field in reversed(TEXT_FIELDS):
+            batch.drop_column(f'{field}_hash')
+        batch.drop_column('version')
+    with op.batch_alter_table('user_profiles') as batch:
+        batch.drop_column('version')
+    with op.batch_alter_table('internships') as batch:
+        batch.drop_constraint('uq_internships_source_external', type_='unique')
+        batch.drop_column('external_id')
+        batch.drop_column('source_id')
@@ -0,0 +1,48 @@
+"""backfill version and move inline texts into text_blobs
+
+Rows created before 0004 get version 1. Cover letters and notes still
+stored inline in applications are copied into text_blobs, deduplicated by
+content hash, and the rows point at them through the *_hash columns. Both
+run in primary-key ranges committed one at a time and only touch rows that
+are not filled yet, so an interrupted run resumes where it stopped.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 06:06:52.611840
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from src.models.user import intern_inline_texts
+from src.utils.migrations import backfill, backfill_rows
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('user_profiles', 'applications')
+TEXT_FIELDS = ('cover_letter', 'notes')
+
+
+def inline_text_fields():
+    """Inline text columns this database still has"""
+    if context.is_offline_mode():
+        return list(TEXT_FIELDS)
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('applications')}
+    return [field for field in TEXT_FIELDS if field in columns]
+
+
+def upgrade():
+    for table in VERSIONED_TABLES:
+        backfill(table, 'version = 1', where='version IS NULL')
+
+    fields = inline_text_fields()
+    if fields:
+        pending = ' OR '.join(f'({field} IS NOT NULL AND {field}_hash IS NULL)' for field in fields)
+        backfill_rows('applications', fields, lambda bind, rows: intern_inline_texts(bind, rows, fields), where=pending)
+
+
+def downgrade():
+    # The copies in text_blobs are harmless; 0007's downgrade restores the inline columns
+    pass
@@ -0,0 +1,30 @@
+"""make version NOT NULL with a default of 1
+
+Runs after the 0005 backfill; on Postgres the constraint is validated
+without blocking writes to the tables.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 06:08:30.274619
+"""
+from alembic import op
+
+from src.utils.migrations import set_not_null_online
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('user_profiles', 'applications')
+
+
+def upgrade():
+    for table in VERSIONED_TABLES:
+        set_not_null_online(table, 'version', server_default='1')
+
+
+def downgrade():
+    for table in VERSIONED_TABLES:
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column('version', nullable=True)
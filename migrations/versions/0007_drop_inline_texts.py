@@ -0,0 +1,54 @@
+"""drop the inline cover_letter and notes columns
+
+The application reads cover letters and notes only from text_blobs, and
+0005 moved every inline body there; bodies the previous release wrote
+inline since then are moved before the columns go. The downgrade restores
+the columns from text_blobs.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 06:10:05.837201
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from src.models.user import intern_inline_texts
+from src.utils.migrations import backfill, backfill_rows
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+TEXT_FIELDS = ('cover_letter', 'notes')
+
+
+def inline_text_fields():
+    """Inline text columns this database still has"""
+    if context.is_offline_mode():
+        return list(TEXT_FIELDS)
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('applications')}
+    return [field for field in TEXT_FIELDS if field in columns]
+
+
+def upgrade():
+    fields = inline_text_fields()
+    if not fields:
+        return
+
+    pending = ' OR '.join(f'({field} IS NOT NULL AND {field}_hash IS NULL)' for field in fields)
+    backfill_rows('applications', fields, lambda bind, rows: intern_inline_texts(bind, rows, fields), where=pending)
+
+    with op.batch_alter_table('applications') as batch:
+        for field in fields:
+            batch.drop_column(field)
+
+
+def downgrade():
+    for field in TEXT_FIELDS:
+        op.add_column('applications', sa.Column(field, sa.Text(), nullable=True))
+        backfill(
+            'applications',
+            f'{field} = (SELECT body FROM text_blobs WHERE text_blobs.hash = applications.{field}_hash)',
+            where=f'{field}_hash IS NOT NULL'
+        )
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for AutoIntern.AI listing endpoints
+Compares the previous path (isoformat() per field + Flask's stdlib provider)
+with to_dict() + FastJSONProvider on internship and application listings.
+"""
+
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, date
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from flask import Flask
+from src.models.user import Internship, Application
+from src.utils.json_provider import FastJSONProvider, orjson
+
+def legacy_internship_dict(internship):
+    """Internship.to_dict() as it was before FastJSONProvider"""
+    return {
+        'id': internship.id,
+        'title': internship.title,
+        'company': internship.company,
+        'location': internship.location,
+        'description': internship.description,
+        'url': internship.url,
+        'requirements': internship.requirements,
+        'salary_range': internship.salary_range,
+        'duration': internship.duration,
+        'application_deadline': internship.application_deadline.isoformat() if internship.application_deadline else None,
+        'created_at': internship.created_at.isoformat() if internship.created_at else None,
+        'updated_at': internship.updated_at.isoformat() if internship.updated_at else None
+    }
+
+def legacy_application_dict(application):
+    """Application.to_dict() as it was before FastJSONProvider"""
+    return {
+        'id': application.id,
+        'user_id': application.user_id,
+        'internship_id': application.internship_id,
+        'status': application.status,
+        'applied_date': application.applied_date.isoformat() if application.applied_date else None,
+        'cover_letter': application.cover_letter,
+        'resume_url': application.resume_url,
+        'notes': application.notes,
+        'interview_date': application.interview_date.isoformat() if application.interview_date else None,
+        'version': application.version,
+        'created_at': application.created_at.isoformat() if application.created_at else None,
+        'updated_at': application.updated_at.isoformat() if application.updated_at else None,
+        'internship': legacy_internship_dict(application.internship) if application.internship else None
+    }
+
+def build_rows(count):
+    """Build transient internships and applications resembling a listing page"""
+    now = datetime.utcnow()
+    internships = [
+        Internship(
+            id=i, title=f'Software Engineering Intern {i}', company='Google', location='Mountain View, CA',
+            description='Join our team to work on cutting-edge technology. ' * 20,
+            url=f'https://careers.google.com/jobs/results/{i}/',
+            requirements='Computer Science or related field, Python/Java/C++. ' * 5,
+            salary_range='$8,000 - $10,000/month', duration='12 weeks',
+            application_deadline=date(2024, 3, 15), created_at=now, updated_at=now
+        )
+        for i in range(count)
+    ]
+    applications = [
+        Application(
+            id=i, user_id=1, internship_id=internship.id, status='submitted',
+            applied_date=now, cover_letter='Dear hiring manager, ' * 40, notes='Follow up next week',
+            created_at=now, updated_at=now, internship=internship
+        )
+        for i, internship in enumerate(internships)
+    ]
+    return internships, applications
+
+def main():
+    """Run the benchmark"""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeat = 200
+    
+    app = Flask(__name__)
+    legacy = app.json
+    fast = FastJSONProvider(app)
+    internships, applications = build_rows(rows)
+    
+    cases = {
+        'internships legacy': lambda: legacy.dumps({'internships': [legacy_internship_dict(i) for i in internships]}),
+        'internships fast': lambda: fast.dumps({'internships': [i.to_dict() for i in internships]}),
+        'applications legacy': lambda: legacy.dumps({'applications': [legacy_application_dict(a) for a in applications]}),
+        'applications fast': lambda: fast.dumps({'applications': [a.to_dict() for a in applications]}),
+    }
+    
+    # Both paths must produce the same document
+    assert json.loads(cases['internships legacy']()) == json.loads(cases['internships fast']())
+    assert json.loads(cases['applications legacy']()) == json.loads(cases['applications fast']())
+    
+    print(f"⏱️  {rows} rows per page, {repeat} pages, orjson {'enabled' if orjson else 'not installed'}")
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=repeat, repeat=3))
+        print(f"   • {name:<20} {seconds / repeat * 1000:8.3f} ms/page")
+
+if __name__ == "__main__":
+    main()
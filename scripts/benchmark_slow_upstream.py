@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Slow-upstream benchmark for the gunicorn worker classes
+Serves the app with gunicorn.conf.py using sync, gthread and gevent workers and
+drives concurrent Google logins whose ID token check goes to a local stand-in
+for Google's tokeninfo endpoint that answers after a fixed delay. Reports
+throughput and latency percentiles per worker class.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+CLIENT_ID = 'benchmark-client'
+UPSTREAM_PORT = 8766
+APP_PORT = 8767
+WORKER_CLASSES = ('sync', 'gthread', 'gevent')
+
+class TokenInfoHandler(BaseHTTPRequestHandler):
+    """Stand-in for https://oauth2.googleapis.com/tokeninfo"""
+    delay = 0.2
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        token = parse_qs(urlparse(self.path).query).get('id_token', [''])[0]
+        body = json.dumps({
+            'aud': CLIENT_ID,
+            'sub': token,
+            'email': f'{token}@example.com',
+            'email_verified': 'true',
+            'name': token
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def wait_for_port(port, timeout=30):
+    """Wait until something listens on the port"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Nothing is listening on port {port}')
+
+def login(session, user):
+    """One Google login; returns its latency in seconds"""
+    start = time.perf_counter()
+    response = session.post(
+        f'http://127.0.0.1:{APP_PORT}/api/auth/google-login', json={'id_token': f'user{user}'}, timeout=120
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+def run(worker_class, env, args):
+    """Serve the app with one worker class and measure concurrent logins"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=project_root,
+        env=dict(env, GUNICORN_WORKER_CLASS=worker_class),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(APP_PORT)
+
+        local = threading.local()
+        def client(i):
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+            return login(local.session, i % args.users)
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            # Let every worker load the app before measuring
+            list(pool.map(client, range(args.workers * 2)))
+            start = time.perf_counter()
+            latencies = sorted(pool.map(client, range(args.requests)))
+            elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return args.requests / elapsed, percentile(0.5), percentile(0.95), elapsed
+
+def main():
+    """Compare worker classes against a slow upstream"""
+    parser = argparse.ArgumentParser(description='Benchmark gunicorn worker classes against a slow upstream')
+    parser.add_argument('--delay', type=float, default=0.2, help='upstream response delay in seconds')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='threads per gthread worker')
+    parser.add_argument('--concurrency', type=int, default=100, help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=400, help='logins per worker class')
+    parser.add_argument('--users', type=int, default=50, help='distinct users logging in')
+    parser.add_argument('--classes', default=','.join(WORKER_CLASSES), help='worker classes to compare')
+    args = parser.parse_args()
+
+    TokenInfoHandler.delay = args.delay
+    upstream = ThreadingHTTPServer(('127.0.0.1', UPSTREAM_PORT), TokenInfoHandler)
+    upstream.daemon_threads = True
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+
+    directory = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(directory, 'bench.db')}",
+        GOOGLE_CLIENT_ID=CLIENT_ID,
+        GOOGLE_TOKENINFO_URL=f'http://127.0.0.1:{UPSTREAM_PORT}/tokeninfo',
+        JOBS_EAGER='true',
+        GUNICORN_BIND=f'127.0.0.1:{APP_PORT}',
+        WEB_CONCURRENCY=str(args.workers),
+        GUNICORN_THREADS=str(args.threads),
+        GUNICORN_ACCESS_LOG=''
+    )
+
+    # Create the schema and the users once, so the measured logins only read
+    subprocess.run([sys.executable, '-c', 'import main'], cwd=project_root, env=env, check=True)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=project_root, env=dict(env, GUNICORN_WORKER_CLASS='sync', WEB_CONCURRENCY='1'),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(APP_PORT)
+        with requests.Session() as session:
+            for user in range(args.users):
+                login(session, user)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"⏱️  {args.requests} logins, {args.concurrency} concurrent clients, "
+          f"{args.workers} workers, upstream delay {args.delay * 1000:.0f} ms")
+    for worker_class in args.classes.split(','):
+        label = f'{worker_class} x{args.threads}' if worker_class == 'gthread' else worker_class
+        throughput, p50, p95, elapsed = run(worker_class, env, args)
+        print(f"   • {label:<11} {throughput:7.1f} req/s   p50 {p50:7.0f} ms   p95 {p95:7.0f} ms   {elapsed:.2f}s")
+
+    upstream.shutdown()
+
+if __name__ == "__main__":
+    main()
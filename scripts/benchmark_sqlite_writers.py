@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Concurrent writer benchmark for the SQLite engine profile
+Runs several processes that each commit small read-then-write transactions
+(like apply_to_internship) against one database file, first with SQLite
+defaults and then with the tuned profile, and reports throughput and lock errors.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from src.utils.db_engine import configure_sqlite_engine
+
+WORKERS = 8
+TRANSACTIONS_PER_WORKER = 300
+
+def make_engine(path, tuned):
+    """Engine for the database file, with or without the profile"""
+    engine = create_engine(f'sqlite:///{path}')
+    if tuned:
+        configure_sqlite_engine(engine)
+    return engine
+
+def writer(path, tuned, worker_id, results):
+    """Commit transactions and count successes and lock errors"""
+    engine = make_engine(path, tuned)
+    committed = 0
+    locked = 0
+    
+    for i in range(TRANSACTIONS_PER_WORKER):
+        try:
+            with engine.begin() as connection:
+                connection.execute(text('SELECT COUNT(*) FROM events WHERE worker = :w'), {'w': worker_id})
+                connection.execute(
+                    text('INSERT INTO events (worker, payload) VALUES (:w, :p)'),
+                    {'w': worker_id, 'p': f'status change {i}' * 4}
+                )
+            committed += 1
+        except OperationalError:
+            locked += 1
+    
+    engine.dispose()
+    results.put((committed, locked))
+
+def run(tuned):
+    """Run all writers against a fresh database file"""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'bench.db')
+    
+    engine = make_engine(path, tuned)
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE events (id INTEGER PRIMARY KEY, worker INTEGER, payload TEXT)'))
+        connection.execute(text('CREATE INDEX idx_events_worker ON events (worker)'))
+    engine.dispose()
+    
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=writer, args=(path, tuned, worker_id, results))
+        for worker_id in range(WORKERS)
+    ]
+    
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    
+    committed = sum(outcome[0] for outcome in outcomes)
+    locked = sum(outcome[1] for outcome in outcomes)
+    return committed, locked, elapsed
+
+def main():
+    """Compare default and tuned settings"""
+    print(f"⏱️  {WORKERS} writer processes x {TRANSACTIONS_PER_WORKER} transactions")
+    for label, tuned in (('defaults', False), ('tuned profile', True)):
+        committed, locked, elapsed = run(tuned)
+        print(f"   • {label:<14} {committed / elapsed:8.0f} commits/s   "
+              f"{committed} committed, {locked} 'database is locked' errors, {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Internship catalog builder for AutoIntern.AI
+Writes the shared-memory catalog snapshot (CATALOG_PATH) that all web workers
+map. Run it once, or keep it running with --interval so the snapshot stays
+younger than CATALOG_MAX_AGE_SECONDS; concurrent builders wait for each other.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from main import app
+from src.utils.catalog import build_catalog
+
+def build():
+    """Build one snapshot and report it"""
+    start = time.perf_counter()
+    count = build_catalog(app)
+    path = app.config['CATALOG_PATH']
+    print(f"📚 {count} internships, {os.path.getsize(path)} bytes in {path} "
+          f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+def main():
+    """Build the catalog once or every --interval seconds"""
+    parser = argparse.ArgumentParser(description='Build the shared internship catalog snapshot')
+    parser.add_argument('--interval', type=float, default=0, help='rebuild every N seconds (0 builds once)')
+    args = parser.parse_args()
+
+    build()
+    while args.interval > 0:
+        time.sleep(args.interval)
+        try:
+            build()
+        except Exception as e:
+            print(f"❌ Catalog build failed: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Internship crawler for AutoIntern.AI
+Registers job-board feeds and ingests their postings into the catalog.
+Run it periodically, e.g. every 15 minutes from cron. A crawl that changed
+internships rebuilds the shared catalog snapshot so lookups by id see them.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from main import app
+from src.models.user import db, CrawlSource
+from src.utils.catalog import build_catalog
+from src.utils.crawler import crawl_sources, CRAWL_CONCURRENCY, CRAWL_PER_HOST, CRAWL_MAX_PAGES
+
+def main():
+    """Add sources or run one crawl"""
+    parser = argparse.ArgumentParser(description='Crawl internship feeds')
+    parser.add_argument('--add', nargs=2, metavar=('NAME', 'URL'), action='append', help='register a feed')
+    parser.add_argument('--list', action='store_true', help='list registered feeds')
+    parser.add_argument('--source', type=int, action='append', help='only crawl this source id')
+    parser.add_argument('--concurrency', type=int, default=CRAWL_CONCURRENCY)
+    parser.add_argument('--per-host', type=int, default=CRAWL_PER_HOST)
+    parser.add_argument('--max-pages', type=int, default=CRAWL_MAX_PAGES)
+    parser.add_argument('--no-catalog', action='store_true', help='do not rebuild the catalog snapshot')
+    args = parser.parse_args()
+    
+    with app.app_context():
+        if args.add:
+            for name, url in args.add:
+                if not CrawlSource.query.filter_by(url=url).first():
+                    db.session.add(CrawlSource(name=name, url=url))
+            db.session.commit()
+            print(f"➕ Registered {len(args.add)} feed(s)")
+            return
+        
+        if args.list:
+            for source in CrawlSource.query.order_by(CrawlSource.id):
+                print(f"   {source.id:>4}  {source.name:<30} {source.url}  cursor={source.cursor} "
+                      f"ingested={source.items_ingested}")
+            return
+        
+        start = time.perf_counter()
+        summary = crawl_sources(
+            args.source, concurrency=args.concurrency, per_host=args.per_host, max_pages=args.max_pages
+        )
+        elapsed = time.perf_counter() - start
+    
+    for entry in summary:
+        state = 'not modified' if entry['not_modified'] else f"{entry['pages']} page(s), {entry['upserted']} upserted"
+        print(f"   • source {entry['source_id']}: {state}" + (f" ⚠️  {entry['error']}" if entry['error'] else ''))
+    print(f"🕷️  Crawled {len(summary)} source(s) in {elapsed:.2f}s")
+    
+    # The catalog snapshot would serve the old postings until its next build
+    if not args.no_catalog and any(entry['upserted'] for entry in summary):
+        count = build_catalog(app)
+        print(f"📚 Rebuilt the catalog with {count} internships")
+
+if __name__ == "__main__":
+    main()
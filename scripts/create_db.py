@@ -6,7 +6,9 @@ import sys
 sys.path.insert(0, os.path.dirname(__file__))
 
 from src.models.user import db, User, Internship, Application
+from src.utils.migrations import upgrade_schema
 from flask import Flask
+from sqlalchemy import text
 
 # Create Flask app
 app = Flask(__name__)
@@ -17,9 +19,11 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
 with app.app_context():
-    # Drop all tables and recreate them
+    # Drop all tables and recreate them with the migrations
     db.drop_all()
-    db.create_all()
+    db.session.execute(text('DROP TABLE IF EXISTS alembic_version'))
+    db.session.commit()
+    upgrade_schema()
     
     # Add sample internships
     sample_internships = [
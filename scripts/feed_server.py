@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Stand-in job-board feed server for trying the crawler locally
+Serves /feeds/<n> in the crawler's cursor format with ETag/Last-Modified
+validators. POST /feeds/<n>/add?count=K publishes K new postings.
+"""
+
+import argparse
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+COMPANIES = ['Google', 'Microsoft', 'Meta', 'Amazon', 'Netflix', 'Stripe', 'Shopify', 'Spotify']
+LOCATIONS = ['Remote', 'San Francisco, CA', 'New York, NY', 'Seattle, WA', 'London, UK']
+
+class Feeds:
+    """In-memory postings per feed"""
+    
+    def __init__(self, feeds, items):
+        self.lock = threading.Lock()
+        self.postings = {feed: [] for feed in range(feeds)}
+        self.modified = {}
+        for feed in self.postings:
+            self.add(feed, items)
+    
+    def add(self, feed, count):
+        with self.lock:
+            postings = self.postings[feed]
+            for _ in range(count):
+                n = len(postings)
+                postings.append({
+                    'id': f'{feed}-{n}',
+                    'title': f'Software Engineering Intern #{n}',
+                    'company': COMPANIES[(feed + n) % len(COMPANIES)],
+                    'location': LOCATIONS[n % len(LOCATIONS)],
+                    'description': f'Posting {n} from feed {feed}.',
+                    'url': f'https://jobs.example.com/{feed}/{n}',
+                    'salary_range': '$30-45/hour',
+                    'duration': '12 weeks',
+                    'application_deadline': '2026-12-31'
+                })
+            self.modified[feed] = time.time()
+
+def make_handler(feeds, page_size, latency):
+    class FeedHandler(BaseHTTPRequestHandler):
+        def _feed(self):
+            parts = urlparse(self.path).path.strip('/').split('/')
+            if len(parts) >= 2 and parts[0] == 'feeds' and parts[1].isdigit() and int(parts[1]) in feeds.postings:
+                return int(parts[1]), parts[2:]
+            return None, None
+        
+        def do_GET(self):
+            feed, rest = self._feed()
+            if feed is None or rest:
+                self.send_error(404)
+                return
+            if latency:
+                time.sleep(latency)
+            
+            cursor = parse_qs(urlparse(self.path).query).get('cursor', ['0'])[0]
+            start = int(cursor) if cursor.isdigit() else 0
+            with feeds.lock:
+                postings = feeds.postings[feed]
+                items = postings[start:start + page_size]
+                total = len(postings)
+                modified = formatdate(feeds.modified[feed], usegmt=True)
+            
+            etag = f'"{feed}-{total}-{start}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            
+            body = json.dumps({'items': items, 'next_cursor': str(start + len(items))}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', modified)
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def do_POST(self):
+            feed, rest = self._feed()
+            if feed is None or rest != ['add']:
+                self.send_error(404)
+                return
+            count = int(parse_qs(urlparse(self.path).query).get('count', ['1'])[0])
+            feeds.add(feed, count)
+            self.send_response(204)
+            self.end_headers()
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return FeedHandler
+
+def main():
+    """Serve the stand-in feeds"""
+    parser = argparse.ArgumentParser(description='Serve stand-in job-board feeds')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--feeds', type=int, default=5, help='number of feeds')
+    parser.add_argument('--items', type=int, default=250, help='initial postings per feed')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every GET')
+    args = parser.parse_args()
+    
+    feeds = Feeds(args.feeds, args.items)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(feeds, args.page_size, args.latency))
+    print(f"📡 Serving {args.feeds} feeds on http://127.0.0.1:{args.port}/feeds/0 .. /feeds/{args.feeds - 1}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Application tracking maintenance for AutoIntern.AI
+Creates upcoming partitions, moves closed months into shard tables (SQLite)
+and rolls up old events into daily summaries. Run it periodically, e.g. daily from cron.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from main import app
+from src.utils.tracking_partitions import maintain_tracking_partitions
+
+def main():
+    """Run one maintenance pass"""
+    with app.app_context():
+        result = maintain_tracking_partitions()
+    
+    print(f"🗂️  Partitions created: {', '.join(result['created']) or 'none'}")
+    print(f"📦 Shards rotated: {', '.join(result['rotated']) or 'none'}")
+    print(f"📊 Partitions rolled up: {', '.join(result['rolled_up']) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Precompress the built frontend in the static folder
+Writes .gz (and .br when the brotli package is installed) next to every
+compressible file so the static layer can serve them without compressing per request.
+"""
+
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+COMPRESSIBLE_EXTENSIONS = ('.html', '.js', '.mjs', '.css', '.json', '.map', '.svg', '.txt', '.xml', '.wasm', '.ico')
+MIN_SIZE = 1024
+
+def precompress(folder):
+    """Write compressed variants for every compressible file in folder"""
+    written = 0
+    saved = 0
+    
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            
+            if len(data) < MIN_SIZE:
+                continue
+            
+            variants = {'.gz': gzip.compress(data, compresslevel=9)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data, quality=11)
+            
+            for suffix, compressed in variants.items():
+                # Only keep variants that are actually smaller
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+                saved += len(data) - len(compressed)
+    
+    return written, saved
+
+def main():
+    """Precompress the static folder (or the folder given as argument)"""
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(project_root, 'static')
+    
+    if not os.path.isdir(folder):
+        print(f"❌ Static folder not found: {folder}")
+        sys.exit(1)
+    
+    written, saved = precompress(folder)
+    print(f"✅ Wrote {written} compressed files, {saved / 1024:.1f} KiB saved per full download")
+    if brotli is None:
+        print("ℹ️  Install brotli to also generate .br files")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Prune text_blobs for AutoIntern.AI
+Deletes cover letters and notes no application references anymore. Moving
+the inline bodies of older databases into text_blobs is part of the schema
+migrations (revisions 0005 and 0007), run at app start or by `alembic upgrade head`.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import text
+from main import app
+from src.models.user import db
+
+def prune(connection, min_age_hours=24):
+    """Delete blobs no application references (old enough not to be in use by a running request)"""
+    cutoff = datetime.utcnow() - timedelta(hours=min_age_hours)
+    result = connection.execute(text(
+        'DELETE FROM text_blobs WHERE created_at < :cutoff '
+        'AND NOT EXISTS (SELECT 1 FROM applications WHERE cover_letter_hash = text_blobs.hash) '
+        'AND NOT EXISTS (SELECT 1 FROM applications WHERE notes_hash = text_blobs.hash)'
+    ), {'cutoff': cutoff})
+    connection.commit()
+    return result.rowcount
+
+def main():
+    """Prune unreferenced blobs"""
+    parser = argparse.ArgumentParser(description='Delete cover letters and notes no application references')
+    parser.add_argument('--min-age-hours', type=int, default=24, help='keep blobs younger than this')
+    args = parser.parse_args()
+
+    with app.app_context():
+        with db.engine.connect() as connection:
+            print(f"🧹 Pruned {prune(connection, args.min_age_hours)} unreferenced blobs")
+
+            blobs, size = connection.execute(text('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM text_blobs')).one()
+            print(f"📦 {blobs} distinct texts, {size} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Background job worker for AutoIntern.AI
+Claims due jobs from the jobs table and runs them until stopped (SIGINT/SIGTERM).
+Start as many workers as needed; they never run the same job twice.
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from main import app
+from src.models.user import db
+from src.utils.jobs import work
+
+def run(once=False):
+    """Run one worker loop in this process"""
+    stopping = multiprocessing.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    
+    with app.app_context():
+        # Connections inherited from the parent process must not be shared
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+        work(stop=stopping.is_set, once=once)
+
+def main():
+    """Start the requested number of worker processes"""
+    parser = argparse.ArgumentParser(description='Run background jobs')
+    parser.add_argument('--processes', type=int, default=1, help='worker processes to start')
+    parser.add_argument('--once', action='store_true', help='run the due jobs once and exit')
+    args = parser.parse_args()
+    
+    print(f"⚙️  Starting {args.processes} job worker(s)")
+    if args.processes == 1:
+        run(args.once)
+        return
+    
+    processes = [multiprocessing.Process(target=run, args=(args.once,)) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    
+    # Children receive SIGTERM/SIGINT themselves; forward SIGTERM sent to the parent
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in processes:
+        process.join()
+
+if __name__ == "__main__":
+    main()
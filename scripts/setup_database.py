@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
-Database setup and migration script for AutoIntern.AI
-This script creates the database schema and populates it with sample data.
+Database setup script for AutoIntern.AI
+This script creates the database schema with the migrations in
+migrations/versions and populates it with sample data.
 """
 
 import os
@@ -12,98 +13,19 @@ from datetime import datetime
 project_root = os.path.dirname(os.path.dirname(__file__))
 sys.path.insert(0, project_root)
 
-def create_database_schema():
-    """Create database tables and relationships"""
-    
-    # Database schema creation SQL
-    schema_sql = """
-    -- Users table
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email VARCHAR(255) UNIQUE NOT NULL,
-        password_hash VARCHAR(255),
-        google_id VARCHAR(255),
-        name VARCHAR(255),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-
-    -- Internships table
-    CREATE TABLE IF NOT EXISTS internships (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        title VARCHAR(255) NOT NULL,
-        company VARCHAR(255) NOT NULL,
-        location VARCHAR(255),
-        description TEXT,
-        url VARCHAR(500),
-        requirements TEXT,
-        salary_range VARCHAR(100),
-        duration VARCHAR(100),
-        application_deadline DATE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
+def create_database_schema(db_path):
+    """Create or upgrade the database schema by running the migrations"""
+    from flask import Flask
+    from src.models.user import db
+    from src.utils.migrations import upgrade_schema
 
-    -- Applications table
-    CREATE TABLE IF NOT EXISTS applications (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        internship_id INTEGER NOT NULL,
-        status VARCHAR(50) DEFAULT 'submitted',
-        applied_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        cover_letter TEXT,
-        resume_url VARCHAR(500),
-        notes TEXT,
-        interview_date TIMESTAMP,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
-        FOREIGN KEY (internship_id) REFERENCES internships (id) ON DELETE CASCADE
-    );
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
 
-    -- User profiles table
-    CREATE TABLE IF NOT EXISTS user_profiles (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        first_name VARCHAR(100),
-        last_name VARCHAR(100),
-        phone VARCHAR(20),
-        linkedin_url VARCHAR(500),
-        github_url VARCHAR(500),
-        portfolio_url VARCHAR(500),
-        skills TEXT,
-        education TEXT,
-        experience TEXT,
-        bio TEXT,
-        avatar_url VARCHAR(500),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-    );
-
-    -- Application tracking table
-    CREATE TABLE IF NOT EXISTS application_tracking (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        application_id INTEGER NOT NULL,
-        status VARCHAR(50) NOT NULL,
-        notes TEXT,
-        changed_by INTEGER,
-        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (application_id) REFERENCES applications (id) ON DELETE CASCADE,
-        FOREIGN KEY (changed_by) REFERENCES users (id)
-    );
-
-    -- Indexes for better performance
-    CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
-    CREATE INDEX IF NOT EXISTS idx_users_google_id ON users(google_id);
-    CREATE INDEX IF NOT EXISTS idx_applications_user_id ON applications(user_id);
-    CREATE INDEX IF NOT EXISTS idx_applications_internship_id ON applications(internship_id);
-    CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status);
-    CREATE INDEX IF NOT EXISTS idx_internships_company ON internships(company);
-    CREATE INDEX IF NOT EXISTS idx_internships_location ON internships(location);
-    """
-    
-    return schema_sql
+    with app.app_context():
+        upgrade_schema()
 
 def insert_sample_data():
     """Insert sample internships and test data"""
@@ -178,18 +100,17 @@ def main():
     try:
         import sqlite3
         
-        # Connect to database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        print("📊 Creating database schema...")
+        print("📊 Migrating database schema...")
         
-        # Execute schema creation
-        schema_sql = create_database_schema()
-        cursor.executescript(schema_sql)
+        # Run the migrations
+        create_database_schema(db_path)
         
         print("✅ Database schema created successfully!")
         
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        
         print("📝 Inserting sample data...")
         
         # Insert sample data
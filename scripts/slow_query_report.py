@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Slow-query report
+Aggregates the slow-query log of all workers (including rotated files) by
+query fingerprint and prints the most expensive statements with the routes
+that ran them and their latest plan.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+DEFAULT_LOG = os.getenv('SLOW_QUERY_LOG', os.path.join(project_root, 'logs', 'slow_queries.log'))
+ORDERS = ('total_ms', 'count', 'max_ms', 'mean_ms')
+
+def read_entries(path):
+    """Entries of the log and its rotated files, oldest file first"""
+    # RotatingFileHandler keeps log.1 (newest) .. log.N (oldest)
+    rotated = [p for p in glob.glob(f'{glob.escape(path)}.*') if p.rsplit('.', 1)[1].isdigit()]
+    rotated.sort(key=lambda p: int(p.rsplit('.', 1)[1]), reverse=True)
+    for log_path in rotated + [path]:
+        if not os.path.isfile(log_path):
+            continue
+        with open(log_path, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+def aggregate(entries):
+    """Per-fingerprint count, durations, routes and latest plan"""
+    stats = {}
+    for entry in entries:
+        item = stats.setdefault(entry['fingerprint'], {
+            'statement': entry['statement'],
+            'durations': [],
+            'routes': {},
+            'plan': None,
+            'full_scan': None
+        })
+        item['durations'].append(entry['duration_ms'])
+        route = entry.get('route')
+        if route:
+            key = f"{route['method']} {route['rule']}"
+            item['routes'][key] = item['routes'].get(key, 0) + 1
+        if entry.get('plan') is not None:
+            item['plan'] = entry['plan']
+            item['full_scan'] = entry.get('full_scan')
+
+    for item in stats.values():
+        durations = sorted(item.pop('durations'))
+        item['count'] = len(durations)
+        item['total_ms'] = sum(durations)
+        item['mean_ms'] = item['total_ms'] / len(durations)
+        item['max_ms'] = durations[-1]
+        item['p95_ms'] = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+    return stats
+
+def main():
+    """Print the slow-query report"""
+    parser = argparse.ArgumentParser(description='Aggregate the slow-query log by fingerprint')
+    parser.add_argument('--log', default=DEFAULT_LOG, help='slow-query log path')
+    parser.add_argument('--top', type=int, default=10, help='fingerprints to show')
+    parser.add_argument('--order', choices=ORDERS, default='total_ms')
+    parser.add_argument('--full-scans', action='store_true', help='only statements whose plan scans a table')
+    parser.add_argument('--json', action='store_true', help='print the aggregates as JSON')
+    args = parser.parse_args()
+
+    stats = aggregate(read_entries(args.log))
+    if args.full_scans:
+        stats = {key: item for key, item in stats.items() if item['full_scan']}
+    ranked = sorted(stats.items(), key=lambda pair: pair[1][args.order], reverse=True)[:args.top]
+
+    if args.json:
+        print(json.dumps([dict(item, fingerprint=key) for key, item in ranked], indent=2))
+        return
+
+    if not ranked:
+        print(f"✅ No slow queries in {args.log}")
+        return
+
+    print(f"🐢 {len(stats)} slow statement fingerprints in {args.log}, top {len(ranked)} by {args.order}")
+    for key, item in ranked:
+        print(f"\n[{key}] {item['count']}x  total {item['total_ms']:.1f} ms  mean {item['mean_ms']:.1f} ms  "
+              f"p95 {item['p95_ms']:.1f} ms  max {item['max_ms']:.1f} ms"
+              + ('  FULL SCAN' if item['full_scan'] else ''))
+        print(f"   {item['statement'][:500]}")
+        for route, count in sorted(item['routes'].items(), key=lambda pair: -pair[1]):
+            print(f"   • {route} ({count}x)")
+        for line in item['plan'] or ():
+            print(f"     plan: {line}")
+
+if __name__ == "__main__":
+    main()
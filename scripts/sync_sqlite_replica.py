@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Copy a SQLite primary database into a replica file
+For local testing of read-replica routing: point DATABASE_URL at the primary,
+DATABASE_REPLICA_URLS at the replica and run this whenever the replica should catch up.
+"""
+
+import os
+import sqlite3
+import sys
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+def sync(primary_path, replica_path):
+    """Copy the primary into the replica with SQLite's online backup API"""
+    primary = sqlite3.connect(primary_path)
+    replica = sqlite3.connect(replica_path)
+    try:
+        primary.backup(replica)
+    finally:
+        replica.close()
+        primary.close()
+
+def main():
+    """Sync the replica given on the command line"""
+    if len(sys.argv) != 3:
+        print("Usage: python scripts/sync_sqlite_replica.py <primary.db> <replica.db>")
+        sys.exit(1)
+    
+    sync(sys.argv[1], sys.argv[2])
+    print(f"✅ Replica {sys.argv[2]} synced from {sys.argv[1]}")
+
+if __name__ == "__main__":
+    main()
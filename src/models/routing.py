@@ -0,0 +1,113 @@
+"""
+Read-replica routing for the Flask-SQLAlchemy session
+
+Replicas are configured as SQLAlchemy binds named replica_0, replica_1, ...
+Views decorated with @read_replica send their SELECTs to a random replica;
+everything else, including any flush, goes to the primary. Responses to a
+write carry X-Primary-Until (epoch seconds, REPLICA_STICKY_SECONDS ahead);
+clients send it back on their next requests, which then read from the
+primary on any worker so users always see their own changes.
+"""
+import random
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql import Select
+
+REPLICA_BIND_PREFIX = 'replica_'
+STICKY_HEADER = 'X-Primary-Until'
+
+
+def replica_binds(urls):
+    """Build SQLALCHEMY_BINDS entries from a list of replica URLs"""
+    return {f'{REPLICA_BIND_PREFIX}{index}': url for index, url in enumerate(urls)}
+
+
+class RoutingSession(Session):
+    """Session that routes reads to a replica inside @read_replica views"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and has_app_context()
+            and g.get('use_replica')
+            and not self._flushing
+            and not (self.new or self.dirty or self.deleted)
+            and (clause is None or isinstance(clause, Select))
+        ):
+            replicas = [key for key in self._db.engines if key and key.startswith(REPLICA_BIND_PREFIX)]
+            if replicas:
+                return self._db.engines[random.choice(replicas)]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def mark_write(session, flush_context):
+    """Remember that this request wrote to the primary"""
+    if has_app_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def mark_statement_write(orm_execute_state):
+    """Single-statement UPDATE/DELETE/INSERT executions bypass the flush"""
+    if has_app_context() and (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        g.db_wrote = True
+
+
+def is_sticky():
+    """
+    Whether the client wrote recently enough that replicas may not have caught up
+    The client echoes the X-Primary-Until value of its last write response; only
+    values this app could have issued are honoured, so nobody pins themselves to
+    the primary. Sub-requests of a /batch that wrote share the outer g.
+    """
+    now = time.time()
+    if g.get('primary_until', 0) > now:
+        return True
+
+    try:
+        until = float(request.headers.get(STICKY_HEADER, 0))
+    except ValueError:
+        return False
+    return now < until <= now + current_app.config['REPLICA_STICKY_SECONDS']
+
+
+def read_replica(f):
+    """
+    Decorator routing a read-only view to the replicas
+    Must be applied below the auth decorator
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if is_sticky():
+            return f(*args, **kwargs)
+
+        previous = g.get('use_replica', False)
+        g.use_replica = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g.use_replica = previous
+
+    return decorated_function
+
+
+def init_read_replicas(app):
+    """Announce read-your-writes stickiness on responses to requests that wrote to the primary"""
+    app.config.setdefault('REPLICA_STICKY_SECONDS', 5)
+    has_replicas = any(key.startswith(REPLICA_BIND_PREFIX) for key in app.config.get('SQLALCHEMY_BINDS') or {})
+
+    @app.after_request
+    def mark_sticky(response):
+        if not has_replicas:
+            return response
+        if g.pop('db_wrote', False):
+            g.primary_until = time.time() + current_app.config['REPLICA_STICKY_SECONDS']
+        if g.get('primary_until'):
+            response.headers[STICKY_HEADER] = f'{g.primary_until:.3f}'
+        return response
@@ -1,11 +1,20 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql, sqlite
 from datetime import datetime
+import hashlib
 from werkzeug.security import generate_password_hash, check_password_hash
+from src.models.routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# to_dict() returns date/datetime values as-is; FastJSONProvider encodes them as ISO 8601
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('idx_users_google_id', 'google_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(255), unique=True, nullable=False)
@@ -18,6 +27,7 @@ class User(db.Model):
     # Relationships
     applications = db.relationship('Application', backref='user', lazy=True, cascade='all, delete-orphan')
     profile = db.relationship('UserProfile', backref='user', uselist=False, cascade='all, delete-orphan')
+    uploads = db.relationship('UploadedFile', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Set password hash"""
@@ -34,8 +44,8 @@ class User(db.Model):
             'email': self.email,
             'name': self.name,
             'google_id': self.google_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class UserProfile(db.Model):
@@ -54,9 +64,19 @@ class UserProfile(db.Model):
     experience = db.Column(db.Text)
     bio = db.Column(db.Text)
     avatar_url = db.Column(db.String(500))
+    # Optimistic concurrency: bumped on every update, exposed as the ETag
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __mapper_args__ = {'version_id_col': version}
+    
+    # Fields a client can update
+    UPDATABLE_FIELDS = (
+        'first_name', 'last_name', 'phone', 'linkedin_url', 'github_url', 'portfolio_url',
+        'skills', 'education', 'experience', 'bio', 'avatar_url'
+    )
+    
     def to_dict(self):
         """Convert profile to dictionary"""
         return {
@@ -73,12 +93,18 @@ class UserProfile(db.Model):
             'experience': self.experience,
             'bio': self.bio,
             'avatar_url': self.avatar_url,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'version': self.version,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class Internship(db.Model):
     __tablename__ = 'internships'
+    __table_args__ = (
+        db.Index('idx_internships_updated', 'updated_at', 'id'),
+        db.Index('idx_internships_created', 'created_at'),
+        db.UniqueConstraint('source_id', 'external_id', name='uq_internships_source_external'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
@@ -90,14 +116,26 @@ class Internship(db.Model):
     salary_range = db.Column(db.String(100))
     duration = db.Column(db.String(100))
     application_deadline = db.Column(db.Date)
+    # Set for postings ingested by the crawler: the feed and the posting's id in it
+    source_id = db.Column(db.Integer, db.ForeignKey('crawl_sources.id'))
+    external_id = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     applications = db.relationship('Application', backref='internship', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        """Convert internship to dictionary"""
+    # Fields a client can request with ?fields=
+    SERIALIZED_FIELDS = (
+        'id', 'title', 'company', 'location', 'description', 'url', 'requirements',
+        'salary_range', 'duration', 'application_deadline', 'created_at', 'updated_at'
+    )
+    
+    def to_dict(self, fields=None):
+        """Convert internship to dictionary, optionally restricted to the given fields"""
+        if fields is not None:
+            return {field: getattr(self, field) for field in fields}
+        
         return {
             'id': self.id,
             'title': self.title,
@@ -108,48 +146,167 @@ class Internship(db.Model):
             'requirements': self.requirements,
             'salary_range': self.salary_range,
             'duration': self.duration,
-            'application_deadline': self.application_deadline.isoformat() if self.application_deadline else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'application_deadline': self.application_deadline,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
+def text_hash(body):
+    """Content address of a text body"""
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+class TextBlob(db.Model):
+    __tablename__ = 'text_blobs'
+    
+    hash = db.Column(db.String(64), primary_key=True)
+    body = db.Column(db.Text, nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+def intern_texts(connection, texts):
+    """Store {hash: body} texts that are not stored yet"""
+    if not texts:
+        return
+    insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    now = datetime.utcnow()
+    connection.execute(
+        insert(TextBlob.__table__).on_conflict_do_nothing(index_elements=['hash']),
+        [{'hash': key, 'body': body, 'size': len(body), 'created_at': now} for key, body in texts.items()]
+    )
+
+def intern_inline_texts(connection, rows, fields):
+    """
+    Store the inline bodies of application rows (id and the given text fields)
+    in text_blobs and point the rows' *_hash columns at them (migrations)
+    """
+    texts = {}
+    values = []
+    for row in rows:
+        row_values = {'id': row.id}
+        for field in fields:
+            body = getattr(row, field)
+            row_values[field] = text_hash(body) if body is not None else None
+            if body is not None:
+                texts[row_values[field]] = body
+        values.append(row_values)
+
+    # Blobs first: a rerun after a failure in between only finds them stored already
+    intern_texts(connection, texts)
+    assignments = ', '.join(f'{field}_hash = :{field}' for field in fields)
+    connection.execute(text(f'UPDATE applications SET {assignments} WHERE id = :id'), values)
+
 class Application(db.Model):
     __tablename__ = 'applications'
+    __table_args__ = (
+        db.Index('idx_applications_user_updated', 'user_id', 'updated_at', 'id'),
+        db.Index('idx_applications_user_internship', 'user_id', 'internship_id'),
+        db.Index('idx_applications_user_applied', 'user_id', 'applied_date'),
+        db.Index('idx_applications_internship_id', 'internship_id'),
+        db.Index('idx_applications_cover_letter_hash', 'cover_letter_hash'),
+        db.Index('idx_applications_notes_hash', 'notes_hash'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     internship_id = db.Column(db.Integer, db.ForeignKey('internships.id'), nullable=False)
     status = db.Column(db.String(50), default='submitted')
     applied_date = db.Column(db.DateTime, default=datetime.utcnow)
-    cover_letter = db.Column(db.Text)
+    # Cover letters and notes live in text_blobs, deduplicated by content hash
+    cover_letter_hash = db.Column(db.String(64), db.ForeignKey('text_blobs.hash'))
     resume_url = db.Column(db.String(500))
-    notes = db.Column(db.Text)
+    notes_hash = db.Column(db.String(64), db.ForeignKey('text_blobs.hash'))
     interview_date = db.Column(db.DateTime)
+    # Optimistic concurrency: bumped on every update, exposed as the ETag
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __mapper_args__ = {'version_id_col': version}
+    
     # Relationships
     tracking = db.relationship('ApplicationTracking', backref='application', lazy=True, cascade='all, delete-orphan')
+    cover_letter_blob = db.relationship('TextBlob', foreign_keys=[cover_letter_hash], viewonly=True)
+    notes_blob = db.relationship('TextBlob', foreign_keys=[notes_hash], viewonly=True)
     
-    def to_dict(self):
-        """Convert application to dictionary"""
+    # Fields a client can request with ?fields= ('internship' embeds the internship)
+    SERIALIZED_FIELDS = (
+        'id', 'user_id', 'internship_id', 'status', 'applied_date', 'cover_letter', 'resume_url',
+        'notes', 'interview_date', 'version', 'created_at', 'updated_at', 'internship'
+    )
+    
+    # Fields stored in text_blobs; listings leave them out unless requested
+    TEXT_FIELDS = ('cover_letter', 'notes')
+    LISTING_FIELDS = (
+        'id', 'user_id', 'internship_id', 'status', 'applied_date', 'resume_url',
+        'interview_date', 'version', 'created_at', 'updated_at', 'internship'
+    )
+    
+    def _get_text(self, field):
+        key = getattr(self, f'{field}_hash')
+        if key is None:
+            return None
+        # Texts set on this instance are known without loading the blob
+        body = self.__dict__.get('_texts', {}).get(key)
+        if body is None:
+            blob = getattr(self, f'{field}_blob')
+            body = blob.body if blob is not None else None
+        return body
+    
+    def _set_text(self, field, body):
+        if body is None:
+            setattr(self, f'{field}_hash', None)
+            return
+        key = text_hash(body)
+        self.__dict__.setdefault('_texts', {})[key] = body
+        # Stored by intern_pending_texts before the application is flushed
+        self.__dict__.setdefault('_pending_texts', {})[key] = body
+        setattr(self, f'{field}_hash', key)
+    
+    @property
+    def cover_letter(self):
+        return self._get_text('cover_letter')
+    
+    @cover_letter.setter
+    def cover_letter(self, body):
+        self._set_text('cover_letter', body)
+    
+    @property
+    def notes(self):
+        return self._get_text('notes')
+    
+    @notes.setter
+    def notes(self, body):
+        self._set_text('notes', body)
+    
+    def to_dict(self, fields=None, internship_fields=None):
+        """Convert application to dictionary, optionally restricted to the given fields"""
+        if fields is not None:
+            data = {field: getattr(self, field) for field in fields if field != 'internship'}
+            if 'internship' in fields:
+                data['internship'] = self.internship.to_dict(internship_fields) if self.internship else None
+            return data
+        
         return {
             'id': self.id,
             'user_id': self.user_id,
             'internship_id': self.internship_id,
             'status': self.status,
-            'applied_date': self.applied_date.isoformat() if self.applied_date else None,
+            'applied_date': self.applied_date,
             'cover_letter': self.cover_letter,
             'resume_url': self.resume_url,
             'notes': self.notes,
-            'interview_date': self.interview_date.isoformat() if self.interview_date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'interview_date': self.interview_date,
+            'version': self.version,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'internship': self.internship.to_dict() if self.internship else None
         }
 
 class ApplicationTracking(db.Model):
     __tablename__ = 'application_tracking'
+    __table_args__ = (
+        db.Index('idx_application_tracking_application_changed', 'application_id', 'changed_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=False)
@@ -166,5 +323,181 @@ class ApplicationTracking(db.Model):
             'status': self.status,
             'notes': self.notes,
             'changed_by': self.changed_by,
-            'changed_at': self.changed_at.isoformat() if self.changed_at else None
+            'changed_at': self.changed_at
         }
+
+class ApplicationTrackingDaily(db.Model):
+    __tablename__ = 'application_tracking_daily'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'application_id', 'status', name='uq_application_tracking_daily'),
+        db.Index('idx_application_tracking_daily_day', 'day'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    application_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+    first_changed_at = db.Column(db.DateTime)
+    last_changed_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        """Convert daily tracking summary to dictionary"""
+        return {
+            'day': self.day,
+            'application_id': self.application_id,
+            'status': self.status,
+            'event_count': self.event_count,
+            'first_changed_at': self.first_changed_at,
+            'last_changed_at': self.last_changed_at
+        }
+
+class Tombstone(db.Model):
+    __tablename__ = 'tombstones'
+    __table_args__ = (
+        db.Index('idx_tombstones_entity_user', 'entity', 'user_id', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert tombstone to dictionary"""
+        return {
+            'entity': self.entity,
+            'entity_id': self.entity_id,
+            'user_id': self.user_id,
+            'deleted_at': self.deleted_at
+        }
+
+class CrawlSource(db.Model):
+    __tablename__ = 'crawl_sources'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    url = db.Column(db.String(500), unique=True, nullable=False)
+    enabled = db.Column(db.Boolean, nullable=False, default=True)
+    # Conditional request validators and incremental cursor from the last crawl
+    etag = db.Column(db.String(255))
+    last_modified = db.Column(db.String(100))
+    cursor = db.Column(db.String(500))
+    last_crawled_at = db.Column(db.DateTime)
+    last_status = db.Column(db.Integer)
+    last_error = db.Column(db.Text)
+    items_ingested = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert crawl source to dictionary"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'url': self.url,
+            'enabled': self.enabled,
+            'cursor': self.cursor,
+            'last_crawled_at': self.last_crawled_at,
+            'last_status': self.last_status,
+            'last_error': self.last_error,
+            'items_ingested': self.items_ingested
+        }
+
+class UploadedFile(db.Model):
+    __tablename__ = 'uploaded_files'
+    __table_args__ = (
+        db.Index('idx_uploaded_files_user_kind', 'user_id', 'kind'),
+        db.Index('idx_uploaded_files_sha256', 'sha256'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # resume, avatar
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(100), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    # Content address of the stored file; identical uploads share one file on disk
+    sha256 = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @property
+    def url(self):
+        return f'/api/files/{self.id}'
+    
+    def to_dict(self):
+        """Convert uploaded file to dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'filename': self.filename,
+            'content_type': self.content_type,
+            'size': self.size,
+            'sha256': self.sha256,
+            'url': self.url,
+            'created_at': self.created_at
+        }
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('idx_jobs_status_run_at', 'status', 'run_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    task = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    user_id = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(64))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    result = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        """Convert job to dictionary"""
+        return {
+            'id': self.id,
+            'task': self.task,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at,
+            'last_error': self.last_error,
+            'result': self.result,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+@event.listens_for(RoutingSession, 'before_flush')
+def intern_pending_texts(session, flush_context, instances):
+    """Store the texts set on applications before the rows referencing them"""
+    texts = {}
+    for instance in list(session.new) + list(session.dirty):
+        if isinstance(instance, Application):
+            texts.update(instance.__dict__.pop('_pending_texts', {}))
+    intern_texts(session.connection(), texts)
+
+@event.listens_for(Application, 'after_delete')
+def record_application_tombstone(mapper, connection, application):
+    """Leave a tombstone so delta sync clients learn about the delete"""
+    connection.execute(Tombstone.__table__.insert().values(
+        entity='application',
+        entity_id=application.id,
+        user_id=application.user_id,
+        deleted_at=datetime.utcnow()
+    ))
+
+@event.listens_for(Internship, 'after_delete')
+def record_internship_tombstone(mapper, connection, internship):
+    """Leave a tombstone so delta sync clients learn about the delete"""
+    connection.execute(Tombstone.__table__.insert().values(
+        entity='internship',
+        entity_id=internship.id,
+        deleted_at=datetime.utcnow()
+    ))
@@ -0,0 +1,69 @@
+from flask import Blueprint, request, jsonify, current_app
+from src.routes.auth import verify_token
+from src.utils.analytics import GROUPINGS, funnel_analytics
+
+analytics_bp = Blueprint('analytics', __name__)
+
+MAX_GROUPS = 500
+
+def require_auth(f):
+    """Decorator to require authentication"""
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Authorization token required'}), 401
+
+        token = auth_header.split(' ')[1]
+        user_id = verify_token(token)
+
+        if not user_id:
+            return jsonify({'error': 'Invalid or expired token'}), 401
+
+        request.current_user_id = user_id
+        return f(*args, **kwargs)
+
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
+@analytics_bp.route('/analytics/funnel', methods=['GET'])
+@require_auth
+def get_funnel():
+    """
+    Application funnel per company or role (?by=company|role), largest first
+    Optional ?name= (case-insensitive substring), ?min_applications= and ?limit=;
+    groups smaller than ANALYTICS_MIN_GROUP_SIZE are never listed
+    """
+    try:
+        by = request.args.get('by', 'company')
+        if by not in GROUPINGS:
+            return jsonify({'error': f'Unknown grouping: {by}'}), 400
+
+        min_applications = max(
+            request.args.get('min_applications', 0, type=int), current_app.config['ANALYTICS_MIN_GROUP_SIZE']
+        )
+        limit = min(request.args.get('limit', 50, type=int), MAX_GROUPS)
+        name = request.args.get('name', '').lower()
+
+        snapshot = funnel_analytics.current()
+        groups = [
+            group for group in snapshot['groups'][by]
+            if group['applications'] >= min_applications and (not name or name in (group['name'] or '').lower())
+        ]
+
+        response = jsonify({
+            'by': by,
+            'stages': list(snapshot['overall']['funnel']),
+            'overall': snapshot['overall'],
+            'groups': groups[:limit],
+            'total_groups': len(groups),
+            'generated_at': snapshot['generated_at'],
+            'refresh': snapshot['refresh']
+        })
+        # Unchanged until the next refresh; clients poll with If-None-Match
+        response.set_etag(snapshot['version'])
+        response.cache_control.private = True
+        response.cache_control.max_age = current_app.config['ANALYTICS_REFRESH_SECONDS']
+        return response.make_conditional(request)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
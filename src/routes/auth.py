@@ -1,12 +1,37 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, g
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 from datetime import datetime, timedelta
 from src.models.user import db, User, UserProfile
 import requests
+from src.utils.profiling import timed
 
 auth_bp = Blueprint('auth', __name__)
 
+# Reused across requests so calls to Google keep their connections alive
+google_http = requests.Session()
+
+def verify_google_id_token(id_token):
+    """
+    Verify a Google ID token with Google's tokeninfo endpoint
+    Returns the token's claims, or None if Google rejects it or it was issued to another client
+    """
+    response = google_http.get(
+        current_app.config['GOOGLE_TOKENINFO_URL'],
+        params={'id_token': id_token},
+        timeout=current_app.config['GOOGLE_HTTP_TIMEOUT']
+    )
+    if response.status_code != 200:
+        return None
+    
+    claims = response.json()
+    client_id = current_app.config.get('GOOGLE_CLIENT_ID')
+    if client_id and claims.get('aud') != client_id:
+        return None
+    if str(claims.get('email_verified', 'false')).lower() != 'true':
+        return None
+    return claims
+
 def generate_token(user_id):
     """Generate JWT token for user"""
     payload = {
@@ -17,13 +42,31 @@ def generate_token(user_id):
 
 def verify_token(token):
     """Verify JWT token and return user_id"""
+    # Tokens already verified in this app context (e.g. by batch sub-requests) are not decoded again
+    verified_tokens = g.setdefault('verified_tokens', {})
+    if token in verified_tokens:
+        return verified_tokens[token]
+    
     try:
-        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-        return payload['user_id']
+        with timed('auth'):
+            payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        user_id = payload['user_id']
     except jwt.ExpiredSignatureError:
-        return None
+        user_id = None
     except jwt.InvalidTokenError:
-        return None
+        user_id = None
+    
+    verified_tokens[token] = user_id
+    return user_id
+
+def create_user_profile(user_id):
+    """
+    Create the empty profile of a new user
+    Written in the signup transaction rather than queued: the client reads the
+    profile right after signing up, and it is a single insert
+    """
+    if UserProfile.query.filter_by(user_id=user_id).first() is None:
+        db.session.add(UserProfile(user_id=user_id))
 
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
@@ -50,11 +93,9 @@ def signup():
         user.set_password(password)
         
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()
         
-        # Create user profile
-        profile = UserProfile(user_id=user.id)
-        db.session.add(profile)
+        create_user_profile(user.id)
         db.session.commit()
         
         # Generate token
@@ -105,9 +146,20 @@ def google_login():
     """Google OAuth login endpoint"""
     try:
         data = request.get_json()
+        
+        # With an ID token the identity comes from Google instead of the client
+        if data.get('id_token'):
+            try:
+                claims = verify_google_id_token(data['id_token'])
+            except requests.RequestException:
+                return jsonify({'error': 'Google sign-in is unavailable'}), 503
+            if claims is None:
+                return jsonify({'error': 'Invalid Google ID token'}), 401
+            data = {'google_id': claims.get('sub'), 'email': claims.get('email'), 'name': claims.get('name')}
+        
         google_id = data.get('google_id')
         email = data.get('email')
-        name = data.get('name', email.split('@')[0] if email else 'User')
+        name = data.get('name') or (email.split('@')[0] if email else 'User')
         
         if not google_id or not email:
             return jsonify({'error': 'Google ID and email are required'}), 400
@@ -128,11 +180,9 @@ def google_login():
                     google_id=google_id
                 )
                 db.session.add(user)
-                db.session.commit()
+                db.session.flush()
                 
-                # Create user profile
-                profile = UserProfile(user_id=user.id)
-                db.session.add(profile)
+                create_user_profile(user.id)
         
         db.session.commit()
         
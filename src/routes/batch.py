@@ -0,0 +1,78 @@
+from flask import Blueprint, request, jsonify, current_app
+from src.models.user import db
+from src.routes.auth import verify_token
+
+batch_bp = Blueprint('batch', __name__)
+
+MAX_BATCH_REQUESTS = 20
+ALLOWED_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+@batch_bp.route('/batch', methods=['POST'])
+def execute_batch():
+    """Execute several API sub-requests in one HTTP call"""
+    try:
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Authorization token required'}), 401
+        
+        # Authenticate once; sub-requests reuse the verified token from the app context
+        if not verify_token(auth_header.split(' ')[1]):
+            return jsonify({'error': 'Invalid or expired token'}), 401
+        
+        data = request.get_json() or {}
+        sub_requests = data.get('requests')
+        
+        if not isinstance(sub_requests, list) or not sub_requests:
+            return jsonify({'error': 'A non-empty list of requests is required'}), 400
+        
+        if len(sub_requests) > MAX_BATCH_REQUESTS:
+            return jsonify({'error': f'At most {MAX_BATCH_REQUESTS} requests are allowed per batch'}), 400
+        
+        responses = [execute_sub_request(item, auth_header) for item in sub_requests]
+        
+        return jsonify({'responses': responses}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def execute_sub_request(item, auth_header):
+    """
+    Dispatch one sub-request through the app's URL map
+    The request context is pushed inside the current app context, so the
+    sub-request shares its database session and verified token
+    """
+    if not isinstance(item, dict):
+        return {'id': None, 'status': 400, 'body': {'error': 'Invalid request'}}
+    
+    request_id = item.get('id')
+    method = str(item.get('method', 'GET')).upper()
+    path = item.get('path')
+    
+    if method not in ALLOWED_METHODS:
+        return {'id': request_id, 'status': 405, 'body': {'error': 'Method not allowed'}}
+    
+    if not isinstance(path, str) or not path.startswith('/api/') or path.split('?')[0].rstrip('/') == '/api/batch':
+        return {'id': request_id, 'status': 400, 'body': {'error': 'Path must be an API route other than /api/batch'}}
+    
+    with current_app.test_request_context(
+        path,
+        method=method,
+        headers={'Authorization': auth_header},
+        json=item.get('body')
+    ):
+        try:
+            response = current_app.full_dispatch_request()
+        except Exception as e:
+            db.session.rollback()
+            return {'id': request_id, 'status': 500, 'body': {'error': str(e)}}
+        
+        if response.is_streamed:
+            response.close()
+            return {'id': request_id, 'status': 400, 'body': {'error': 'Streaming responses are not supported in a batch'}}
+        
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True)
+        
+        return {'id': request_id, 'status': response.status_code, 'body': body}
@@ -0,0 +1,214 @@
+from flask import Blueprint, request, jsonify, current_app, send_file
+from werkzeug.http import parse_options_header
+from src.models.user import db, Application, UploadedFile, UserProfile
+from src.routes.auth import verify_token
+from src.utils.file_storage import (
+    UploadError, stream_upload, store_file, discard_upload, stored_file_lock, storage_path, remove_stored_file
+)
+import os
+
+files_bp = Blueprint('files', __name__)
+
+# Accepted content types and the config key holding the size limit per upload kind
+UPLOAD_KINDS = {
+    'resume': {
+        'types': (
+            'application/pdf', 'application/msword',
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        ),
+        'max_size': 'UPLOAD_MAX_RESUME_BYTES'
+    },
+    'avatar': {
+        'types': ('image/png', 'image/jpeg', 'image/gif', 'image/webp'),
+        'max_size': 'UPLOAD_MAX_AVATAR_BYTES'
+    }
+}
+
+# Stored files never change, so their URLs can be cached indefinitely
+FILE_MAX_AGE = 365 * 24 * 3600
+
+def require_auth(f):
+    """Decorator to require authentication"""
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Authorization token required'}), 401
+        
+        token = auth_header.split(' ')[1]
+        user_id = verify_token(token)
+        
+        if not user_id:
+            return jsonify({'error': 'Invalid or expired token'}), 401
+        
+        request.current_user_id = user_id
+        return f(*args, **kwargs)
+    
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
+@files_bp.route('/files/<kind>', methods=['POST'])
+@require_auth
+def upload_file(kind):
+    """Upload a resume or avatar as multipart/form-data (field 'file')"""
+    try:
+        spec = UPLOAD_KINDS.get(kind)
+        if spec is None:
+            return jsonify({'error': 'Unknown upload kind'}), 404
+        
+        mimetype, options = parse_options_header(request.content_type or '')
+        if mimetype != 'multipart/form-data' or not options.get('boundary'):
+            return jsonify({'error': 'multipart/form-data body required'}), 400
+        
+        # Reject declared oversized bodies before reading anything
+        max_size = current_app.config[spec['max_size']]
+        if request.content_length is not None and request.content_length > max_size + 64 * 1024:
+            return jsonify({'error': f'File is larger than {max_size} bytes'}), 413
+        
+        folder = current_app.config['UPLOAD_FOLDER']
+        try:
+            stored = stream_upload(request.stream, options['boundary'], folder, max_size, spec['types'])
+        except UploadError as e:
+            return jsonify({'error': str(e)}), e.status
+        
+        try:
+            # Check the application before the file is stored, so rejected uploads leave nothing behind
+            application = None
+            if kind != 'avatar' and stored['fields'].get('application_id'):
+                application_id = stored['fields']['application_id'].strip()
+                if not application_id.isdigit():
+                    return jsonify({'error': 'application_id must be an integer'}), 400
+                application = Application.query.filter_by(
+                    id=int(application_id), user_id=request.current_user_id
+                ).first()
+                if application is None:
+                    return jsonify({'error': 'Application not found'}), 404
+            
+            # Stored and referenced under one lock, so a delete of the same content cannot remove it in between
+            with stored_file_lock(folder, stored['sha256']):
+                store_file(folder, stored)
+                try:
+                    upload = UploadedFile(
+                        user_id=request.current_user_id,
+                        kind=kind,
+                        filename=stored['filename'][:255],
+                        content_type=stored['content_type'],
+                        size=stored['size'],
+                        sha256=stored['sha256']
+                    )
+                    db.session.add(upload)
+                    db.session.flush()
+                    
+                    # Point the profile or an application at the new file
+                    if kind == 'avatar':
+                        profile = UserProfile.query.filter_by(user_id=request.current_user_id).first()
+                        if profile is None:
+                            profile = UserProfile(user_id=request.current_user_id)
+                            db.session.add(profile)
+                        profile.avatar_url = upload.url
+                    elif application is not None:
+                        application.resume_url = upload.url
+                    
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    if not UploadedFile.query.filter_by(sha256=stored['sha256']).first():
+                        remove_stored_file(folder, stored['sha256'])
+                    raise
+            
+            return jsonify(upload.to_dict()), 201
+        finally:
+            discard_upload(stored)
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@files_bp.route('/files', methods=['GET'])
+@require_auth
+def list_files():
+    """List the current user's uploads"""
+    try:
+        query = UploadedFile.query.filter_by(user_id=request.current_user_id)
+        if request.args.get('kind'):
+            query = query.filter_by(kind=request.args['kind'])
+        
+        uploads = query.order_by(UploadedFile.created_at.desc(), UploadedFile.id.desc()).all()
+        return jsonify({'files': [upload.to_dict() for upload in uploads]}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@files_bp.route('/files/<int:file_id>', methods=['GET'])
+def download_file(file_id):
+    """Download a file; avatars are public, resumes only for their owner"""
+    try:
+        upload = db.session.get(UploadedFile, file_id)
+        if upload is None:
+            return jsonify({'error': 'File not found'}), 404
+        
+        if upload.kind != 'avatar':
+            # Links opened by the browser cannot set headers, so the token may be in the query string
+            auth_header = request.headers.get('Authorization', '')
+            token = auth_header[7:] if auth_header.startswith('Bearer ') else request.args.get('token')
+            if not token:
+                return jsonify({'error': 'Authorization token required'}), 401
+            user_id = verify_token(token)
+            if not user_id:
+                return jsonify({'error': 'Invalid or expired token'}), 401
+            if user_id != upload.user_id:
+                return jsonify({'error': 'Access denied'}), 403
+        
+        path = storage_path(current_app.config['UPLOAD_FOLDER'], upload.sha256)
+        if not os.path.exists(path):
+            return jsonify({'error': 'File not found'}), 404
+        
+        # send_file streams through wsgi.file_wrapper (sendfile) or X-Sendfile
+        # and answers conditional and Range requests itself
+        response = send_file(
+            path,
+            mimetype=upload.content_type,
+            as_attachment=upload.kind == 'resume',
+            download_name=upload.filename,
+            conditional=True,
+            etag=upload.sha256,
+            last_modified=upload.created_at,
+            max_age=FILE_MAX_AGE
+        )
+        response.cache_control.immutable = True
+        if upload.kind == 'avatar':
+            response.cache_control.public = True
+        else:
+            response.cache_control.public = False
+            response.cache_control.private = True
+        
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@files_bp.route('/files/<int:file_id>', methods=['DELETE'])
+@require_auth
+def delete_file(file_id):
+    """Delete an upload; the stored file goes when nothing references it"""
+    try:
+        upload = db.session.get(UploadedFile, file_id)
+        if upload is None:
+            return jsonify({'error': 'File not found'}), 404
+        if upload.user_id != request.current_user_id:
+            return jsonify({'error': 'Access denied'}), 403
+        
+        # Under the lock uploads take, so none can reference the file between the check and the unlink
+        folder = current_app.config['UPLOAD_FOLDER']
+        sha256 = upload.sha256
+        with stored_file_lock(folder, sha256):
+            db.session.delete(upload)
+            db.session.commit()
+            
+            if not UploadedFile.query.filter_by(sha256=sha256).first():
+                remove_stored_file(folder, sha256)
+        
+        return jsonify({'message': 'File deleted successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -1,10 +1,37 @@
-from flask import Blueprint, request, jsonify
-from src.models.user import db, Internship, Application, ApplicationTracking
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from src.models.user import (
+    db, Internship, Application, ApplicationTracking, Tombstone, TextBlob, text_hash, intern_texts
+)
 from src.routes.auth import verify_token
+from src.utils.pagination import encode_cursor, decode_cursor
+from src.models.routing import read_replica
+from src.utils.tracking_partitions import tracking_entity
+from src.utils.delta_sync import current_sync_token, delta_page
+from src.utils.events import event_bus, publish_tracking_event
+from src.utils.jobs import enqueue, after_commit
+from src.utils.concurrency import version_etag, if_match_versions
+from src.utils.fieldsets import (
+    parse_fields, parse_application_fields, internship_load_options, application_load_options
+)
+from src.utils.catalog import catalog_lookup
+from src.utils.auto_apply import (
+    AUTO_APPLY_MAX_INTERNSHIPS, AUTO_APPLY_SYNC_LIMIT, MAX_TEMPLATE_SIZE, auto_apply, compile_template
+)
+from jinja2 import TemplateError, TemplateSyntaxError
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.orm.exc import StaleDataError
 from datetime import datetime
+import queue
+import time
 
 internships_bp = Blueprint('internships', __name__)
 
+APPLICATION_UPDATABLE_FIELDS = ['status', 'cover_letter', 'resume_url', 'notes', 'interview_date']
+MAX_BATCH_UPDATES = 100
+TRACKING_PREVIEW_LIMIT = 5
+MAX_TRACKING_PAGE_SIZE = 100
+MAX_MULTI_GET_IDS = 100
+
 def require_auth(f):
     """Decorator to require authentication"""
     def decorated_function(*args, **kwargs):
@@ -24,11 +51,124 @@ def require_auth(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+def check_text_fields(data):
+    """Reject cover letters and notes that are not strings (they are hashed as text)"""
+    for field in Application.TEXT_FIELDS:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            raise ValueError(f'{field} must be a string')
+
+def application_update_values(data):
+    """
+    Updatable fields present in request data, with interview_date parsed
+    Raises ValueError when a value is invalid
+    """
+    check_text_fields(data)
+    values = {field: data[field] for field in APPLICATION_UPDATABLE_FIELDS if field in data}
+    
+    if values.get('interview_date'):
+        try:
+            values['interview_date'] = datetime.fromisoformat(values['interview_date'].replace('Z', '+00:00'))
+        except (ValueError, AttributeError):
+            raise ValueError('Invalid interview date')
+    
+    return values
+
+def apply_application_fields(application, data):
+    """Copy updatable fields from request data onto an application"""
+    # Parse interview date before touching the application
+    for field, value in application_update_values(data).items():
+        setattr(application, field, value)
+
+def filter_internships(internships_query, query='', location='', company=''):
+    """Apply the catalog search filters to an internship query"""
+    if query:
+        internships_query = internships_query.filter(
+            Internship.title.contains(query) | 
+            Internship.description.contains(query) |
+            Internship.requirements.contains(query)
+        )
+    
+    if location:
+        internships_query = internships_query.filter(
+            Internship.location.contains(location)
+        )
+    
+    if company:
+        internships_query = internships_query.filter(
+            Internship.company.contains(company)
+        )
+    
+    return internships_query
+
+def select_catalog_fields(body, fields):
+    """Requested fields of an internship stored in the catalog"""
+    record = current_app.json.loads(body)
+    return {field: record[field] for field in fields}
+
 @internships_bp.route('/internships', methods=['GET'])
 @require_auth
+@read_replica
 def get_internships():
-    """Get all internships with optional filtering"""
+    """
+    Get all internships with optional filtering
+
+    With ids= the internships come from the shared catalog snapshot, which
+    lags the database until it is rebuilt: after every crawl that changed
+    rows and by the builder service, at most CATALOG_MAX_AGE_SECONDS after
+    which workers stop using it and query the database.
+    """
     try:
+        # Sparse fieldset: only the requested columns are selected
+        try:
+            fields = parse_fields(request.args.get('fields'), Internship.SERIALIZED_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Multi-get: fetch several internships by id with a single IN query
+        if request.args.get('ids'):
+            try:
+                ids = [int(internship_id) for internship_id in request.args['ids'].split(',')]
+            except ValueError:
+                return jsonify({'error': 'ids must be a comma-separated list of integers'}), 400
+            
+            if len(ids) > MAX_MULTI_GET_IDS:
+                return jsonify({'error': f'At most {MAX_MULTI_GET_IDS} ids are allowed'}), 400
+            
+            # Served from the shared catalog snapshot; only ids it lacks are queried
+            ids = list(dict.fromkeys(ids))
+            cached = catalog_lookup(ids)
+            uncached = [internship_id for internship_id in ids if internship_id not in cached]
+            internships = {}
+            if uncached:
+                internships = {
+                    internship.id: internship
+                    for internship in Internship.query.options(*internship_load_options(fields)).filter(
+                        Internship.id.in_(uncached)
+                    )
+                }
+            found_ids = [internship_id for internship_id in ids if internship_id in cached or internship_id in internships]
+            missing = [internship_id for internship_id in ids if internship_id not in cached and internship_id not in internships]
+            
+            if fields is None:
+                # Splice the stored JSON into the response instead of decoding it
+                records = [
+                    cached[internship_id] if internship_id in cached
+                    else current_app.json.dumps(internships[internship_id].to_dict()).encode('utf-8')
+                    for internship_id in found_ids
+                ]
+                body = b'{"internships":[' + b','.join(records) + b'],"missing":' + \
+                    current_app.json.dumps(missing).encode('utf-8') + b'}'
+                return current_app.response_class(body, mimetype='application/json'), 200
+            
+            return jsonify({
+                'internships': [
+                    select_catalog_fields(cached[internship_id], fields) if internship_id in cached
+                    else internships[internship_id].to_dict(fields)
+                    for internship_id in found_ids
+                ],
+                'missing': missing
+            }), 200
+        
         # Get query parameters
         query = request.args.get('query', '')
         location = request.args.get('location', '')
@@ -37,27 +177,35 @@ def get_internships():
         per_page = int(request.args.get('per_page', 20))
         
         # Build query
-        internships_query = Internship.query
-        
-        if query:
-            internships_query = internships_query.filter(
-                Internship.title.contains(query) | 
-                Internship.description.contains(query) |
-                Internship.requirements.contains(query)
-            )
-        
-        if location:
-            internships_query = internships_query.filter(
-                Internship.location.contains(location)
-            )
-        
-        if company:
-            internships_query = internships_query.filter(
-                Internship.company.contains(company)
-            )
+        internships_query = filter_internships(Internship.query, query, location, company)
+        
+        tombstone_query = Tombstone.query.filter_by(entity='internship')
+        
+        # Delta sync: only rows changed or deleted since the client's token
+        if 'since' in request.args:
+            try:
+                # The sync watermark needs updated_at even if it was not requested
+                delta_fields = fields + ['updated_at'] if fields and 'updated_at' not in fields else fields
+                internships, deleted, sync_token, has_more = delta_page(
+                    internships_query.options(*internship_load_options(delta_fields)),
+                    Internship, tombstone_query, request.args['since']
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            return jsonify({
+                'internships': [internship.to_dict(fields) for internship in internships],
+                'deleted': deleted,
+                'sync_token': sync_token,
+                'has_more': has_more
+            }), 200
+        
+        sync_token = current_sync_token(internships_query, Internship, tombstone_query)
         
         # Order by creation date (newest first)
-        internships_query = internships_query.order_by(Internship.created_at.desc())
+        internships_query = internships_query.options(*internship_load_options(fields)).order_by(
+            Internship.created_at.desc()
+        )
         
         # Paginate
         internships = internships_query.paginate(
@@ -65,11 +213,12 @@ def get_internships():
         )
         
         return jsonify({
-            'internships': [internship.to_dict() for internship in internships.items],
+            'internships': [internship.to_dict(fields) for internship in internships.items],
             'total': internships.total,
             'pages': internships.pages,
             'current_page': page,
-            'per_page': per_page
+            'per_page': per_page,
+            'sync_token': sync_token
         }), 200
         
     except Exception as e:
@@ -77,14 +226,32 @@ def get_internships():
 
 @internships_bp.route('/internships/<int:internship_id>', methods=['GET'])
 @require_auth
+@read_replica
 def get_internship(internship_id):
-    """Get specific internship by ID"""
+    """
+    Get specific internship by ID
+
+    Served from the shared catalog snapshot when it holds the id, so edits
+    show up once the snapshot is rebuilt (after a crawl that changed rows,
+    or by the builder service) and never later than CATALOG_MAX_AGE_SECONDS.
+    """
     try:
-        internship = Internship.query.get(internship_id)
+        try:
+            fields = parse_fields(request.args.get('fields'), Internship.SERIALIZED_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        body = catalog_lookup([internship_id]).get(internship_id)
+        if body is not None:
+            if fields is None:
+                return current_app.response_class(body, mimetype='application/json'), 200
+            return jsonify(select_catalog_fields(body, fields)), 200
+        
+        internship = Internship.query.options(*internship_load_options(fields)).get(internship_id)
         if not internship:
             return jsonify({'error': 'Internship not found'}), 404
         
-        return jsonify(internship.to_dict()), 200
+        return jsonify(internship.to_dict(fields)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -103,6 +270,11 @@ def apply_to_internship():
         if not internship_id:
             return jsonify({'error': 'Internship ID is required'}), 400
         
+        try:
+            check_text_fields(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Check if internship exists
         internship = Internship.query.get(internship_id)
         if not internship:
@@ -128,27 +300,118 @@ def apply_to_internship():
         )
         
         db.session.add(application)
+        db.session.flush()
+        
+        # One row in the same transaction, published to this worker's SSE clients on commit
+        record_application_submitted(application.id, request.current_user_id)
         db.session.commit()
         
-        # Create tracking entry
-        tracking = ApplicationTracking(
-            application_id=application.id,
-            status='submitted',
-            notes='Application submitted',
-            changed_by=request.current_user_id
-        )
+        return jsonify(application.to_dict()), 201
         
-        db.session.add(tracking)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@internships_bp.route('/internships/auto-apply', methods=['POST'])
+@require_auth
+def auto_apply_to_internships():
+    """Apply to many internships at once with generated cover letters"""
+    try:
+        data = request.get_json() or {}
+        max_internships = current_app.config.get('AUTO_APPLY_MAX_INTERNSHIPS', AUTO_APPLY_MAX_INTERNSHIPS)
+        
+        # Either explicit ids or the catalog filters (query, location, company)
+        if 'internship_ids' in data:
+            internship_ids = data['internship_ids']
+            if not isinstance(internship_ids, list) or not internship_ids or not all(
+                isinstance(internship_id, int) for internship_id in internship_ids
+            ):
+                return jsonify({'error': 'internship_ids must be a non-empty list of integers'}), 400
+            if len(internship_ids) > max_internships:
+                return jsonify({'error': f'At most {max_internships} internships are allowed'}), 400
+        elif isinstance(data.get('filter'), dict):
+            search = data['filter']
+            internships_query = filter_internships(
+                Internship.query, search.get('query', ''), search.get('location', ''), search.get('company', '')
+            )
+            internship_ids = [
+                internship_id for (internship_id,) in internships_query.with_entities(Internship.id)
+                .order_by(Internship.created_at.desc()).limit(max_internships)
+            ]
+            if not internship_ids:
+                return jsonify({'applied': [], 'skipped': []}), 200
+        else:
+            return jsonify({'error': 'internship_ids or filter is required'}), 400
+        
+        # Reject bad templates now rather than in a background job
+        template = data.get('template')
+        if template is not None:
+            if not isinstance(template, str) or len(template) > MAX_TEMPLATE_SIZE:
+                return jsonify({'error': f'template must be a string of at most {MAX_TEMPLATE_SIZE} characters'}), 400
+            try:
+                compile_template(template)
+            except TemplateSyntaxError as e:
+                return jsonify({'error': f'Invalid template: {e}'}), 400
+        
+        try:
+            check_text_fields(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        options = {
+            'template': template,
+            'resume_url': data.get('resume_url'),
+            'notes': data.get('notes')
+        }
+        
+        # Large batches run as a job the client can poll
+        if len(internship_ids) > current_app.config.get('AUTO_APPLY_SYNC_LIMIT', AUTO_APPLY_SYNC_LIMIT):
+            job = enqueue(
+                'auto_apply',
+                {'user_id': request.current_user_id, 'internship_ids': internship_ids, **options},
+                user_id=request.current_user_id
+            )
+            db.session.commit()
+            
+            response = jsonify({'job': job.to_dict(), 'status_url': f'/api/jobs/{job.id}'})
+            response.headers['Location'] = f'/api/jobs/{job.id}'
+            return response, 202
+        
+        try:
+            result = auto_apply(request.current_user_id, internship_ids, **options)
+        except TemplateError as e:
+            db.session.rollback()
+            return jsonify({'error': f'Template failed to render: {e}'}), 400
         db.session.commit()
         
-        return jsonify(application.to_dict()), 201
+        return jsonify(result), 201 if result['applied'] else 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def record_application_submitted(application_id, user_id):
+    """
+    Add the 'submitted' tracking entry of a new application
+    Written in the apply transaction rather than queued: the timeline and the
+    SSE stream must show the submission as soon as the apply returns, and it
+    is a single insert; the event is published once the transaction commits
+    """
+    tracking = ApplicationTracking(
+        application_id=application_id,
+        status='submitted',
+        notes='Application submitted',
+        changed_by=user_id
+    )
+    db.session.add(tracking)
+    db.session.flush()
+    
+    event = tracking.to_dict()
+    after_commit(lambda: event_bus.publish(user_id, event))
+
 @internships_bp.route('/applications', methods=['GET'])
 @require_auth
+@read_replica
 def get_user_applications():
     """Get current user's applications"""
     try:
@@ -156,14 +419,49 @@ def get_user_applications():
         per_page = int(request.args.get('per_page', 20))
         status = request.args.get('status', '')
         
+        # Sparse fieldset, e.g. fields=status,applied_date,internship.title,internship.company
+        try:
+            fields, internship_fields = parse_application_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Cover letters and notes are only read when requested with fields=
+        if fields is None:
+            fields = list(Application.LISTING_FIELDS)
+        
         # Build query
         applications_query = Application.query.filter_by(user_id=request.current_user_id)
         
         if status:
             applications_query = applications_query.filter_by(status=status)
         
+        tombstone_query = Tombstone.query.filter_by(entity='application', user_id=request.current_user_id)
+        
+        # Delta sync: only rows changed or deleted since the client's token
+        if 'since' in request.args:
+            try:
+                # The sync watermark needs updated_at even if it was not requested
+                delta_fields = fields + ['updated_at'] if fields and 'updated_at' not in fields else fields
+                applications, deleted, sync_token, has_more = delta_page(
+                    applications_query.options(*application_load_options(delta_fields, internship_fields)),
+                    Application, tombstone_query, request.args['since']
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            return jsonify({
+                'applications': [app.to_dict(fields, internship_fields) for app in applications],
+                'deleted': deleted,
+                'sync_token': sync_token,
+                'has_more': has_more
+            }), 200
+        
+        sync_token = current_sync_token(applications_query, Application, tombstone_query)
+        
         # Order by application date (newest first)
-        applications_query = applications_query.order_by(Application.applied_date.desc())
+        applications_query = applications_query.options(
+            *application_load_options(fields, internship_fields)
+        ).order_by(Application.applied_date.desc())
         
         # Paginate
         applications = applications_query.paginate(
@@ -171,20 +469,151 @@ def get_user_applications():
         )
         
         return jsonify({
-            'applications': [app.to_dict() for app in applications.items],
+            'applications': [app.to_dict(fields, internship_fields) for app in applications.items],
             'total': applications.total,
             'pages': applications.pages,
             'current_page': page,
-            'per_page': per_page
+            'per_page': per_page,
+            'sync_token': sync_token
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@internships_bp.route('/applications/events', methods=['GET'])
+def stream_application_events():
+    """Server-Sent Events stream of the current user's application tracking events"""
+    # EventSource cannot set headers, so the token may also come from the query string
+    auth_header = request.headers.get('Authorization', '')
+    token = auth_header[7:] if auth_header.startswith('Bearer ') else request.args.get('token')
+    if not token:
+        return jsonify({'error': 'Authorization token required'}), 401
+    
+    user_id = verify_token(token)
+    if not user_id:
+        return jsonify({'error': 'Invalid or expired token'}), 401
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        cursor = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Invalid Last-Event-ID'}), 400
+    
+    poll_interval = current_app.config.get('SSE_POLL_INTERVAL', 5)
+    max_duration = current_app.config.get('SSE_MAX_DURATION', 300)
+    
+    def user_tracking_query(start=None):
+        # SQLite shards included, so events rotated out of the hot table are still replayed
+        entity = tracking_entity(start=start)
+        query = db.session.query(entity).join(Application, Application.id == entity.application_id)
+        return entity, query.filter(Application.user_id == user_id)
+    
+    entity, tracking_query = user_tracking_query()
+    if cursor is None:
+        # New streams start from the latest event that already exists
+        latest = tracking_query.order_by(entity.id.desc()).first()
+        cursor = latest.id if latest else 0
+    else:
+        latest = tracking_query.filter(entity.id == cursor).first()
+    # Later polls only read the shards from the month of the cursor event on
+    since = latest.changed_at if latest else None
+    # Give the connection back to the pool for the life of the stream; close() rather
+    # than remove() keeps the scoped session of a surrounding /batch request intact
+    db.session.close()
+    
+    def format_event(event):
+        return f"id: {event['id']}\nevent: tracking\ndata: {current_app.json.dumps(event)}\n\n"
+    
+    def generate():
+        nonlocal cursor, since
+        subscriber = event_bus.subscribe(user_id)
+        # Ids delivered from the local bus but not yet covered by the database cursor
+        delivered = set()
+        deadline = time.monotonic() + max_duration
+        next_poll = time.monotonic() + poll_interval
+        
+        try:
+            yield f"retry: {poll_interval * 1000}\n\n"
+            
+            while time.monotonic() < deadline:
+                try:
+                    event = subscriber.get(timeout=max(0, next_poll - time.monotonic()))
+                    if event['id'] > cursor and event['id'] not in delivered:
+                        delivered.add(event['id'])
+                        yield format_event(event)
+                    continue
+                except queue.Empty:
+                    pass
+                
+                # Database fallback for events written by other workers
+                entity, tracking_query = user_tracking_query(since)
+                events = tracking_query.filter(entity.id > cursor).order_by(entity.id).all()
+                db.session.close()
+                
+                for tracking in events:
+                    if tracking.id not in delivered:
+                        yield format_event(tracking.to_dict())
+                    cursor = tracking.id
+                    since = tracking.changed_at
+                
+                delivered = {event_id for event_id in delivered if event_id > cursor}
+                next_poll = time.monotonic() + poll_interval
+                
+                if not events:
+                    yield ": keepalive\n\n"
+        finally:
+            event_bus.unsubscribe(user_id, subscriber)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @internships_bp.route('/applications/<int:application_id>', methods=['GET'])
 @require_auth
+@read_replica
 def get_application(application_id):
     """Get specific application"""
+    try:
+        try:
+            fields, internship_fields = parse_application_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # The ownership check needs user_id and the ETag needs version even if they were not requested
+        load_fields = fields and fields + [field for field in ('user_id', 'version') if field not in fields]
+        application = Application.query.options(
+            *application_load_options(load_fields, internship_fields)
+        ).get(application_id)
+        if not application:
+            return jsonify({'error': 'Application not found'}), 404
+        
+        # Check if user owns this application
+        if application.user_id != request.current_user_id:
+            return jsonify({'error': 'Access denied'}), 403
+        
+        tracking_limit = min(max(request.args.get('tracking_limit', TRACKING_PREVIEW_LIMIT, type=int), 1), MAX_TRACKING_PAGE_SIZE)
+        
+        app_data = application.to_dict(fields, internship_fields)
+        # Include only the latest tracking events, the rest is served by the timeline endpoint
+        entity = tracking_entity()
+        tracking, next_cursor = get_tracking_page(application.id, tracking_limit, entity=entity)
+        app_data['tracking'] = [track.to_dict() for track in tracking]
+        app_data['tracking_count'] = db.session.query(entity).filter(entity.application_id == application.id).count()
+        app_data['tracking_next_cursor'] = next_cursor
+        
+        response = jsonify(app_data)
+        response.headers['ETag'] = version_etag(application.version)
+        return response, 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@internships_bp.route('/applications/<int:application_id>/tracking', methods=['GET'])
+@require_auth
+@read_replica
+def get_application_tracking(application_id):
+    """Get a page of an application's tracking timeline, newest first"""
     try:
         application = Application.query.get(application_id)
         if not application:
@@ -194,15 +623,49 @@ def get_application(application_id):
         if application.user_id != request.current_user_id:
             return jsonify({'error': 'Access denied'}), 403
         
-        app_data = application.to_dict()
-        # Include tracking history
-        app_data['tracking'] = [track.to_dict() for track in application.tracking]
+        limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_TRACKING_PAGE_SIZE)
+        cursor = request.args.get('cursor')
         
-        return jsonify(app_data), 200
+        try:
+            tracking, next_cursor = get_tracking_page(application.id, limit, cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'tracking': [track.to_dict() for track in tracking],
+            'next_cursor': next_cursor,
+            'limit': limit
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def get_tracking_page(application_id, limit, cursor=None, entity=None):
+    """
+    Fetch one page of tracking events ordered by (changed_at, id) descending
+    Returns the events and the cursor for the next page (None on the last page)
+    """
+    entity = entity or tracking_entity()
+    tracking_query = db.session.query(entity).filter(entity.application_id == application_id)
+    
+    if cursor:
+        changed_at, track_id = decode_cursor(cursor, datetime, int)
+        tracking_query = tracking_query.filter(
+            (entity.changed_at < changed_at) |
+            ((entity.changed_at == changed_at) & (entity.id < track_id))
+        )
+    
+    tracking = tracking_query.order_by(
+        entity.changed_at.desc(), entity.id.desc()
+    ).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(tracking) > limit:
+        tracking = tracking[:limit]
+        next_cursor = encode_cursor(tracking[-1].changed_at, tracking[-1].id)
+    
+    return tracking, next_cursor
+
 @internships_bp.route('/applications/<int:application_id>', methods=['PUT'])
 @require_auth
 def update_application(application_id):
@@ -216,21 +679,24 @@ def update_application(application_id):
         if application.user_id != request.current_user_id:
             return jsonify({'error': 'Access denied'}), 403
         
+        versions = if_match_versions()
+        if versions is not None and application.version not in versions:
+            return jsonify({'error': 'Application was modified by another request', 'version': application.version}), 409
+        
         data = request.get_json()
         old_status = application.status
         
         # Update application fields
-        updatable_fields = ['status', 'cover_letter', 'resume_url', 'notes', 'interview_date']
+        try:
+            apply_application_fields(application, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        for field in updatable_fields:
-            if field in data:
-                if field == 'interview_date' and data[field]:
-                    # Parse interview date
-                    application.interview_date = datetime.fromisoformat(data[field].replace('Z', '+00:00'))
-                else:
-                    setattr(application, field, data[field])
-        
-        db.session.commit()
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            return jsonify({'error': 'Application was modified by another request'}), 409
         
         # Create tracking entry if status changed
         if 'status' in data and data['status'] != old_status:
@@ -242,8 +708,177 @@ def update_application(application_id):
             )
             db.session.add(tracking)
             db.session.commit()
+            publish_tracking_event(request.current_user_id, tracking)
+        
+        response = jsonify(application.to_dict())
+        response.headers['ETag'] = version_etag(application.version)
+        return response, 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@internships_bp.route('/applications/<int:application_id>', methods=['PATCH'])
+@require_auth
+def patch_application(application_id):
+    """Partially update an application with one UPDATE, guarded by If-Match"""
+    try:
+        data = request.get_json() or {}
+        try:
+            values = application_update_values(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if not values:
+            return jsonify({'error': 'No updatable fields provided'}), 400
+        
+        # Text fields are stored once in text_blobs and referenced by hash
+        texts = {}
+        for field in Application.TEXT_FIELDS:
+            if field in values:
+                body = values.pop(field)
+                values[f'{field}_hash'] = text_hash(body) if body is not None else None
+                if body is not None:
+                    texts[values[f'{field}_hash']] = body
+        intern_texts(db.session.connection(), texts)
+        
+        conditions = [Application.id == application_id, Application.user_id == request.current_user_id]
+        versions = if_match_versions()
+        if versions is not None:
+            conditions.append(Application.version.in_(versions))
+        
+        now = datetime.utcnow()
+        event = None
+        if 'status' in values:
+            # Record the status change, read from the row as it is before the UPDATE
+            notes = data.get('status_notes', f'Status changed to {values["status"]}')
+            changed = select(
+                Application.id,
+                literal(values['status'], ApplicationTracking.status.type),
+                literal(notes, ApplicationTracking.notes.type),
+                literal(request.current_user_id, ApplicationTracking.changed_by.type),
+                literal(now, ApplicationTracking.changed_at.type)
+            ).where(*conditions, Application.status != values['status'])
+            event = db.session.execute(
+                insert(ApplicationTracking)
+                .from_select(['application_id', 'status', 'notes', 'changed_by', 'changed_at'], changed)
+                .returning(*ApplicationTracking.__table__.c)
+            ).first()
+        
+        row = db.session.execute(
+            update(Application)
+            .where(*conditions)
+            .values(**values, version=Application.version + 1, updated_at=now)
+            .returning(*Application.__table__.c)
+            .execution_options(synchronize_session=False)
+        ).first()
+        
+        if row is None:
+            db.session.rollback()
+            current = db.session.query(Application.user_id, Application.version).filter(
+                Application.id == application_id
+            ).first()
+            if current is None:
+                return jsonify({'error': 'Application not found'}), 404
+            if current.user_id != request.current_user_id:
+                return jsonify({'error': 'Access denied'}), 403
+            return jsonify({'error': 'Application was modified by another request', 'version': current.version}), 409
+        
+        application_data = dict(row._mapping)
+        hashes = [application_data[f'{field}_hash'] for field in Application.TEXT_FIELDS]
+        missing = [key for key in hashes if key is not None and key not in texts]
+        if missing:
+            texts.update(db.session.query(TextBlob.hash, TextBlob.body).filter(TextBlob.hash.in_(missing)).all())
+        for field in Application.TEXT_FIELDS:
+            application_data[field] = texts.get(application_data.pop(f'{field}_hash'))
+        
+        if event is not None:
+            tracking_data = dict(event._mapping)
+            after_commit(lambda: event_bus.publish(request.current_user_id, tracking_data))
+        db.session.commit()
+        
+        response = jsonify(application_data)
+        response.headers['ETag'] = version_etag(row.version)
+        return response, 200
         
-        return jsonify(application.to_dict()), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@internships_bp.route('/applications/batch', methods=['PUT'])
+@require_auth
+def batch_update_applications():
+    """Update many applications in a single transaction"""
+    try:
+        data = request.get_json() or {}
+        updates = data.get('updates')
+        
+        if not isinstance(updates, list) or not updates:
+            return jsonify({'error': 'A non-empty list of updates is required'}), 400
+        
+        if len(updates) > MAX_BATCH_UPDATES:
+            return jsonify({'error': f'At most {MAX_BATCH_UPDATES} updates are allowed per batch'}), 400
+        
+        # Load every owned application in one query
+        ids = [item.get('id') for item in updates if isinstance(item, dict)]
+        applications = {
+            application.id: application
+            for application in Application.query.filter(
+                Application.id.in_([app_id for app_id in ids if isinstance(app_id, int)]),
+                Application.user_id == request.current_user_id
+            ).all()
+        }
+        
+        results = []
+        tracking_entries = []
+        seen_ids = set()
+        
+        for item in updates:
+            app_id = item.get('id') if isinstance(item, dict) else None
+            
+            if not isinstance(app_id, int):
+                results.append({'id': app_id, 'success': False, 'error': 'Application ID is required'})
+                continue
+            
+            if app_id in seen_ids:
+                results.append({'id': app_id, 'success': False, 'error': 'Duplicate application ID in batch'})
+                continue
+            seen_ids.add(app_id)
+            
+            # Missing and foreign applications are reported the same way
+            application = applications.get(app_id)
+            if not application:
+                results.append({'id': app_id, 'success': False, 'error': 'Application not found'})
+                continue
+            
+            old_status = application.status
+            try:
+                apply_application_fields(application, item)
+            except ValueError as e:
+                results.append({'id': app_id, 'success': False, 'error': str(e)})
+                continue
+            
+            if 'status' in item and item['status'] != old_status:
+                tracking_entries.append(ApplicationTracking(
+                    application_id=application.id,
+                    status=item['status'],
+                    notes=item.get('status_notes', f'Status changed to {item["status"]}'),
+                    changed_by=request.current_user_id
+                ))
+            
+            results.append({'id': app_id, 'success': True, 'status': application.status})
+        
+        db.session.add_all(tracking_entries)
+        db.session.commit()
+        
+        for tracking in tracking_entries:
+            publish_tracking_event(request.current_user_id, tracking)
+        
+        return jsonify({
+            'results': results,
+            'updated': sum(1 for result in results if result['success']),
+            'failed': sum(1 for result in results if not result['success'])
+        }), 200
         
     except Exception as e:
         db.session.rollback()
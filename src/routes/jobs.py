@@ -0,0 +1,43 @@
+from flask import Blueprint, request, jsonify
+from src.models.user import db, Job
+from src.routes.auth import verify_token
+
+jobs_bp = Blueprint('jobs', __name__)
+
+def require_auth(f):
+    """Decorator to require authentication"""
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Authorization token required'}), 401
+        
+        token = auth_header.split(' ')[1]
+        user_id = verify_token(token)
+        
+        if not user_id:
+            return jsonify({'error': 'Invalid or expired token'}), 401
+        
+        request.current_user_id = user_id
+        return f(*args, **kwargs)
+    
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
+@jobs_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@require_auth
+def get_job(job_id):
+    """Status and result of a background job started by the current user"""
+    try:
+        job = db.session.get(Job, job_id)
+        
+        # Other users' jobs are reported as missing
+        if not job or job.user_id != request.current_user_id:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        response = jsonify(job.to_dict())
+        if job.status in ('queued', 'running'):
+            response.headers['Retry-After'] = '1'
+        return response, 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,98 @@
+from functools import wraps
+from flask import Blueprint, request, jsonify, current_app, send_file
+from src.models.user import db, User
+from src.routes.auth import verify_token
+from src.utils.catalog import catalog
+from src.utils.compression import compression_stats
+from src.utils.db_engine import pool_status
+from src.utils.jobs import queue_stats
+from src.utils.profiling import PROFILE_NAME_RE, list_profiles, profile_text
+from src.utils.slow_queries import slow_query_log
+import os
+import pstats
+
+metrics_bp = Blueprint('metrics', __name__)
+
+def require_admin(f):
+    """Decorator to require an authenticated user listed in ADMIN_EMAILS"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Authorization token required'}), 401
+        
+        user_id = verify_token(auth_header.split(' ')[1])
+        if not user_id:
+            return jsonify({'error': 'Invalid or expired token'}), 401
+        
+        user = User.query.get(user_id)
+        if not user or user.email not in current_app.config.get('ADMIN_EMAILS', ()):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        request.current_user_id = user_id
+        return f(*args, **kwargs)
+    
+    return decorated_function
+
+@metrics_bp.route('/metrics/compression', methods=['GET'])
+@require_admin
+def get_compression_metrics():
+    """Get response compression counters for this worker"""
+    return jsonify(compression_stats.to_dict()), 200
+
+@metrics_bp.route('/metrics/catalog', methods=['GET'])
+@require_admin
+def get_catalog_metrics():
+    """Get the internship catalog snapshot mapped by this worker"""
+    catalog.current()
+    return jsonify(catalog.stats()), 200
+
+@metrics_bp.route('/metrics/db-pool', methods=['GET'])
+@require_admin
+def get_db_pool_metrics():
+    """Get connection pool usage and checkout wait times for this worker"""
+    return jsonify({'engines': pool_status(db.engines)}), 200
+
+@metrics_bp.route('/metrics/jobs', methods=['GET'])
+@require_admin
+def get_job_metrics():
+    """Get background job queue depth and lag"""
+    return jsonify(queue_stats()), 200
+
+@metrics_bp.route('/metrics/slow-queries', methods=['GET'])
+@require_admin
+def get_slow_query_metrics():
+    """Get this worker's slow queries aggregated by fingerprint (?order=total_ms|count|max_ms|mean_ms)"""
+    order = request.args.get('order', 'total_ms')
+    if order not in ('total_ms', 'count', 'max_ms', 'mean_ms'):
+        return jsonify({'error': f'Unknown order: {order}'}), 400
+    
+    threshold = slow_query_log.threshold
+    return jsonify({
+        'threshold_ms': threshold * 1000 if threshold is not None else None,
+        'queries': slow_query_log.top(request.args.get('limit', 20, type=int), order)
+    }), 200
+
+@metrics_bp.route('/metrics/profiles', methods=['GET'])
+@require_admin
+def get_profiles():
+    """List request profiles stored by this worker's host"""
+    return jsonify({'profiles': list_profiles(current_app.config['PROFILE_DIR'])}), 200
+
+@metrics_bp.route('/metrics/profiles/<name>', methods=['GET'])
+@require_admin
+def get_profile(name):
+    """A stored profile as a pstats report (?sort=, ?limit=) or the raw file (?format=raw)"""
+    path = os.path.join(current_app.config['PROFILE_DIR'], name)
+    if not PROFILE_NAME_RE.match(name) or not os.path.isfile(path):
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    if request.args.get('format') == 'raw':
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True, download_name=name)
+    
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in pstats.Stats.sort_arg_dict_default:
+        return jsonify({'error': f'Unknown sort key: {sort}'}), 400
+    
+    report = profile_text(path, sort, request.args.get('limit', 60, type=int))
+    return current_app.response_class(report, mimetype='text/plain'), 200
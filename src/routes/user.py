@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import update
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import datetime
 from src.models.user import db, User, UserProfile
 from src.routes.auth import verify_token
+from src.models.routing import read_replica
+from src.utils.concurrency import version_etag, if_match_versions
 
 user_bp = Blueprint('user', __name__)
 
@@ -26,6 +31,7 @@ def require_auth(f):
 
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
 @require_auth
+@read_replica
 def get_user(user_id):
     """Get user by ID"""
     try:
@@ -98,7 +104,9 @@ def get_user_profile(user_id):
             db.session.commit()
             user.profile = profile
         
-        return jsonify(user.profile.to_dict()), 200
+        response = jsonify(user.profile.to_dict())
+        response.headers['ETag'] = version_etag(user.profile.version)
+        return response, 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -122,20 +130,75 @@ def update_user_profile(user_id):
         data = request.get_json()
         profile = user.profile
         
-        # Update profile fields
-        updatable_fields = [
-            'first_name', 'last_name', 'phone', 'linkedin_url', 
-            'github_url', 'portfolio_url', 'skills', 'education', 
-            'experience', 'bio', 'avatar_url'
-        ]
+        versions = if_match_versions()
+        if versions is not None and profile.version not in versions:
+            return jsonify({'error': 'Profile was modified by another request', 'version': profile.version}), 409
         
-        for field in updatable_fields:
+        # Update profile fields
+        for field in UserProfile.UPDATABLE_FIELDS:
             if field in data:
                 setattr(profile, field, data[field])
         
-        db.session.commit()
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            return jsonify({'error': 'Profile was modified by another request'}), 409
+        
+        response = jsonify(profile.to_dict())
+        response.headers['ETag'] = version_etag(profile.version)
+        return response, 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/users/<int:user_id>/profile', methods=['PATCH'])
+@require_auth
+def patch_user_profile(user_id):
+    """Partially update user profile with one UPDATE, guarded by If-Match"""
+    try:
+        if request.current_user_id != user_id:
+            return jsonify({'error': 'Access denied'}), 403
+        
+        data = request.get_json() or {}
+        values = {field: data[field] for field in UserProfile.UPDATABLE_FIELDS if field in data}
+        if not values:
+            return jsonify({'error': 'No updatable fields provided'}), 400
+        
+        conditions = [UserProfile.user_id == user_id]
+        versions = if_match_versions()
+        if versions is not None:
+            conditions.append(UserProfile.version.in_(versions))
+        
+        row = db.session.execute(
+            update(UserProfile)
+            .where(*conditions)
+            .values(**values, version=UserProfile.version + 1, updated_at=datetime.utcnow())
+            .returning(*UserProfile.__table__.c)
+            .execution_options(synchronize_session=False)
+        ).first()
+        
+        if row is not None:
+            db.session.commit()
+            profile_data = dict(row._mapping)
+        else:
+            db.session.rollback()
+            version = db.session.query(UserProfile.version).filter_by(user_id=user_id).scalar()
+            if version is not None or versions is not None:
+                return jsonify({'error': 'Profile was modified by another request', 'version': version}), 409
+            
+            # No profile yet: create it with the given fields
+            if not db.session.get(User, user_id):
+                return jsonify({'error': 'User not found'}), 404
+            profile = UserProfile(user_id=user_id, **values)
+            db.session.add(profile)
+            db.session.commit()
+            profile_data = profile.to_dict()
         
-        return jsonify(profile.to_dict()), 200
+        response = jsonify(profile_data)
+        response.headers['ETag'] = version_etag(profile_data['version'])
+        return response, 200
         
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,351 @@
+"""
+Application funnel analytics
+
+Funnels per company and per role (internship title) are computed from the
+application tracking events:
+
+    submitted -> under_review -> interview -> accepted
+
+An application counts for every stage up to the furthest one it reached, so
+an accepted application also passed review and interview. Its response time
+is the time from submission to the first employer status (any stage after
+submitted, or rejected).
+
+Events are read in bulk (hot table, SQLite shards and daily rollups) into
+NumPy columns and folded into per-application arrays with ufunc.at
+reductions (min of times, max of stages). The folds are idempotent and order
+independent, so an incremental refresh only reads the events and
+applications added since the last one, plus an overlap of recent ids to
+catch rows committed out of id order. Group funnels and medians are then
+recomputed from the per-application arrays with bincount and one sort.
+
+Each worker keeps the latest snapshot in memory and serves it as is; a
+background thread refreshes it every ANALYTICS_REFRESH_SECONDS and rebuilds it
+from scratch every ANALYTICS_FULL_REFRESH_SECONDS (deleted applications,
+renamed internships). Refresh queries go to the read replicas.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from flask import current_app, g
+from sqlalchemy import select
+
+from src.models.user import db, Application, ApplicationTracking, ApplicationTrackingDaily, Internship
+from src.utils.tracking_partitions import tracking_entity
+
+logger = logging.getLogger(__name__)
+
+FUNNEL_STAGES = ('submitted', 'under_review', 'interview', 'accepted')
+GROUPINGS = ('company', 'role')
+REJECTED = -2
+OTHER = -1
+# Status -> funnel stage index ('applied' is the submitted status of the enhanced API)
+STAGE_CODES = dict({stage: index for index, stage in enumerate(FUNNEL_STAGES)}, applied=0, rejected=REJECTED)
+# Recent ids re-read by every incremental refresh; rows may commit out of id order
+ID_OVERLAP = 1000
+
+
+def to_seconds(values):
+    """Epoch seconds of naive UTC datetimes as float64, NaN for missing values"""
+    stamps = np.array(values, dtype='datetime64[us]')
+    seconds = stamps.astype(np.int64) / 1e6
+    seconds[np.isnat(stamps)] = np.nan
+    return seconds
+
+
+def grouped_median(codes, values, groups):
+    """Median of values per group code, NaN for empty groups"""
+    counts = np.bincount(codes, minlength=groups)
+    if not len(values):
+        return np.full(groups, np.nan)
+    ordered = values[np.lexsort((values, codes))]
+    starts = np.cumsum(counts) - counts
+    lower = np.minimum(starts + (counts - 1) // 2, len(ordered) - 1)
+    upper = np.minimum(starts + counts // 2, len(ordered) - 1)
+    return np.where(counts > 0, (ordered[lower] + ordered[upper]) / 2, np.nan)
+
+
+class Labels:
+    """Names of a grouping and their integer codes"""
+
+    def __init__(self):
+        self.names = []
+        self.codes = {}
+
+    def encode(self, names):
+        codes = np.empty(len(names), dtype=np.int32)
+        for index, name in enumerate(names):
+            code = self.codes.get(name)
+            if code is None:
+                code = self.codes[name] = len(self.names)
+                self.names.append(name)
+            codes[index] = code
+        return codes
+
+
+class FunnelState:
+    """Per-application funnel columns, sorted by application id"""
+
+    def __init__(self):
+        self.application_ids = np.empty(0, dtype=np.int64)
+        self.group_codes = {grouping: np.empty(0, dtype=np.int32) for grouping in GROUPINGS}
+        self.labels = {grouping: Labels() for grouping in GROUPINGS}
+        self.submitted_at = np.empty(0)
+        self.responded_at = np.empty(0)
+        self.stage = np.empty(0, dtype=np.int8)
+        self.rejected = np.empty(0, dtype=bool)
+        self.last_application_id = 0
+        self.last_event_id = 0
+        self._max_event_id = 0
+        self._pending_event_id = float('inf')
+
+    def add_applications(self, rows):
+        """Append (id, applied_date, company, title) rows of applications not seen yet"""
+        if not rows:
+            return
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        new = ~np.isin(ids, self.application_ids)
+        rows = [row for row, keep in zip(rows, new) if keep]
+        if not rows:
+            return
+
+        ids = ids[new]
+        self.application_ids = np.concatenate([self.application_ids, ids])
+        self.group_codes['company'] = np.concatenate([
+            self.group_codes['company'], self.labels['company'].encode([row[2] for row in rows])
+        ])
+        self.group_codes['role'] = np.concatenate([
+            self.group_codes['role'], self.labels['role'].encode([row[3] for row in rows])
+        ])
+        # Every application was submitted when it was created
+        self.submitted_at = np.concatenate([self.submitted_at, to_seconds([row[1] for row in rows])])
+        self.responded_at = np.concatenate([self.responded_at, np.full(len(rows), np.inf)])
+        self.stage = np.concatenate([self.stage, np.zeros(len(rows), dtype=np.int8)])
+        self.rejected = np.concatenate([self.rejected, np.zeros(len(rows), dtype=bool)])
+        self.last_application_id = max(self.last_application_id, int(ids.max()))
+
+        if np.any(np.diff(self.application_ids) < 0):
+            order = np.argsort(self.application_ids, kind='stable')
+            self.application_ids = self.application_ids[order]
+            for grouping in GROUPINGS:
+                self.group_codes[grouping] = self.group_codes[grouping][order]
+            self.submitted_at = self.submitted_at[order]
+            self.responded_at = self.responded_at[order]
+            self.stage = self.stage[order]
+            self.rejected = self.rejected[order]
+
+    def fold_events(self, application_ids, statuses, times, event_ids=None):
+        """Fold event columns into the per-application arrays"""
+        stages = np.fromiter((STAGE_CODES.get(status, OTHER) for status in statuses), dtype=np.int8,
+                             count=len(statuses))
+        rows = np.searchsorted(self.application_ids, application_ids)
+        found = rows < len(self.application_ids)
+        found[found] = self.application_ids[rows[found]] == application_ids[found]
+
+        if event_ids is not None and len(event_ids):
+            self._max_event_id = max(self._max_event_id, int(event_ids.max()))
+            # Events of applications newer than the last load are read again next time
+            pending = ~found & (application_ids > self.last_application_id)
+            if pending.any():
+                self._pending_event_id = min(self._pending_event_id, int(event_ids[pending].min()))
+
+        rows, stages, times = rows[found], stages[found], times[found]
+        known = ~np.isnan(times)
+
+        submitted = (stages == 0) & known
+        np.minimum.at(self.submitted_at, rows[submitted], times[submitted])
+        funnel = stages >= 0
+        np.maximum.at(self.stage, rows[funnel], stages[funnel])
+        responses = ((stages > 0) | (stages == REJECTED)) & known
+        np.minimum.at(self.responded_at, rows[responses], times[responses])
+        self.rejected[rows[stages == REJECTED]] = True
+
+    def advance(self):
+        """Move the event watermark past the folded events, short of any still pending"""
+        self.last_event_id = max(self.last_event_id, int(min(self._max_event_id, self._pending_event_id - 1)))
+        self._pending_event_id = float('inf')
+
+    def groups(self, grouping):
+        """Funnel rows of every group of a grouping, largest first"""
+        codes = self.group_codes[grouping]
+        names = self.labels[grouping].names
+        count = len(names)
+        reached = [np.bincount(codes[self.stage >= index], minlength=count) for index in range(len(FUNNEL_STAGES))]
+        rejected = np.bincount(codes[self.rejected], minlength=count)
+
+        delays = self.responded_at - self.submitted_at
+        responded = np.isfinite(delays) & (delays >= 0)
+        response_counts = np.bincount(codes[responded], minlength=count)
+        medians = grouped_median(codes[responded], delays[responded], count)
+
+        rows = []
+        for code in np.argsort(-reached[0], kind='stable'):
+            if not reached[0][code]:
+                continue
+            rows.append(funnel_row(
+                names[code], [int(stage[code]) for stage in reached], int(rejected[code]),
+                int(response_counts[code]), medians[code]
+            ))
+        return rows
+
+    def overall(self):
+        """Funnel row over all applications"""
+        reached = [int(np.count_nonzero(self.stage >= index)) for index in range(len(FUNNEL_STAGES))]
+        delays = self.responded_at - self.submitted_at
+        delays = delays[np.isfinite(delays) & (delays >= 0)]
+        median = float(np.median(delays)) if len(delays) else np.nan
+        return funnel_row(None, reached, int(np.count_nonzero(self.rejected)), len(delays), median)
+
+
+def funnel_row(name, reached, rejected, responded, median_seconds):
+    """JSON-ready funnel of one group"""
+    return {
+        'name': name,
+        'applications': reached[0],
+        'funnel': dict(zip(FUNNEL_STAGES, reached)),
+        'conversion': {
+            stage: round(reached[index] / reached[index - 1], 4) if reached[index - 1] else None
+            for index, stage in enumerate(FUNNEL_STAGES) if index
+        },
+        'rejected': rejected,
+        'responded': responded,
+        'median_response_hours': None if np.isnan(median_seconds) else round(float(median_seconds) / 3600, 2)
+    }
+
+
+def application_rows(after_id=None):
+    """(id, applied_date, company, title) of applications, optionally only those after an id"""
+    query = select(Application.id, Application.applied_date, Internship.company, Internship.title).join(
+        Internship, Internship.id == Application.internship_id
+    )
+    if after_id is not None:
+        query = query.where(Application.id > after_id)
+    return db.session.execute(query).all()
+
+
+def event_chunks(query, batch_size):
+    """Columns of a (application_id, status, changed_at[, id]) query, batch_size rows at a time"""
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        columns = list(zip(*rows))
+        yield (
+            np.fromiter(columns[0], dtype=np.int64, count=len(rows)),
+            columns[1],
+            to_seconds(columns[2]),
+            np.fromiter(columns[3], dtype=np.int64, count=len(rows)) if len(columns) > 3 else None
+        )
+
+
+def build_state(batch_size):
+    """Read all applications and events into a new state"""
+    state = FunnelState()
+    state.add_applications(application_rows())
+
+    tracking = tracking_entity()
+    events = select(tracking.application_id, tracking.status, tracking.changed_at, tracking.id)
+    for chunk in event_chunks(events, batch_size):
+        state.fold_events(*chunk)
+
+    # Months past the rollup horizon only remain as daily summaries
+    daily = ApplicationTrackingDaily
+    for chunk in event_chunks(select(daily.application_id, daily.status, daily.first_changed_at), batch_size):
+        state.fold_events(*chunk)
+    state.advance()
+    return state
+
+
+def update_state(state, batch_size):
+    """Fold the applications and events added since the last refresh into a state"""
+    state.add_applications(application_rows(max(state.last_application_id - ID_OVERLAP, 0)))
+
+    # New events always land in the hot table (or current partition)
+    tracking = ApplicationTracking
+    events = select(tracking.application_id, tracking.status, tracking.changed_at, tracking.id).where(
+        tracking.id > max(state.last_event_id - ID_OVERLAP, 0)
+    )
+    for chunk in event_chunks(events, batch_size):
+        state.fold_events(*chunk)
+    state.advance()
+
+
+class FunnelAnalytics:
+    """Funnel snapshot of one worker and its background refresh"""
+
+    def __init__(self):
+        self.state = None
+        self.snapshot = None
+        self.full_refreshed_at = 0.0
+        self.full_refreshes = 0
+        self.pid = None
+        self._lock = threading.Lock()
+
+    def refresh(self, full=False):
+        """Refresh the snapshot; incremental unless full or the last full refresh is too old"""
+        config = current_app.config
+        batch_size = config['ANALYTICS_BATCH_SIZE']
+        with self._lock:
+            started = time.perf_counter()
+            full = full or self.state is None or \
+                time.monotonic() - self.full_refreshed_at >= config['ANALYTICS_FULL_REFRESH_SECONDS']
+            # Reads tolerate replica lag
+            previous = g.get('use_replica', False)
+            g.use_replica = True
+            try:
+                if full:
+                    state = build_state(batch_size)
+                    self.full_refreshed_at = time.monotonic()
+                    self.full_refreshes += 1
+                else:
+                    state = self.state
+                    update_state(state, batch_size)
+            finally:
+                g.use_replica = previous
+
+            self.state = state
+            self.snapshot = {
+                'generated_at': datetime.utcnow(),
+                'refresh': 'full' if full else 'incremental',
+                'refresh_ms': round((time.perf_counter() - started) * 1000, 2),
+                'version': f"{self.full_refreshes}-{state.last_application_id}-{state.last_event_id}",
+                'overall': state.overall(),
+                'groups': {grouping: state.groups(grouping) for grouping in GROUPINGS}
+            }
+            return self.snapshot
+
+    def current(self):
+        """Latest snapshot, built on the first call and refreshed in the background afterwards"""
+        self.ensure_started(current_app._get_current_object())
+        return self.snapshot or self.refresh()
+
+    def ensure_started(self, app):
+        """Start the refresh thread once per process (threads do not survive a fork)"""
+        if self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        threading.Thread(target=self._run, args=(app,), name='funnel-analytics', daemon=True).start()
+
+    def _run(self, app):
+        while True:
+            time.sleep(app.config['ANALYTICS_REFRESH_SECONDS'])
+            with app.app_context():
+                try:
+                    self.refresh()
+                except Exception:
+                    logger.exception('Funnel analytics refresh failed')
+                finally:
+                    db.session.remove()
+
+
+funnel_analytics = FunnelAnalytics()
+
+
+def init_analytics(app):
+    """Register the funnel analytics defaults on the app"""
+    app.config.setdefault('ANALYTICS_REFRESH_SECONDS', 60)
+    app.config.setdefault('ANALYTICS_FULL_REFRESH_SECONDS', 3600)
+    app.config.setdefault('ANALYTICS_MIN_GROUP_SIZE', 5)
+    app.config.setdefault('ANALYTICS_BATCH_SIZE', 50000)
@@ -6,6 +6,7 @@ import os
 from functools import wraps
 from flask import request, jsonify, current_app
 from src.models.user import User
+from src.utils.profiling import timed
 
 # JWT secret key (loaded from environment variables)
 JWT_SECRET = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -24,7 +25,8 @@ def token_required(f):
         try:
             if token.startswith("Bearer "):
                 token = token[7:]
-            data = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+            with timed('auth'):
+                data = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
             current_user = User.query.get(data["user_id"])
             if not current_user:
                 return jsonify({"message": "Invalid token"}), 401
@@ -49,7 +51,8 @@ def require_auth(f):
         
         token = auth_header.split(' ')[1]
         try:
-            data = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+            with timed('auth'):
+                data = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
             user_id = data.get("user_id")
             if not user_id:
                 return jsonify({'error': 'Invalid token'}), 401
@@ -70,7 +73,8 @@ def verify_token(token):
     Verify JWT token and return user_id
     """
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+        with timed('auth'):
+            payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
         return payload['user_id']
     except jwt.ExpiredSignatureError:
         return None
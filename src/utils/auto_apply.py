@@ -0,0 +1,217 @@
+"""
+Batch auto-apply: render a personalized cover letter per internship and create
+every application and its 'submitted' tracking entry in one transaction
+
+Cover letter templates are Jinja templates rendered in a sandbox (they may come
+from users) with the applicant's profile and the internship as context.
+Compiled templates are cached by source, so a batch compiles its template once
+per process. Large batches render on a process pool in chunks, since rendering
+is CPU-bound and would not run in parallel on threads. The rows are then
+written with one multi-row INSERT per table instead of one flush per
+application.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from itertools import repeat
+
+from flask import current_app
+from jinja2.sandbox import SandboxedEnvironment
+from sqlalchemy import insert, select
+
+from src.models.user import (
+    db, User, UserProfile, Internship, Application, ApplicationTracking, text_hash, intern_texts
+)
+from src.utils.events import event_bus
+from src.utils.jobs import register_task, after_commit
+
+AUTO_APPLY_MAX_INTERNSHIPS = 500
+# Batches up to this size are applied within the request, larger ones by a job
+AUTO_APPLY_SYNC_LIMIT = 25
+MAX_TEMPLATE_SIZE = 20 * 1024
+TEMPLATE_CACHE_SIZE = 128
+# Letters per pool task; smaller batches are rendered inline
+RENDER_CHUNK_SIZE = 100
+
+DEFAULT_TEMPLATE = """Dear {{ internship.company }} Hiring Team,
+
+I am writing to apply for the {{ internship.title }} position{% if internship.location %} in {{ internship.location }}{% endif %}.
+{%- if bio %}
+
+{{ bio }}
+{%- endif %}
+{%- if skills %}
+
+My skills include {{ skills }}, which I am eager to apply at {{ internship.company }}.
+{%- endif %}
+{%- if experience %}
+
+Experience: {{ experience }}
+{%- endif %}
+{%- if education %}
+
+Education: {{ education }}
+{%- endif %}
+
+Thank you for considering my application. I look forward to hearing from you.
+
+Sincerely,
+{{ name }}
+{%- if email %}
+{{ email }}
+{%- endif %}
+"""
+
+_environment = SandboxedEnvironment(autoescape=False, keep_trailing_newline=True)
+_pool = None
+_pool_pid = None
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(source):
+    """Compiled template for a source text (raises jinja2.TemplateSyntaxError)"""
+    return _environment.from_string(source)
+
+
+def render_chunk(source, contexts):
+    """Render one template for each context"""
+    template = compile_template(source)
+    return [template.render(context) for context in contexts]
+
+
+def render_pool(processes):
+    """Process pool for rendering, created once per process"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        # Workers only render templates, so forking a loaded app is cheap and
+        # avoids re-importing it; platforms without fork spawn fresh interpreters
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(method))
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def render_cover_letters(source, contexts, processes=0):
+    """Render a letter per context, on `processes` worker processes for large batches"""
+    if processes <= 1 or len(contexts) <= RENDER_CHUNK_SIZE:
+        return render_chunk(source, contexts)
+
+    chunks = [contexts[start:start + RENDER_CHUNK_SIZE] for start in range(0, len(contexts), RENDER_CHUNK_SIZE)]
+    letters = []
+    for rendered in render_pool(processes).map(render_chunk, repeat(source), chunks):
+        letters.extend(rendered)
+    return letters
+
+
+def cover_letter_context(user, profile, internship):
+    """Template variables for one letter (plain values, so they can be sent to the pool)"""
+    context = {field: getattr(profile, field) if profile else None for field in (
+        'first_name', 'last_name', 'phone', 'linkedin_url', 'github_url', 'portfolio_url',
+        'skills', 'education', 'experience', 'bio'
+    )}
+    full_name = ' '.join(filter(None, (context['first_name'], context['last_name'])))
+    context['name'] = full_name or user.name or user.email
+    context['email'] = user.email
+    context['internship'] = {field: getattr(internship, field) for field in (
+        'id', 'title', 'company', 'location', 'description', 'requirements', 'duration', 'salary_range'
+    )}
+    return context
+
+
+def auto_apply(user_id, internship_ids, template=None, resume_url=None, notes=None, processes=0):
+    """
+    Apply a user to internships with rendered cover letters
+    Adds the rows to the current transaction (the caller commits) and returns
+    {'applied': [{'application_id', 'internship_id'}], 'skipped': [{'internship_id', 'reason'}]}
+    """
+    source = template or DEFAULT_TEMPLATE
+    user = db.session.get(User, user_id)
+    profile = UserProfile.query.filter_by(user_id=user_id).first()
+
+    internship_ids = list(dict.fromkeys(internship_ids))
+    already_applied = set(db.session.scalars(
+        select(Application.internship_id).where(
+            Application.user_id == user_id, Application.internship_id.in_(internship_ids)
+        )
+    ))
+    internships = {
+        internship.id: internship
+        for internship in Internship.query.filter(
+            Internship.id.in_([i for i in internship_ids if i not in already_applied])
+        )
+    }
+
+    skipped = []
+    targets = []
+    for internship_id in internship_ids:
+        if internship_id in already_applied:
+            skipped.append({'internship_id': internship_id, 'reason': 'already_applied'})
+        elif internship_id not in internships:
+            skipped.append({'internship_id': internship_id, 'reason': 'not_found'})
+        else:
+            targets.append(internships[internship_id])
+
+    if not targets:
+        return {'applied': [], 'skipped': skipped}
+
+    letters = render_cover_letters(
+        source, [cover_letter_context(user, profile, internship) for internship in targets], processes
+    )
+
+    # Identical letters are stored once
+    texts = {text_hash(letter): letter for letter in letters}
+    if notes:
+        texts[text_hash(notes)] = notes
+    connection = db.session.connection()
+    intern_texts(connection, texts)
+
+    now = datetime.utcnow()
+    notes_hash = text_hash(notes) if notes else None
+    applications = Application.__table__
+    application_ids = db.session.execute(
+        insert(applications).returning(applications.c.id, sort_by_parameter_order=True),
+        [{
+            'user_id': user_id,
+            'internship_id': internship.id,
+            'status': 'submitted',
+            'applied_date': now,
+            'cover_letter_hash': text_hash(letter),
+            'resume_url': resume_url,
+            'notes_hash': notes_hash,
+            'version': 1,
+            'created_at': now,
+            'updated_at': now
+        } for internship, letter in zip(targets, letters)]
+    ).scalars().all()
+
+    tracking = ApplicationTracking.__table__
+    events = db.session.execute(
+        insert(tracking).returning(*tracking.c, sort_by_parameter_order=True),
+        [{
+            'application_id': application_id,
+            'status': 'submitted',
+            'notes': 'Application submitted',
+            'changed_by': user_id,
+            'changed_at': now
+        } for application_id in application_ids]
+    ).mappings().all()
+
+    events = [dict(event) for event in events]
+    after_commit(lambda: [event_bus.publish(user_id, event) for event in events])
+
+    return {
+        'applied': [
+            {'application_id': application_id, 'internship_id': internship.id}
+            for application_id, internship in zip(application_ids, targets)
+        ],
+        'skipped': skipped
+    }
+
+
+@register_task('auto_apply')
+def auto_apply_task(user_id, internship_ids, template=None, resume_url=None, notes=None):
+    """Job: apply to a large batch of internships"""
+    processes = current_app.config.get('AUTO_APPLY_RENDER_PROCESSES', 0)
+    return auto_apply(user_id, internship_ids, template, resume_url, notes, processes)
@@ -0,0 +1,222 @@
+"""
+Shared-memory internship catalog
+
+scripts/build_catalog.py writes a read-only snapshot of the internships to
+CATALOG_PATH and every worker maps the same file, so the catalog lives once
+in the page cache instead of once per worker, and internship lookups by id
+need no database query. The file is laid out as
+
+    header   magic, record count, build time (epoch ms)
+    ids      int64 internship ids, ascending
+    offsets  uint64 start of each record in the data section, plus its end
+    data     each internship's to_dict() as encoded JSON, back to back
+
+Lookups binary-search the ids through a memoryview of the mapping and answer
+with the stored JSON bytes as they are. The builder writes a temporary file
+and renames it over the old one; workers notice the new file (checked at
+most every CATALOG_CHECK_INTERVAL seconds) and map it, while requests still
+reading the previous mapping keep their unlinked copy until they finish.
+Snapshots older than CATALOG_MAX_AGE_SECONDS are ignored, and ids missing
+from the snapshot (internships created after the build) fall back to the
+database.
+"""
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from src.models.user import db, Internship
+
+logger = logging.getLogger(__name__)
+MAGIC = b'AICATLG1'
+# Native byte order: the file is built and mapped on the same host
+HEADER = struct.Struct('=8sQq')
+ID_SIZE = 8
+
+
+class CatalogSnapshot:
+    """One mapped catalog file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as catalog_file:
+            self.stat = os.fstat(catalog_file.fileno())
+            self.map = mmap.mmap(catalog_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, built_at_ms = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not an internship catalog')
+        self.count = count
+        self.built_at = built_at_ms / 1000
+
+        view = memoryview(self.map)
+        ids_start = HEADER.size
+        offsets_start = ids_start + count * ID_SIZE
+        data_start = offsets_start + (count + 1) * ID_SIZE
+        self.ids = view[ids_start:offsets_start].cast('q')
+        self.offsets = view[offsets_start:data_start].cast('Q')
+        self.data = view[data_start:]
+
+    def get(self, internship_id):
+        """Encoded JSON of an internship, or None when it is not in the snapshot"""
+        index = bisect_left(self.ids, internship_id)
+        if index == self.count or self.ids[index] != internship_id:
+            return None
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes()
+
+
+class CatalogReader:
+    """Current snapshot of a catalog file, remapped when the builder replaces it"""
+
+    def __init__(self):
+        self.path = None
+        self.check_interval = 1.0
+        self.max_age = None
+        self.snapshot = None
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def configure(self, path, check_interval, max_age):
+        self.path = path
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.snapshot = None
+        self._checked_at = float('-inf')
+
+    def current(self):
+        """The mapped snapshot, or None when there is no usable catalog file"""
+        if self.path is None:
+            return None
+
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            with self._lock:
+                if now - self._checked_at >= self.check_interval:
+                    self._checked_at = now
+                    self._reload()
+
+        snapshot = self.snapshot
+        if snapshot is None or (self.max_age and time.time() - snapshot.built_at > self.max_age):
+            return None
+        return snapshot
+
+    def _reload(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.snapshot = None
+            return
+
+        snapshot = self.snapshot
+        if snapshot is not None and (snapshot.stat.st_ino, snapshot.stat.st_mtime_ns) == (stat.st_ino, stat.st_mtime_ns):
+            return
+        try:
+            # The old mapping is released once no request holds it anymore
+            self.snapshot = CatalogSnapshot(self.path)
+        except (OSError, ValueError, struct.error):
+            logger.exception('Cannot map the internship catalog %s', self.path)
+            self.snapshot = None
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {
+            'path': self.path,
+            'mapped': snapshot is not None,
+            'internships': snapshot.count if snapshot else 0,
+            'bytes': len(snapshot.map) if snapshot else 0,
+            'age_seconds': round(time.time() - snapshot.built_at, 1) if snapshot else None
+        }
+
+
+catalog = CatalogReader()
+
+
+def catalog_lookup(ids):
+    """{id: encoded JSON} of the ids found in the current snapshot"""
+    snapshot = catalog.current()
+    if snapshot is None:
+        return {}
+    found = {}
+    for internship_id in ids:
+        body = snapshot.get(internship_id)
+        if body is not None:
+            found[internship_id] = body
+    return found
+
+
+def write_catalog(path, records):
+    """
+    Write (id, encoded JSON) records, ascending by id, to path atomically
+    Returns the number of records
+    """
+    ids = array('q')
+    offsets = array('Q', [0])
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    # Records are spooled to a temporary data file first, since the offsets precede them
+    with tempfile.TemporaryFile(dir=directory) as data:
+        for internship_id, body in records:
+            ids.append(internship_id)
+            data.write(body)
+            offsets.append(offsets[-1] + len(body))
+
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.catalog-')
+        try:
+            with os.fdopen(descriptor, 'wb') as catalog_file:
+                catalog_file.write(HEADER.pack(MAGIC, len(ids), int(time.time() * 1000)))
+                ids.tofile(catalog_file)
+                offsets.tofile(catalog_file)
+                data.seek(0)
+                while chunk := data.read(1024 * 1024):
+                    catalog_file.write(chunk)
+                catalog_file.flush()
+                os.fsync(catalog_file.fileno())
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    return len(ids)
+
+
+def catalog_records(json_provider, batch_size=1000):
+    """(id, encoded to_dict() JSON) of every internship, ascending by id"""
+    last_id = 0
+    while True:
+        internships = Internship.query.filter(Internship.id > last_id).order_by(Internship.id).limit(batch_size).all()
+        if not internships:
+            return
+        for internship in internships:
+            yield internship.id, json_provider.dumps(internship.to_dict()).encode('utf-8')
+        last_id = internships[-1].id
+        db.session.expunge_all()
+
+
+def build_catalog(app):
+    """Rebuild the catalog file of the app; only one builder runs at a time"""
+    path = app.config['CATALOG_PATH']
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f'{path}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        with app.app_context():
+            try:
+                return write_catalog(path, catalog_records(app.json))
+            finally:
+                db.session.remove()
+
+
+def init_catalog(app):
+    """Configure the catalog reader from the app config"""
+    app.config.setdefault('CATALOG_PATH', os.path.join(app.root_path, 'catalog', 'internships.bin'))
+    app.config.setdefault('CATALOG_CHECK_INTERVAL', 1.0)
+    app.config.setdefault('CATALOG_MAX_AGE_SECONDS', 900)
+
+    catalog.configure(app.config['CATALOG_PATH'], app.config['CATALOG_CHECK_INTERVAL'],
+                      app.config['CATALOG_MAX_AGE_SECONDS'])
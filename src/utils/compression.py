@@ -0,0 +1,191 @@
+"""
+Response compression negotiated via Accept-Encoding
+
+gzip is always available; brotli and zstd are used when the brotli and
+zstandard packages are installed. Buffered responses are compressed when
+they exceed COMPRESS_MIN_SIZE, generator responses are compressed chunk by
+chunk when COMPRESS_STREAMING is enabled.
+"""
+import gzip
+import threading
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+DEFAULT_MIMETYPES = (
+    'application/json', 'text/html', 'text/plain', 'text/css',
+    'text/javascript', 'application/javascript', 'image/svg+xml'
+)
+
+# Server preference when the client accepts several encodings equally
+ENCODING_PREFERENCE = ('zstd', 'br', 'gzip')
+
+
+def available_encodings():
+    """Encodings supported by the installed libraries"""
+    encodings = ['gzip']
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    return encodings
+
+
+class CompressionStats:
+    """Per-encoding counters of compressed responses and bytes saved"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, encoding, bytes_in, bytes_out, responses=1):
+        with self._lock:
+            stats = self._stats.setdefault(encoding, {'responses': 0, 'bytes_in': 0, 'bytes_out': 0})
+            stats['responses'] += responses
+            stats['bytes_in'] += bytes_in
+            stats['bytes_out'] += bytes_out
+
+    def to_dict(self):
+        with self._lock:
+            encodings = {
+                encoding: dict(stats, bytes_saved=stats['bytes_in'] - stats['bytes_out'])
+                for encoding, stats in self._stats.items()
+            }
+        return {
+            'encodings': encodings,
+            'bytes_saved': sum(stats['bytes_saved'] for stats in encodings.values())
+        }
+
+
+compression_stats = CompressionStats()
+
+
+def choose_encoding(accept_encodings, encodings):
+    """Best encoding by client quality, ties broken by server preference"""
+    best = None
+    best_quality = 0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in encodings:
+            continue
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_data(data, encoding, config):
+    """Compress a complete body"""
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=config['COMPRESS_ZSTD_LEVEL']).compress(data)
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BR_LEVEL'])
+    return gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'])
+
+
+def compress_stream(chunks, encoding, config):
+    """Compress a generator body, flushing after every chunk so it is sent promptly"""
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=config['COMPRESS_ZSTD_LEVEL']).compressobj()
+        process = compressor.compress
+        flush = lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        finish = compressor.flush
+    elif encoding == 'br':
+        compressor = brotli.Compressor(quality=config['COMPRESS_BR_LEVEL'])
+        process = compressor.process
+        flush = compressor.flush
+        finish = compressor.finish
+    else:
+        compressor = zlib.compressobj(config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+        process = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+
+    bytes_in = 0
+    bytes_out = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            bytes_in += len(chunk)
+            out = process(chunk) + flush()
+            bytes_out += len(out)
+            if out:
+                yield out
+
+        out = finish()
+        bytes_out += len(out)
+        yield out
+    finally:
+        compression_stats.record(encoding, bytes_in, bytes_out)
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def init_compression(app):
+    """Register the compression hook and its defaults on the app"""
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+    app.config.setdefault('COMPRESS_ZSTD_LEVEL', 3)
+    app.config.setdefault('COMPRESS_STREAMING', True)
+    app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES)
+    app.config.setdefault('COMPRESS_ALGORITHMS', available_encodings())
+
+    encodings = [encoding for encoding in app.config['COMPRESS_ALGORITHMS'] if encoding in available_encodings()]
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+
+        if (
+            not config['COMPRESS_ENABLED']
+            or response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in config['COMPRESS_MIMETYPES']
+            or request.method == 'HEAD'
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings, encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            if not config['COMPRESS_STREAMING']:
+                return response
+            response.response = compress_stream(response.response, encoding, config)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < config['COMPRESS_MIN_SIZE']:
+                return response
+
+            compressed = compress_data(data, encoding, config)
+            if len(compressed) >= len(data):
+                return response
+
+            response.set_data(compressed)
+            compression_stats.record(encoding, len(data), len(compressed))
+
+        response.headers['Content-Encoding'] = encoding
+
+        # A strong validator must differ between representations
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f'{etag}-{encoding}')
+
+        return response
@@ -0,0 +1,23 @@
+"""
+Optimistic concurrency helpers
+
+Versioned rows are exposed with a weak ETag of their version (W/"3"). Writes
+send it back in If-Match; the UPDATE only matches while the row still has that
+version, otherwise the client gets 409 and must re-read.
+"""
+from flask import request
+
+
+def version_etag(version):
+    """Weak ETag for a row version"""
+    return f'W/"{version}"'
+
+
+def if_match_versions():
+    """
+    Versions accepted by the request's If-Match header
+    None when the header is absent or '*' (any version); an empty set never matches
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    return {int(tag) for tag in request.if_match.as_set(include_weak=True) if tag.isdigit()}
@@ -0,0 +1,193 @@
+"""
+Internship feed crawler
+
+Sources (CrawlSource rows) are JSON feeds paginated by cursor:
+
+    GET <url>?cursor=<cursor>
+    {"items": [{"id": ..., "title": ..., "company": ..., ...}], "next_cursor": "..." | null}
+
+Feeds are fetched concurrently with aiohttp over one connection pool limited
+in total and per host. The first page of every crawl is a conditional request
+(If-None-Match / If-Modified-Since) so unchanged feeds cost a 304. Each source
+remembers the cursor where its last crawl stopped, and the postings it returns
+are upserted into internships in batches keyed by (source_id, external_id).
+"""
+import asyncio
+import json
+from datetime import date, datetime
+
+import aiohttp
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.user import db, CrawlSource, Internship
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+CRAWL_CONCURRENCY = 20
+CRAWL_PER_HOST = 4
+CRAWL_TIMEOUT = 30
+CRAWL_MAX_PAGES = 20
+UPSERT_BATCH_SIZE = 500
+USER_AGENT = 'AutoIntern-Crawler/1.0'
+
+# Feed item keys copied onto Internship columns
+ITEM_FIELDS = (
+    'title', 'company', 'location', 'description', 'url', 'requirements',
+    'salary_range', 'duration', 'application_deadline'
+)
+
+
+class CrawlResult:
+    """Outcome of fetching one source"""
+
+    def __init__(self, source_id, cursor):
+        self.source_id = source_id
+        self.cursor = cursor
+        self.etag = None
+        self.last_modified = None
+        self.status = None
+        self.error = None
+        self.not_modified = False
+        self.pages = 0
+        self.items = []
+
+
+def normalize_item(item):
+    """Column values for a feed item, or None if it lacks the required fields"""
+    if not isinstance(item, dict) or item.get('id') is None or not item.get('title') or not item.get('company'):
+        return None
+
+    values = {field: item.get(field) for field in ITEM_FIELDS}
+    values['external_id'] = str(item['id'])
+
+    deadline = values['application_deadline']
+    if isinstance(deadline, str):
+        try:
+            values['application_deadline'] = date.fromisoformat(deadline[:10])
+        except ValueError:
+            values['application_deadline'] = None
+    elif not isinstance(deadline, date):
+        values['application_deadline'] = None
+
+    return values
+
+
+async def fetch_source(session, source, max_pages=CRAWL_MAX_PAGES):
+    """Fetch the pages of one source from its stored cursor on"""
+    result = CrawlResult(source['id'], source['cursor'])
+    loads = orjson.loads if orjson is not None else json.loads
+
+    try:
+        while result.pages < max_pages:
+            headers = {}
+            if result.pages == 0:
+                if source['etag']:
+                    headers['If-None-Match'] = source['etag']
+                if source['last_modified']:
+                    headers['If-Modified-Since'] = source['last_modified']
+            params = {'cursor': result.cursor} if result.cursor else None
+
+            async with session.get(source['url'], params=params, headers=headers) as response:
+                result.status = response.status
+                if response.status == 304:
+                    result.not_modified = True
+                    result.etag, result.last_modified = source['etag'], source['last_modified']
+                    break
+                response.raise_for_status()
+                page = loads(await response.read())
+                result.etag = response.headers.get('ETag')
+                result.last_modified = response.headers.get('Last-Modified')
+
+            result.pages += 1
+            items = page.get('items') or []
+            result.items.extend(filter(None, map(normalize_item, items)))
+
+            next_cursor = page.get('next_cursor')
+            if not items or not next_cursor:
+                break
+
+            # Validators belong to the page they came from, not the next one
+            result.cursor = next_cursor
+            result.etag = result.last_modified = None
+
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, AttributeError) as e:
+        result.error = f'{type(e).__name__}: {e}'[:2000]
+        if result.pages == 0:
+            result.etag, result.last_modified = source['etag'], source['last_modified']
+
+    return result
+
+
+async def fetch_sources(sources, concurrency=CRAWL_CONCURRENCY, per_host=CRAWL_PER_HOST,
+                        timeout=CRAWL_TIMEOUT, max_pages=CRAWL_MAX_PAGES):
+    """Fetch every source concurrently over a shared, host-limited connection pool"""
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        headers={'User-Agent': USER_AGENT, 'Accept': 'application/json'}
+    ) as session:
+        return await asyncio.gather(*(fetch_source(session, source, max_pages) for source in sources))
+
+
+def upsert_internships(source_id, items, batch_size=UPSERT_BATCH_SIZE):
+    """Insert or update the postings of a source in batches"""
+    insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+    now = datetime.utcnow()
+
+    # A statement may not touch the same row twice; keep the latest copy of each posting
+    rows = list({item['external_id']: item for item in items}.values())
+
+    for start in range(0, len(rows), batch_size):
+        batch = [dict(row, source_id=source_id, created_at=now, updated_at=now) for row in rows[start:start + batch_size]]
+        statement = insert(Internship.__table__).values(batch)
+        statement = statement.on_conflict_do_update(
+            index_elements=['source_id', 'external_id'],
+            set_={**{field: statement.excluded[field] for field in ITEM_FIELDS}, 'updated_at': now}
+        )
+        db.session.execute(statement)
+
+    return len(rows)
+
+
+def crawl_sources(source_ids=None, **options):
+    """Crawl enabled sources (or the given ones) and store what they returned"""
+    query = CrawlSource.query.filter_by(enabled=True)
+    if source_ids:
+        query = query.filter(CrawlSource.id.in_(source_ids))
+    sources = [
+        {'id': s.id, 'url': s.url, 'etag': s.etag, 'last_modified': s.last_modified, 'cursor': s.cursor}
+        for s in query.order_by(CrawlSource.id)
+    ]
+    if not sources:
+        return []
+
+    results = asyncio.run(fetch_sources(sources, **options))
+
+    summary = []
+    for result in results:
+        upserted = upsert_internships(result.source_id, result.items)
+
+        source = db.session.get(CrawlSource, result.source_id)
+        source.cursor = result.cursor
+        source.etag = result.etag
+        source.last_modified = result.last_modified
+        source.last_status = result.status
+        source.last_error = result.error
+        source.last_crawled_at = datetime.utcnow()
+        source.items_ingested += upserted
+        db.session.commit()
+
+        summary.append({
+            'source_id': result.source_id,
+            'status': result.status,
+            'not_modified': result.not_modified,
+            'pages': result.pages,
+            'upserted': upserted,
+            'error': result.error
+        })
+
+    return summary
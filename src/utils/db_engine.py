@@ -0,0 +1,239 @@
+"""
+Database engine profiles
+
+SQLite: every connection is switched to WAL with a busy timeout, relaxed
+fsync (synchronous=NORMAL), memory-mapped I/O, a sized page cache and
+foreign keys. A background thread per worker runs PRAGMA optimize and WAL
+checkpoints periodically.
+
+Postgres: pool size, overflow, recycle, pre-ping, checkout timeout and a
+per-statement timeout come from the environment, and the pool records how
+long requests wait for a connection.
+"""
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.pool import QueuePool
+
+from src.models.user import db
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the pool wait histogram buckets; the last bucket is open-ended
+POOL_WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+SQLITE_DEFAULTS = {
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,
+    'SQLITE_SYNCHRONOUS': 'NORMAL',
+    'SQLITE_MMAP_SIZE': 256 * 1024 * 1024,
+    'SQLITE_CACHE_SIZE_KB': 64 * 1024,
+    'SQLITE_OPTIMIZE_INTERVAL': 3600,
+    'SQLITE_CHECKPOINT_INTERVAL': 300,
+}
+
+
+def sqlite_pragmas(config):
+    """PRAGMA statements run on every new SQLite connection"""
+    return [
+        'PRAGMA journal_mode=WAL',
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_SIZE_KB'])}",
+        'PRAGMA temp_store=MEMORY',
+        'PRAGMA foreign_keys=ON',
+    ]
+
+
+def configure_sqlite_engine(engine, config=None):
+    """Apply the SQLite profile to every connection the engine opens"""
+    config = config or {}
+    settings = {key: config.get(key, default) for key, default in SQLITE_DEFAULTS.items()}
+    pragmas = sqlite_pragmas(settings)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def is_file_sqlite(engine):
+    """True for SQLite engines backed by a file (WAL does not apply to :memory:)"""
+    database = engine.url.database
+    return engine.dialect.name == 'sqlite' and bool(database) and database != ':memory:'
+
+
+class SqliteMaintenance:
+    """Background thread running PRAGMA optimize and WAL checkpoints"""
+
+    def __init__(self, engines, optimize_interval, checkpoint_interval):
+        self.engines = engines
+        self.optimize_interval = optimize_interval
+        self.checkpoint_interval = checkpoint_interval
+        self.pid = None
+
+    def ensure_started(self):
+        """Start the thread once per process (threads do not survive a fork)"""
+        if self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        threading.Thread(target=self._run, name='sqlite-maintenance', daemon=True).start()
+
+    def run_once(self, optimize=False):
+        """Checkpoint the WAL, and optimize if requested, on every engine"""
+        for engine in self.engines:
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text('PRAGMA wal_checkpoint(PASSIVE)'))
+                    if optimize:
+                        connection.execute(text('PRAGMA optimize'))
+            except Exception:
+                logger.exception('SQLite maintenance failed for %s', engine.url)
+
+    def _run(self):
+        next_optimize = time.monotonic() + self.optimize_interval
+        while True:
+            time.sleep(self.checkpoint_interval)
+            optimize = time.monotonic() >= next_optimize
+            if optimize:
+                next_optimize = time.monotonic() + self.optimize_interval
+            self.run_once(optimize=optimize)
+
+
+def init_sqlite_profile(app):
+    """
+    Apply the SQLite profile to every file-backed SQLite engine of the app
+    Call after db.init_app and before the first connection is opened
+    """
+    for key, value in SQLITE_DEFAULTS.items():
+        app.config.setdefault(key, value)
+
+    with app.app_context():
+        engines = [engine for engine in db.engines.values() if is_file_sqlite(engine)]
+
+    if not engines:
+        return
+
+    for engine in engines:
+        configure_sqlite_engine(engine, app.config)
+
+    maintenance = SqliteMaintenance(
+        engines, app.config['SQLITE_OPTIMIZE_INTERVAL'], app.config['SQLITE_CHECKPOINT_INTERVAL']
+    )
+
+    @app.before_request
+    def start_sqlite_maintenance():
+        maintenance.ensure_started()
+
+
+class PoolWaitStats:
+    """Histogram of the time spent waiting for a pooled connection"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(POOL_WAIT_BUCKETS_MS) + 1)
+        self.count = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, wait_ms, timed_out=False):
+        with self._lock:
+            index = next(
+                (i for i, bound in enumerate(POOL_WAIT_BUCKETS_MS) if wait_ms <= bound),
+                len(POOL_WAIT_BUCKETS_MS)
+            )
+            self.buckets[index] += 1
+            self.count += 1
+            self.total_ms += wait_ms
+            self.max_ms = max(self.max_ms, wait_ms)
+            if timed_out:
+                self.timeouts += 1
+
+    def to_dict(self):
+        with self._lock:
+            labels = [f'<={bound}ms' for bound in POOL_WAIT_BUCKETS_MS] + [f'>{POOL_WAIT_BUCKETS_MS[-1]}ms']
+            return {
+                'checkouts': self.count,
+                'timeouts': self.timeouts,
+                'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0,
+                'max_ms': round(self.max_ms, 3),
+                'histogram': dict(zip(labels, self.buckets))
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.wait_stats.record((time.perf_counter() - start) * 1000)
+        return connection
+
+    def recreate(self):
+        # Keep the history when the pool is replaced after a disconnect
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+def pool_options_from_env(url, environ=None):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a Postgres DATABASE_URL
+    Other databases keep the Flask-SQLAlchemy defaults
+    """
+    environ = os.environ if environ is None else environ
+    if not url or not url.startswith(('postgres://', 'postgresql')):
+        return {}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'pool_timeout': float(environ.get('DB_POOL_TIMEOUT', 30)),
+    }
+
+    statement_timeout = int(environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    if statement_timeout > 0:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+
+    return options
+
+
+def pool_status(engines):
+    """Checked-out/idle connections and wait times for each engine's pool"""
+    status = {}
+    for name, engine in engines.items():
+        pool = engine.pool
+        entry = {'pool': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+            })
+        if isinstance(pool, InstrumentedQueuePool):
+            entry['wait'] = pool.wait_stats.to_dict()
+        status[name or 'default'] = entry
+    return status
@@ -0,0 +1,97 @@
+"""
+Delta sync helpers: return rows changed or deleted since a sync token
+
+A sync token is an opaque cursor over (updated_at, id) of the last row the
+client has seen plus the id of the last tombstone it has seen.
+
+updated_at and tombstone ids are assigned before a transaction commits, so a
+transaction committing late can add rows behind a token that was already
+handed out. Tokens that end a sync therefore stop SYNC_OVERLAP_SECONDS before
+the time of the read: rows changed (and tombstones written) within that
+window are returned again by the next sync, and clients apply them by id, so
+the repeat is harmless. Pages with has_more advance past everything they
+returned, so paging always makes progress.
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from src.models.user import Tombstone
+from src.utils.pagination import encode_cursor, decode_cursor
+
+SYNC_PAGE_SIZE = 200
+# Longest a write transaction may take from setting updated_at to committing
+SYNC_OVERLAP_SECONDS = 30
+
+
+def overlap_start():
+    """Start of the window whose changes may still be uncommitted"""
+    overlap = current_app.config.get('SYNC_OVERLAP_SECONDS', SYNC_OVERLAP_SECONDS)
+    return datetime.utcnow() - timedelta(seconds=overlap)
+
+
+def settled_tombstone_id(tombstone_query, settled_before):
+    """Id of the last tombstone written before the overlap window (0 if none)"""
+    settled = tombstone_query.with_entities(Tombstone.id).filter(
+        Tombstone.deleted_at < settled_before
+    ).order_by(Tombstone.id.desc()).first()
+    return settled.id if settled else 0
+
+
+def settled_token(updated_at, last_id, tombstone_id, tombstone_query, settled_before):
+    """Token at the given position, moved back to the start of the overlap window"""
+    if updated_at >= settled_before:
+        updated_at, last_id = settled_before, 0
+    tombstone_id = min(tombstone_id, settled_tombstone_id(tombstone_query, settled_before))
+    return encode_cursor(updated_at, last_id, tombstone_id)
+
+
+def current_sync_token(query, model, tombstone_query):
+    """Token representing the current state of the rows matched by query"""
+    settled_before = overlap_start()
+    latest = query.order_by(None).with_entities(model.updated_at, model.id).order_by(
+        model.updated_at.desc(), model.id.desc()
+    ).first()
+    latest_tombstone = tombstone_query.with_entities(Tombstone.id).order_by(Tombstone.id.desc()).first()
+
+    return settled_token(
+        latest.updated_at if latest else datetime.min,
+        latest.id if latest else 0,
+        latest_tombstone.id if latest_tombstone else 0,
+        tombstone_query, settled_before
+    )
+
+
+def delta_page(query, model, tombstone_query, token, page_size=SYNC_PAGE_SIZE):
+    """
+    Fetch rows updated and ids deleted after the token, oldest change first
+    Returns (rows, deleted_ids, next_token, has_more); rows changed within the
+    overlap window are returned again by the sync after the last page
+    Raises ValueError if the token is malformed
+    """
+    updated_at, last_id, tombstone_id = decode_cursor(token, datetime, int, int)
+    settled_before = overlap_start()
+
+    rows = query.order_by(None).filter(
+        (model.updated_at > updated_at) |
+        ((model.updated_at == updated_at) & (model.id > last_id))
+    ).order_by(model.updated_at, model.id).limit(page_size + 1).all()
+
+    tombstones = tombstone_query.filter(Tombstone.id > tombstone_id).order_by(
+        Tombstone.id
+    ).limit(page_size + 1).all()
+
+    has_more = len(rows) > page_size or len(tombstones) > page_size
+    rows = rows[:page_size]
+    tombstones = tombstones[:page_size]
+
+    if rows:
+        updated_at, last_id = rows[-1].updated_at, rows[-1].id
+    if tombstones:
+        tombstone_id = tombstones[-1].id
+
+    if has_more:
+        next_token = encode_cursor(updated_at, last_id, tombstone_id)
+    else:
+        next_token = settled_token(updated_at, last_id, tombstone_id, tombstone_query, settled_before)
+    return rows, [tombstone.entity_id for tombstone in tombstones], next_token, has_more
@@ -0,0 +1,56 @@
+"""
+In-process event bus used to push application tracking events to SSE streams
+
+Every worker process has a single bus. Events written by other workers never
+reach it, so subscribers also poll the database (see the SSE endpoint).
+"""
+import queue
+import threading
+from collections import defaultdict
+
+# Events buffered per subscriber before new ones are dropped
+# (a subscriber that falls behind catches up from the database)
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class EventBus:
+    """Fan out events to the subscribers registered for a key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, key):
+        """Register a subscriber and return the queue it receives events on"""
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[key].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, key, subscriber):
+        """Remove a subscriber previously returned by subscribe"""
+        with self._lock:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[key]
+
+    def publish(self, key, event):
+        """Deliver an event to every subscriber of key without blocking"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                pass
+
+
+event_bus = EventBus()
+
+
+def publish_tracking_event(user_id, tracking):
+    """Publish a committed ApplicationTracking row to the owner's streams"""
+    event_bus.publish(user_id, tracking.to_dict())
@@ -0,0 +1,91 @@
+"""
+Sparse fieldsets: parse ?fields= and restrict the SELECT to the requested columns
+"""
+from sqlalchemy.orm import load_only, selectinload
+
+from src.models.user import Internship, Application
+
+
+def parse_fields(raw, allowed):
+    """
+    Parse a comma-separated fields parameter
+    Returns None when no fields were requested; 'id' is always included
+    Raises ValueError on unknown fields
+    """
+    if not raw:
+        return None
+    
+    fields = ['id']
+    for field in raw.split(','):
+        field = field.strip()
+        if not field or field in fields:
+            continue
+        if field not in allowed:
+            raise ValueError(f'Unknown field: {field}')
+        fields.append(field)
+    
+    return fields
+
+
+def parse_application_fields(raw):
+    """
+    Parse fields for applications, where 'internship.<name>' selects embedded internship fields
+    Returns (application_fields, internship_fields); either may be None for "all"
+    """
+    if not raw:
+        return None, None
+    
+    top_level = []
+    nested = []
+    for field in raw.split(','):
+        field = field.strip()
+        if field.startswith('internship.'):
+            nested.append(field[len('internship.'):])
+        elif field:
+            top_level.append(field)
+    
+    if nested and 'internship' not in top_level:
+        top_level.append('internship')
+    
+    fields = parse_fields(','.join(top_level), Application.SERIALIZED_FIELDS)
+    internship_fields = parse_fields(','.join(nested), Internship.SERIALIZED_FIELDS)
+    return fields, internship_fields
+
+
+def internship_load_options(fields):
+    """Query options deferring every internship column that was not requested"""
+    if fields is None:
+        return []
+    return [load_only(*[getattr(Internship, field) for field in fields])]
+
+
+def application_load_options(fields, internship_fields):
+    """
+    Query options for applications: defer unrequested columns and load the
+    embedded internship and text bodies (if requested) in one extra IN query
+    each instead of per row
+    """
+    options = []
+    
+    if fields is not None:
+        columns = [field for field in fields if field != 'internship']
+        if 'internship' in fields and 'internship_id' not in columns:
+            columns.append('internship_id')
+        # Text fields are selected by their hash column
+        columns = [f'{field}_hash' if field in Application.TEXT_FIELDS else field for field in columns]
+        options.append(load_only(*[getattr(Application, field) for field in columns]))
+    
+    # Requested text bodies are fetched in one IN query per field
+    for field in Application.TEXT_FIELDS:
+        if fields is None or field in fields:
+            options.append(selectinload(getattr(Application, f'{field}_blob')))
+    
+    if fields is None or 'internship' in fields:
+        internship_loader = selectinload(Application.internship)
+        if internship_fields is not None:
+            internship_loader = internship_loader.load_only(
+                *[getattr(Internship, field) for field in internship_fields]
+            )
+        options.append(internship_loader)
+    
+    return options
@@ -0,0 +1,196 @@
+"""
+Content-addressed file storage for uploads
+
+Multipart bodies are decoded incrementally from the request stream: file data
+is written to a temporary file chunk by chunk while it is hashed, so memory use
+does not depend on the upload size and oversized uploads are rejected as soon
+as they cross the limit. Finished files are stored once per SHA-256 under
+<folder>/ab/cd/<sha256>.
+
+A stored file is shared by every upload of the same content, so it is moved
+into place and referenced, or checked for references and removed, only while
+holding stored_file_lock() for its hash; a delete can then never remove a
+file that a concurrent upload is about to reference.
+"""
+import fcntl
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+CHUNK_SIZE = 64 * 1024
+
+# Form fields other than the file are small; anything bigger is not a legitimate upload
+MAX_FIELD_SIZE = 16 * 1024
+MAX_PARTS = 20
+
+# Leading bytes identifying each accepted type (the client's Content-Type is not trusted)
+FILE_SIGNATURES = {
+    'application/pdf': (b'%PDF-',),
+    'application/msword': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': (b'PK\x03\x04',),
+    'image/png': (b'\x89PNG\r\n\x1a\n',),
+    'image/jpeg': (b'\xff\xd8\xff',),
+    'image/gif': (b'GIF87a', b'GIF89a'),
+    'image/webp': (b'RIFF',),
+}
+SIGNATURE_LENGTH = 12
+
+
+class UploadError(Exception):
+    """Upload rejected; carries the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def detect_content_type(head, allowed_types):
+    """Content type of a file from its first bytes, or None if it is not allowed"""
+    for content_type in allowed_types:
+        for signature in FILE_SIGNATURES.get(content_type, ()):
+            if head.startswith(signature):
+                if content_type == 'image/webp' and head[8:12] != b'WEBP':
+                    continue
+                return content_type
+    return None
+
+
+def storage_path(folder, sha256):
+    """Location of a stored file"""
+    return os.path.join(folder, sha256[:2], sha256[2:4], sha256)
+
+
+def _chunks(stream, chunk_size):
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+    # Tells the decoder the body is complete
+    yield None
+
+
+def stream_upload(stream, boundary, folder, max_size, allowed_types, field_name='file', chunk_size=CHUNK_SIZE):
+    """
+    Decode a multipart body and write its `field_name` file to a temporary file
+    Returns {'filename', 'content_type', 'size', 'sha256', 'tmp_path', 'fields'};
+    the caller passes it to store_file() or discard_upload()
+    Raises UploadError (413 too large, 415 type not allowed, 400 malformed)
+    """
+    tmp_folder = os.path.join(folder, 'tmp')
+    os.makedirs(tmp_folder, exist_ok=True)
+
+    decoder = MultipartDecoder(boundary.encode('latin-1'), max_parts=MAX_PARTS)
+    digest = hashlib.sha256()
+    fields = {}
+    upload = None
+    part = None
+    current_field = None
+    field_data = []
+    field_size = 0
+    head = b''
+    size = 0
+    tmp = None
+
+    try:
+        for chunk in _chunks(stream, chunk_size):
+            decoder.receive_data(chunk)
+            event = decoder.next_event()
+            while not isinstance(event, (Epilogue, NeedData)):
+                if isinstance(event, File) and event.name == field_name and upload is None:
+                    part = 'file'
+                    upload = {'filename': os.path.basename(event.filename or '') or field_name}
+                    tmp = tempfile.NamedTemporaryFile(dir=tmp_folder, delete=False)
+                elif isinstance(event, (File, Field)):
+                    part = 'field' if isinstance(event, Field) else 'ignored'
+                    current_field = event.name
+                    field_data = []
+                    field_size = 0
+                elif isinstance(event, Data):
+                    if part == 'file':
+                        size += len(event.data)
+                        if size > max_size:
+                            raise UploadError(f'File is larger than {max_size} bytes', 413)
+                        if len(head) < SIGNATURE_LENGTH:
+                            head += event.data[:SIGNATURE_LENGTH - len(head)]
+                            if len(head) >= SIGNATURE_LENGTH or not event.more_data:
+                                upload['content_type'] = detect_content_type(head, allowed_types)
+                                if upload['content_type'] is None:
+                                    raise UploadError('File type not allowed', 415)
+                        digest.update(event.data)
+                        tmp.write(event.data)
+                        if not event.more_data:
+                            part = 'done'
+                    elif part == 'field':
+                        field_size += len(event.data)
+                        if field_size > MAX_FIELD_SIZE:
+                            raise UploadError('Form field is too large', 413)
+                        field_data.append(event.data)
+                        if not event.more_data:
+                            fields[current_field] = b''.join(field_data).decode('utf-8', 'replace')
+                event = decoder.next_event()
+
+        if upload is None or part != 'done':
+            raise UploadError(f'Multipart field "{field_name}" is required')
+        if size == 0:
+            raise UploadError('File is empty')
+
+        tmp.close()
+        stored = dict(upload, size=size, sha256=digest.hexdigest(), tmp_path=tmp.name, fields=fields)
+        tmp = None
+        return stored
+
+    except RequestEntityTooLarge:
+        raise UploadError('Too many form fields', 413)
+    except ValueError as e:
+        # Raised by the decoder for malformed bodies
+        raise UploadError(f'Malformed multipart body: {e}')
+    finally:
+        if tmp is not None:
+            tmp.close()
+            os.unlink(tmp.name)
+
+
+@contextmanager
+def stored_file_lock(folder, sha256):
+    """
+    Exclusive lock over the stored file of a hash, across processes
+    Locks are striped by the first byte of the hash, so 256 lock files cover all content
+    """
+    lock_folder = os.path.join(folder, 'locks')
+    os.makedirs(lock_folder, exist_ok=True)
+    with open(os.path.join(lock_folder, sha256[:2]), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def store_file(folder, stored):
+    """Move an upload from stream_upload() into storage (hold stored_file_lock)"""
+    path = storage_path(folder, stored['sha256'])
+    if os.path.exists(path):
+        # Same content already stored
+        os.unlink(stored['tmp_path'])
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(stored['tmp_path'], path)
+    return path
+
+
+def discard_upload(stored):
+    """Delete the temporary file of an upload that was not stored"""
+    try:
+        os.unlink(stored['tmp_path'])
+    except FileNotFoundError:
+        pass
+
+
+def remove_stored_file(folder, sha256):
+    """Delete a stored file (hold stored_file_lock and check it is no longer referenced)"""
+    try:
+        os.unlink(storage_path(folder, sha256))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,249 @@
+"""
+Durable background jobs stored in the jobs table
+
+Endpoints enqueue work in their own transaction, so a job exists exactly when
+the request's changes were committed. Workers (scripts/run_worker.py) claim due
+jobs with SELECT ... FOR UPDATE SKIP LOCKED on Postgres (SQLite serializes the
+claiming UPDATE on its write lock), run the registered task and commit its
+changes together with the job's completion. Failures are retried with
+exponential backoff, and jobs whose worker died are requeued once their lock
+expires. With JOBS_EAGER the task runs inline instead, e.g. in development.
+"""
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event, func, select, update
+
+from src.models.routing import RoutingSession
+from src.models.user import db, Job
+
+logger = logging.getLogger(__name__)
+
+# task name -> callable taking the job payload as keyword arguments
+TASKS = {}
+
+
+def register_task(name):
+    """Decorator registering a function as the handler of a job task"""
+    def decorator(f):
+        TASKS[name] = f
+        return f
+    return decorator
+
+
+def after_commit(callback):
+    """Run callback once the current transaction commits (dropped on rollback)"""
+    db.session.info.setdefault('after_commit', []).append(callback)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def run_after_commit_callbacks(session):
+    for callback in session.info.pop('after_commit', []):
+        try:
+            callback()
+        except Exception:
+            logger.exception('after_commit callback failed')
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def drop_after_commit_callbacks(session):
+    session.info.pop('after_commit', None)
+
+
+def init_jobs(app):
+    """Register the job queue defaults on the app"""
+    app.config.setdefault('JOBS_EAGER', False)
+    app.config.setdefault('JOBS_MAX_ATTEMPTS', 5)
+    app.config.setdefault('JOBS_RETRY_BASE_SECONDS', 10)
+    app.config.setdefault('JOBS_RETRY_MAX_SECONDS', 3600)
+    app.config.setdefault('JOBS_LOCK_TIMEOUT', 300)
+    app.config.setdefault('JOBS_POLL_INTERVAL', 1.0)
+    app.config.setdefault('JOBS_BATCH_SIZE', 10)
+
+
+def enqueue(task, payload=None, user_id=None, delay=0, max_attempts=None):
+    """
+    Add a job to the current session; it is queued when the caller commits
+    In eager mode the task runs immediately and the job is recorded as done
+    """
+    if task not in TASKS:
+        raise LookupError(f'Unknown task: {task}')
+
+    config = current_app.config
+    now = datetime.utcnow()
+    job = Job(
+        task=task,
+        payload=payload or {},
+        user_id=user_id,
+        status='queued',
+        attempts=0,
+        max_attempts=max_attempts or config['JOBS_MAX_ATTEMPTS'],
+        run_at=now + timedelta(seconds=delay),
+        created_at=now
+    )
+    db.session.add(job)
+
+    if config['JOBS_EAGER']:
+        job.attempts = 1
+        job.result = TASKS[task](**job.payload)
+        job.status = 'done'
+        job.finished_at = datetime.utcnow()
+
+    return job
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter for a job that failed `attempts` times"""
+    config = current_app.config
+    delay = min(config['JOBS_RETRY_BASE_SECONDS'] * 2 ** (attempts - 1), config['JOBS_RETRY_MAX_SECONDS'])
+    return delay + random.uniform(0, delay / 10)
+
+
+def worker_token():
+    """Unique claim token identifying this worker and claim"""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}'[-64:]
+
+
+def claim_jobs(limit=None):
+    """Atomically mark up to `limit` due jobs as running and return them"""
+    limit = limit or current_app.config['JOBS_BATCH_SIZE']
+    now = datetime.utcnow()
+    token = worker_token()
+
+    due = (
+        select(Job.id)
+        .where(Job.status == 'queued', Job.run_at <= now)
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = db.session.execute(
+        update(Job)
+        .where(Job.id.in_(due.scalar_subquery()), Job.status == 'queued')
+        .values(status='running', locked_by=token, locked_at=now, attempts=Job.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    if not claimed.rowcount:
+        return []
+    return Job.query.filter_by(locked_by=token).order_by(Job.run_at, Job.id).all()
+
+
+def run_job(job):
+    """Run a claimed job; its changes and completion are committed together"""
+    job_id, token, attempts = job.id, job.locked_by, job.attempts
+
+    try:
+        handler = TASKS.get(job.task)
+        if handler is None:
+            raise LookupError(f'Unknown task: {job.task}')
+        result = handler(**(job.payload or {}))
+
+        finished = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == token)
+            .values(status='done', result=result, locked_by=None, finished_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        if not finished.rowcount:
+            # The lock expired and another worker took the job over
+            db.session.rollback()
+            return False
+        db.session.commit()
+        return True
+
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Job %s failed', job_id)
+
+        job = db.session.get(Job, job_id)
+        if job is None or job.locked_by != token:
+            return False
+
+        job.last_error = f'{type(e).__name__}: {e}'[:2000]
+        job.locked_by = None
+        if attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = datetime.utcnow()
+        else:
+            job.status = 'queued'
+            job.run_at = datetime.utcnow() + timedelta(seconds=retry_delay(attempts))
+        db.session.commit()
+        return False
+
+
+def requeue_stale_jobs():
+    """Release jobs whose worker stopped without finishing them"""
+    now = datetime.utcnow()
+    expired = now - timedelta(seconds=current_app.config['JOBS_LOCK_TIMEOUT'])
+    stale = (Job.status == 'running', Job.locked_at < expired)
+
+    failed = db.session.execute(
+        update(Job)
+        .where(*stale, Job.attempts >= Job.max_attempts)
+        .values(status='failed', locked_by=None, finished_at=now, last_error='Lock expired')
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    requeued = db.session.execute(
+        update(Job)
+        .where(*stale)
+        .values(status='queued', locked_by=None, run_at=now, last_error='Lock expired')
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+
+    return {'requeued': requeued, 'failed': failed}
+
+
+def work(stop=None, once=False):
+    """
+    Worker loop: claim and run due jobs, sleeping when the queue is empty
+    `stop` is a callable returning True when the worker should exit
+    """
+    config = current_app.config
+    next_recovery = 0
+
+    while not (stop and stop()):
+        if time.monotonic() >= next_recovery:
+            requeue_stale_jobs()
+            next_recovery = time.monotonic() + config['JOBS_LOCK_TIMEOUT'] / 2
+
+        jobs = claim_jobs()
+        for job in jobs:
+            run_job(job)
+        db.session.remove()
+
+        if once:
+            return
+        if not jobs:
+            time.sleep(config['JOBS_POLL_INTERVAL'])
+
+
+def queue_stats():
+    """Queue depth per status and task, and how long the oldest due job has waited"""
+    now = datetime.utcnow()
+
+    by_status = {}
+    by_task = {}
+    for status, task, count in db.session.query(Job.status, Job.task, func.count(Job.id)).group_by(Job.status, Job.task):
+        by_status[status] = by_status.get(status, 0) + count
+        by_task.setdefault(task, {})[status] = count
+
+    ready, oldest = db.session.query(func.count(Job.id), func.min(Job.run_at)).filter(
+        Job.status == 'queued', Job.run_at <= now
+    ).one()
+
+    return {
+        'by_status': by_status,
+        'by_task': by_task,
+        'ready': ready,
+        'delayed': by_status.get('queued', 0) - ready,
+        'oldest_ready_seconds': round((now - oldest).total_seconds(), 3) if oldest else 0
+    }
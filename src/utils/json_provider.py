@@ -0,0 +1,56 @@
+"""
+Fast JSON provider for Flask responses
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Dates and datetimes are encoded natively as ISO 8601 strings, so
+models can hand them over as-is instead of calling isoformat() per field.
+"""
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+from src.utils.profiling import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(obj):
+    """Fallback encoder for types orjson/json do not handle natively"""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson when available"""
+
+    # Keep keys in model field order; sorting costs time on every response
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        with timed('json'):
+            if orjson is not None and not kwargs:
+                return orjson.dumps(obj, default=_default).decode('utf-8')
+
+            kwargs.setdefault('default', _default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self._app.debug:
+            return super().response(*args, **kwargs)
+
+        # Encode straight to bytes, skipping the intermediate str
+        obj = self._prepare_response_obj(args, kwargs)
+        with timed('json'):
+            body = orjson.dumps(obj, default=_default)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,319 @@
+"""
+Versioned schema migrations
+
+The schema is defined by the models and changed only through Alembic
+revisions in migrations/versions. At start the app upgrades the database to
+the latest revision (DB_AUTO_MIGRATE); `alembic upgrade head` does the same
+from the command line. Databases created before migrations existed (by
+db.create_all() or scripts/setup_database.py) are adopted by the baseline
+revision, which only creates what is missing, and brought up to date by the
+revisions after it.
+
+Migrations run online, next to live traffic:
+
+    - one migration runs at a time: a Postgres advisory lock (a lock file on
+      SQLite) serializes the workers that start together
+    - on Postgres every DDL statement waits at most MIGRATION_LOCK_TIMEOUT_MS
+      for its table lock instead of queueing all reads and writes of the table
+      behind it; a migration that times out is rolled back and retried
+    - each revision commits on its own (transaction_per_migration)
+
+and revisions use the helpers below instead of the blocking operations:
+
+    create_index_online             CREATE INDEX CONCURRENTLY (no write lock on the table)
+    drop_index_online               DROP INDEX CONCURRENTLY
+    add_column_online               nullable column without a default: a catalog-only
+                                    change; its foreign key is validated without a write lock
+    add_unique_constraint_online    constraint attached to a concurrently built unique index
+    backfill                        UPDATE in primary-key ranges, one short transaction each
+    backfill_rows                   the same for values computed in Python
+    set_not_null_online             NOT NULL via a CHECK constraint validated without a write lock
+
+so a column is added in steps: add it nullable, backfill it, then make it NOT NULL.
+The helpers skip what already exists, so databases that releases before
+migrations left half-way (db.create_all() never altered existing tables)
+converge on the same schema. On SQLite foreign keys are not enforced while
+migrating, since altering a table copies it.
+"""
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+
+from alembic import command, context, op
+from alembic.config import Config
+from flask import current_app
+from sqlalchemy import Column, inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from src.models.user import db
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(PROJECT_ROOT, 'alembic.ini')
+# Key of the Postgres advisory lock held while migrating
+MIGRATION_LOCK_KEY = 0x41494D47
+# SQLSTATE of a lock_timeout expiry
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+def alembic_config(connection=None):
+    """Alembic configuration, optionally migrating on an open connection"""
+    config = Config(ALEMBIC_INI)
+    config.attributes['connection'] = connection
+    return config
+
+
+@contextmanager
+def migration_connection(engine):
+    """Connection holding the migration lock, with the online-migration session settings"""
+    with engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+            # Fail fast instead of queueing traffic behind a DDL lock; index builds may run long
+            connection.execute(text("SELECT set_config('lock_timeout', :value, false)"),
+                               {'value': f"{current_app.config['MIGRATION_LOCK_TIMEOUT_MS']}ms"})
+            connection.execute(text("SELECT set_config('statement_timeout', '0', false)"))
+            connection.commit()
+            try:
+                yield connection
+            finally:
+                connection.rollback()
+                connection.execute(text('RESET lock_timeout'))
+                connection.execute(text('RESET statement_timeout'))
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+                connection.commit()
+            return
+
+        if connection.dialect.name != 'sqlite':
+            yield connection
+            return
+
+        # Copying a table in batch mode drops the original, which must not cascade
+        # into or be refused by the tables referencing it; only settable outside a transaction
+        connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+        connection.commit()
+        try:
+            database = engine.url.database
+            if not database or database == ':memory:':
+                yield connection
+                return
+
+            with open(f'{database}.migrate-lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield connection
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            connection.rollback()
+            connection.exec_driver_sql('PRAGMA foreign_keys=ON')
+            connection.commit()
+
+
+def is_lock_timeout(error):
+    return getattr(error.orig, 'pgcode', None) == LOCK_NOT_AVAILABLE
+
+
+def upgrade_schema(revision='head'):
+    """Upgrade the database of the current app to a revision"""
+    current_app.config.setdefault('MIGRATION_LOCK_TIMEOUT_MS', 5000)
+    current_app.config.setdefault('MIGRATION_RETRIES', 5)
+
+    retries = current_app.config['MIGRATION_RETRIES']
+    with migration_connection(db.engine) as connection:
+        for attempt in range(retries + 1):
+            try:
+                command.upgrade(alembic_config(connection), revision)
+                return
+            except DBAPIError as e:
+                if not is_lock_timeout(e) or attempt == retries:
+                    raise
+                connection.rollback()
+                current_app.logger.warning('Migration waited too long for a table lock, retrying: %s', e.orig)
+                time.sleep(min(2 ** attempt, 30))
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _column(table, name):
+    """Reflected column of a table, or None when it is missing (always None offline)"""
+    if context.is_offline_mode():
+        return None
+    for column in inspect(op.get_bind()).get_columns(table):
+        if column['name'] == name:
+            return column
+    return None
+
+
+def _invalid_index(name):
+    """Whether an interrupted concurrent build left an invalid index with this name"""
+    if context.is_offline_mode():
+        return False
+    return op.get_bind().execute(text(
+        "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+        "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+    ), {'name': name}).first() is not None
+
+
+def create_index_online(name, table, columns, unique=False):
+    """Create an index without blocking writes to the table"""
+    if not _is_postgres():
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+        return
+
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        if _invalid_index(name):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True, postgresql_concurrently=True)
+
+
+def drop_index_online(name, table):
+    """Drop an index without blocking reads and writes of the table"""
+    if not _is_postgres():
+        op.drop_index(name, table_name=table, if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+
+def add_column_online(table, column):
+    """
+    Add a nullable column without a server default, which only changes the
+    catalog instead of rewriting the table; fill it with backfill()
+    A foreign key of the column is added NOT VALID and validated afterwards,
+    so the table stays writable while the existing rows are checked
+    """
+    if not column.nullable or column.server_default is not None:
+        raise ValueError(f'{table}.{column.name}: add the column nullable and without a default, then backfill it')
+    if _column(table, column.name) is not None:
+        return
+
+    references = [foreign_key.target_fullname.split('.') for foreign_key in column.foreign_keys]
+    if not _is_postgres():
+        # SQLite cannot add a constraint to an existing table, only a column declared with one
+        clause = ''.join(f' REFERENCES {referent} ({remote})' for referent, remote in references)
+        op.execute(f'ALTER TABLE {table} ADD COLUMN {column.name} '
+                   f'{column.type.compile(op.get_bind().dialect)}{clause}')
+        return
+
+    op.add_column(table, Column(column.name, column.type, nullable=True))
+    # Separate transactions: VALIDATE scans the table holding only a SHARE UPDATE EXCLUSIVE lock
+    with op.get_context().autocommit_block():
+        for referent, remote in references:
+            constraint = f'{table}_{column.name}_fkey'
+            op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {constraint} '
+                       f'FOREIGN KEY ({column.name}) REFERENCES {referent} ({remote}) NOT VALID')
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}')
+
+
+def add_unique_constraint_online(name, table, columns):
+    """
+    Add a unique constraint; on Postgres its index is built concurrently first
+    and the constraint then takes it over, which only needs a brief lock
+    """
+    if not context.is_offline_mode() and any(
+        constraint['name'] == name for constraint in inspect(op.get_bind()).get_unique_constraints(table)
+    ):
+        return
+
+    if not _is_postgres():
+        with op.batch_alter_table(table) as batch:
+            batch.create_unique_constraint(name, columns)
+        return
+
+    with op.get_context().autocommit_block():
+        if _invalid_index(name):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+        op.create_index(name, table, columns, unique=True, if_not_exists=True, postgresql_concurrently=True)
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}')
+
+
+def _key_ranges(bind, table, key, batch_size):
+    """[lower, upper) ranges of batch_size primary keys covering a table"""
+    lowest, highest = bind.execute(text(f'SELECT MIN({key}), MAX({key}) FROM {table}')).one()
+    if lowest is None:
+        return
+    for lower in range(lowest, highest + 1, batch_size):
+        yield lower, lower + batch_size
+
+
+def backfill(table, assignments, where=None, batch_size=1000, pause=0.05, key='id'):
+    """
+    UPDATE table SET <assignments> [WHERE <where>] in ranges of batch_size
+    primary keys, committing each range so row locks are held only briefly;
+    pause seconds between ranges leave room for the regular traffic
+    """
+    condition = f' AND ({where})' if where else ''
+    if context.is_offline_mode():
+        op.execute(f'UPDATE {table} SET {assignments}' + (f' WHERE {where}' if where else ''))
+        return 0
+
+    bind = op.get_bind()
+    updated = 0
+    with op.get_context().autocommit_block():
+        for lower, upper in _key_ranges(bind, table, key, batch_size):
+            result = bind.execute(text(
+                f'UPDATE {table} SET {assignments} WHERE {key} >= :lower AND {key} < :upper{condition}'
+            ), {'lower': lower, 'upper': upper})
+            updated += result.rowcount
+            if pause:
+                time.sleep(pause)
+    return updated
+
+
+def backfill_rows(table, columns, update, where=None, batch_size=1000, pause=0.05, key='id'):
+    """
+    Like backfill() for values computed in Python: update(bind, rows) gets the
+    rows (key and columns) of each primary-key range matching where and writes
+    them back; each range commits on its own, so update must be safe to repeat
+    """
+    if context.is_offline_mode():
+        op.execute(f'-- {table}: backfill computed in Python, run this revision online')
+        return 0
+
+    condition = f' AND ({where})' if where else ''
+    selected = ', '.join([key] + list(columns))
+    bind = op.get_bind()
+    updated = 0
+    with op.get_context().autocommit_block():
+        for lower, upper in _key_ranges(bind, table, key, batch_size):
+            rows = bind.execute(text(
+                f'SELECT {selected} FROM {table} WHERE {key} >= :lower AND {key} < :upper{condition}'
+            ), {'lower': lower, 'upper': upper}).all()
+            if rows:
+                update(bind, rows)
+                updated += len(rows)
+                if pause:
+                    time.sleep(pause)
+    return updated
+
+
+def set_not_null_online(table, column, server_default=None):
+    """
+    Make a backfilled column NOT NULL, optionally with a server default
+    On Postgres a NOT VALID check constraint is validated without blocking
+    writes, after which SET NOT NULL skips its full-table scan
+    """
+    existing = _column(table, column)
+    if existing is not None and not existing['nullable']:
+        return
+
+    default = {'server_default': server_default} if server_default is not None else {}
+    if not _is_postgres():
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(column, nullable=False, **default)
+        return
+
+    constraint = f'ck_{table}_{column}_not_null'
+    # Separate transactions: the brief exclusive locks must not be held during validation
+    with op.get_context().autocommit_block():
+        if default:
+            op.alter_column(table, column, **default)
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID')
+        op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL')
+        op.execute(f'ALTER TABLE {table} DROP CONSTRAINT {constraint}')
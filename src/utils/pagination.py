@@ -0,0 +1,39 @@
+"""
+Cursor helpers for keyset pagination
+"""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(*values):
+    """
+    Encode a tuple of sort-key values into an opaque URL-safe cursor
+    """
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, *types):
+    """
+    Decode a cursor produced by encode_cursor
+    Values are converted with the given types (datetime values are parsed from ISO format)
+    Raises ValueError if the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise ValueError('Invalid cursor')
+    
+    try:
+        return tuple(
+            datetime.fromisoformat(value) if value_type is datetime else value_type(value)
+            for value, value_type in zip(payload, types)
+        )
+    except (TypeError, ValueError):
+        raise ValueError('Invalid cursor')
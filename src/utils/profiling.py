@@ -0,0 +1,279 @@
+"""
+Request timing breakdown and on-demand profiling
+
+With SERVER_TIMING enabled every response carries a Server-Timing header
+splitting the request into phases:
+
+    auth   token verification (verify_token / token_required)
+    sql    statement execution in the database driver
+    orm    ORM work around it: compiling, hydrating rows into objects, flushing
+    json   serializing response bodies
+    total  the whole request
+
+While a request is timed, ORM SELECT results are buffered when executed so
+that building their objects is counted in 'orm' rather than wherever the rows
+are first iterated (streaming results with yield_per are left alone).
+
+Admins (ADMIN_EMAILS) can run a single request under cProfile by sending
+`X-Profile: 1` or `?_profile=1`. The profile is stored in PROFILE_DIR as a
+pstats file (readable with `python -m pstats` or snakeviz) and named in the
+X-Profile-Id response header; `text` instead of `1` returns the profile
+statistics as the response body. Requests asking for a profile are timed too.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.models.routing import RoutingSession
+
+PHASES = ('auth', 'sql', 'orm', 'json')
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MAX_FILES = 100
+PROFILE_TEXT_LIMIT = 60
+PROFILE_NAME_RE = re.compile(r'^[\w.-]+\.prof$')
+
+
+class RequestTimer:
+    """Accumulated phase durations of one request"""
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.start = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        # (mode, cProfile.Profile) when the request is profiled
+        self.profile = None
+        self._orm_depth = 0
+        self._orm_start = 0.0
+        self._orm_sql = 0.0
+
+    def add(self, phase, seconds):
+        self.phases[phase] += seconds
+
+    def begin_orm(self):
+        # Lazy loads and autoflushes nest inside other ORM calls; only the outermost counts
+        self._orm_depth += 1
+        if self._orm_depth == 1:
+            self._orm_start = time.perf_counter()
+            self._orm_sql = self.phases['sql']
+
+    def end_orm(self):
+        self._orm_depth -= 1
+        if self._orm_depth == 0:
+            elapsed = time.perf_counter() - self._orm_start
+            self.phases['orm'] += max(elapsed - (self.phases['sql'] - self._orm_sql), 0.0)
+
+    def header(self):
+        """Server-Timing header value (durations in milliseconds)"""
+        entries = []
+        for phase in PHASES:
+            entry = f'{phase};dur={self.phases[phase] * 1000:.2f}'
+            if phase == 'sql':
+                entry += f';desc="{self.queries} queries"'
+            entries.append(entry)
+        entries.append(f'total;dur={(time.perf_counter() - self.start) * 1000:.2f}')
+        return ', '.join(entries)
+
+
+def current_timer():
+    """Timer of the request being handled, or None when it is not timed"""
+    if not has_request_context():
+        return None
+    return g.get('request_timer')
+
+
+@contextmanager
+def timed(phase):
+    """Add the duration of the block to a phase of the current request"""
+    timer = current_timer()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(phase, time.perf_counter() - start)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_timer() is not None:
+        conn.info.setdefault('statement_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def stop_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    timer = current_timer()
+    starts = conn.info.get('statement_start')
+    if timer is not None and starts:
+        timer.add('sql', time.perf_counter() - starts.pop())
+        timer.queries += 1
+
+
+@event.listens_for(Engine, 'handle_error')
+def drop_statement_timer(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('statement_start'):
+        connection.info['statement_start'].pop()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def time_orm_execute(orm_execute_state):
+    timer = current_timer()
+    if timer is None:
+        return None
+
+    options = orm_execute_state.execution_options
+    timer.begin_orm()
+    try:
+        result = orm_execute_state.invoke_statement()
+        if orm_execute_state.is_select and not (options.get('yield_per') or options.get('stream_results')):
+            # Hydrate now so the objects are built inside the measured block
+            result = result.freeze()()
+        return result
+    finally:
+        timer.end_orm()
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def start_flush_timer(session, flush_context, instances):
+    timer = current_timer()
+    if timer is not None:
+        timer.begin_orm()
+        session.info['flush_timed'] = True
+
+
+@event.listens_for(RoutingSession, 'after_flush_postexec')
+def stop_flush_timer(session, flush_context):
+    timer = current_timer()
+    if session.info.pop('flush_timed', False) and timer is not None:
+        timer.end_orm()
+
+
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def stop_failed_flush_timer(session, previous_transaction):
+    # A failed flush never reaches after_flush_postexec
+    stop_flush_timer(session, None)
+
+
+def profile_requested():
+    """Profile mode asked for by the request: None, 'store' or 'text'"""
+    value = request.args.get(PROFILE_PARAM) or request.headers.get(PROFILE_HEADER)
+    if not value or value.lower() in ('0', 'false', 'no'):
+        return None
+    return 'text' if value.lower() == 'text' else 'store'
+
+
+def is_admin_request():
+    """Whether the request carries the token of a user listed in ADMIN_EMAILS"""
+    # Imported here: the auth routes import this module for timed()
+    from src.models.user import db, User
+    from src.routes.auth import verify_token
+
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return False
+    user_id = verify_token(auth_header.split(' ')[1])
+    if not user_id:
+        return False
+    user = db.session.get(User, user_id)
+    return user is not None and user.email in current_app.config.get('ADMIN_EMAILS', ())
+
+
+def store_profile(profiler, folder):
+    """Write a profile to folder, keeping the newest PROFILE_MAX_FILES; returns its name"""
+    os.makedirs(folder, exist_ok=True)
+    endpoint = (request.endpoint or 'unknown').replace('.', '-')
+    name = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{request.method}-{endpoint}-{uuid.uuid4().hex[:8]}.prof"
+    profiler.dump_stats(os.path.join(folder, name))
+
+    stored = sorted(list_profiles(folder), key=lambda profile: profile['name'])
+    for profile in stored[:-PROFILE_MAX_FILES]:
+        os.unlink(os.path.join(folder, profile['name']))
+    return name
+
+
+def list_profiles(folder):
+    """Stored profiles, newest first"""
+    if not os.path.isdir(folder):
+        return []
+    profiles = [
+        {'name': name, 'size': os.path.getsize(os.path.join(folder, name))}
+        for name in os.listdir(folder) if PROFILE_NAME_RE.match(name)
+    ]
+    return sorted(profiles, key=lambda profile: profile['name'], reverse=True)
+
+
+def profile_text(stats_source, sort='cumulative', limit=PROFILE_TEXT_LIMIT):
+    """pstats report for a profiler or a stored profile path"""
+    output = io.StringIO()
+    stats = pstats.Stats(stats_source, stream=output)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+
+def init_request_profiling(app):
+    """Register Server-Timing and on-demand profiling hooks on the app"""
+    app.config.setdefault('SERVER_TIMING', False)
+    app.config.setdefault('PROFILE_DIR', os.path.join(app.root_path, 'profiles'))
+
+    @app.before_request
+    def start_request_timing():
+        # Batch sub-requests run inside the outer request's app context and are
+        # accounted to it
+        if 'request_timer' in g:
+            return
+
+        mode = profile_requested()
+        if mode is not None and not is_admin_request():
+            mode = None
+
+        if mode is not None or current_app.config['SERVER_TIMING']:
+            g.request_timer = RequestTimer(request._get_current_object())
+        if mode is not None:
+            g.request_timer.profile = (mode, cProfile.Profile())
+            g.request_timer.profile[1].enable()
+
+    @app.after_request
+    def finish_request_timing(response):
+        timer = g.get('request_timer')
+        if timer is None or timer.owner is not request._get_current_object():
+            return response
+
+        mode, profiler = timer.profile or (None, None)
+        timer.profile = None
+        if profiler is not None:
+            profiler.disable()
+            if mode == 'text':
+                response.headers['X-Profiled-Status'] = str(response.status_code)
+                response.set_data(profile_text(profiler))
+                response.mimetype = 'text/plain'
+                response.status_code = 200
+            else:
+                response.headers['X-Profile-Id'] = store_profile(profiler, current_app.config['PROFILE_DIR'])
+
+        response.headers['Server-Timing'] = g.pop('request_timer').header()
+        return response
+
+    @app.teardown_request
+    def abandon_request_timing(exc):
+        # after_request is skipped when the view raised; never leave a profiler running
+        timer = g.get('request_timer')
+        if timer is None or timer.owner is not request._get_current_object():
+            return
+        if timer.profile is not None:
+            timer.profile[1].disable()
+        g.pop('request_timer')
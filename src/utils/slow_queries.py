@@ -0,0 +1,254 @@
+"""
+Slow-query log
+
+Every statement that runs longer than SLOW_QUERY_MS is written as one JSON
+line to a rotating log (SLOW_QUERY_LOG) with:
+
+    fingerprint   hash of the normalized statement (literals and IN lists collapsed)
+    statement     the normalized statement
+    duration_ms   execution time in the driver
+    params        the shape of the bound parameters (names and types, never values)
+    route         method, URL rule and endpoint of the request that ran it
+    plan          EXPLAIN (Postgres) or EXPLAIN QUERY PLAN (SQLite) output
+    full_scan     whether the plan scans a whole table
+
+Plans are captured at most once per fingerprint every SLOW_QUERY_EXPLAIN_INTERVAL
+seconds, on the same connection right after the statement. Each worker also
+aggregates its slow queries by fingerprint for /api/metrics/slow-queries;
+scripts/slow_query_report.py aggregates the log files of all workers.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOW_QUERY_LOGGER = 'autointern.slow_queries'
+MAX_FINGERPRINTS = 500
+MAX_ROUTES_PER_FINGERPRINT = 10
+EXPLAINABLE = ('select', 'insert', 'update', 'delete', 'with')
+
+# Literals and placeholder lists reduced to '?' so equivalent statements share a fingerprint
+_NORMALIZERS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%\(\w+\)s|%s|\$\d+'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)'), '(?+)'),
+    (re.compile(r'\s+'), ' '),
+)
+# SQLite: 'SCAN <table>' without an index; Postgres: 'Seq Scan on <table>'
+_FULL_SCAN = re.compile(r'^(?:SCAN (?:TABLE )?\w+\b(?! USING)|.*Seq Scan)', re.MULTILINE)
+
+
+def normalize_statement(statement):
+    """Statement with literals, placeholders and IN lists reduced to '?'"""
+    for pattern, replacement in _NORMALIZERS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def parameter_shape(parameters, executemany):
+    """Names/positions and types of bound parameters, without their values"""
+    if executemany:
+        return {'rows': len(parameters), 'row': parameter_shape(parameters[0], False) if parameters else None}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def current_route():
+    """The request that issued the statement, if any"""
+    if not has_request_context():
+        return None
+    return {
+        'method': request.method,
+        'rule': request.url_rule.rule if request.url_rule else request.path,
+        'endpoint': request.endpoint
+    }
+
+
+def explain(connection, statement, parameters):
+    """Plan of a statement as a list of lines, on the connection that ran it"""
+    dialect = connection.dialect.name
+    cursor = connection.connection.cursor()
+    try:
+        if dialect == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+            return [row[-1] for row in cursor.fetchall()]
+        if dialect == 'postgresql':
+            # A failing EXPLAIN must not abort the request's transaction
+            cursor.execute('SAVEPOINT slow_query_explain')
+            try:
+                cursor.execute(f'EXPLAIN {statement}', parameters)
+                plan = [row[0] for row in cursor.fetchall()]
+            except Exception:
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+                raise
+            cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+            return plan
+        cursor.execute(f'EXPLAIN {statement}', parameters)
+        return [' '.join(str(value) for value in row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """Threshold, log writer and per-fingerprint aggregates of one worker"""
+
+    def __init__(self):
+        self.threshold = None
+        self.explain_interval = 60
+        self.logger = logging.getLogger(SLOW_QUERY_LOGGER)
+        self.logger.propagate = False
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._explained_at = {}
+
+    def configure(self, threshold_ms, path, max_bytes, backups, explain_interval):
+        self.threshold = threshold_ms / 1000 if threshold_ms is not None and threshold_ms >= 0 else None
+        self.explain_interval = explain_interval
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+        if self.threshold is not None and path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            # delay: the file is opened on the first slow query
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, delay=True)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.INFO)
+
+    def _should_explain(self, key, statement, executemany):
+        if executemany or not statement.lstrip()[:6].lower().startswith(EXPLAINABLE):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained_at.get(key, float('-inf')) < self.explain_interval:
+                return False
+            if len(self._explained_at) >= MAX_FINGERPRINTS * 4:
+                self._explained_at.clear()
+            self._explained_at[key] = now
+        return True
+
+    def record(self, connection, statement, parameters, executemany, duration):
+        normalized = normalize_statement(statement)
+        key = fingerprint(normalized)
+        entry = {
+            'ts': datetime.utcnow().isoformat(timespec='milliseconds') + 'Z',
+            'fingerprint': key,
+            'statement': normalized,
+            'duration_ms': round(duration * 1000, 3),
+            'params': parameter_shape(parameters, executemany),
+            'route': current_route(),
+            'dialect': connection.dialect.name
+        }
+
+        if self._should_explain(key, statement, executemany):
+            try:
+                entry['plan'] = explain(connection, statement, parameters)
+                entry['full_scan'] = bool(_FULL_SCAN.search('\n'.join(entry['plan'])))
+            except Exception as e:
+                entry['plan_error'] = f'{type(e).__name__}: {e}'
+
+        self.logger.info(json.dumps(entry, default=str))
+        self._aggregate(entry)
+
+    def _aggregate(self, entry):
+        with self._lock:
+            stats = self._stats.get(entry['fingerprint'])
+            if stats is None:
+                if len(self._stats) >= MAX_FINGERPRINTS:
+                    # Make room by dropping the fingerprint that cost the least so far
+                    del self._stats[min(self._stats, key=lambda key: self._stats[key]['total_ms'])]
+                stats = self._stats[entry['fingerprint']] = {
+                    'fingerprint': entry['fingerprint'],
+                    'statement': entry['statement'],
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'routes': [],
+                    'plan': None,
+                    'full_scan': None
+                }
+            stats['count'] += 1
+            stats['total_ms'] += entry['duration_ms']
+            stats['max_ms'] = max(stats['max_ms'], entry['duration_ms'])
+            stats['last_seen'] = entry['ts']
+            route = entry['route'] and f"{entry['route']['method']} {entry['route']['rule']}"
+            if route and route not in stats['routes'] and len(stats['routes']) < MAX_ROUTES_PER_FINGERPRINT:
+                stats['routes'].append(route)
+            if 'plan' in entry:
+                stats['plan'] = entry['plan']
+                stats['full_scan'] = entry['full_scan']
+
+    def top(self, limit=20, order='total_ms'):
+        """Aggregated fingerprints, most expensive first"""
+        with self._lock:
+            stats = [dict(item, routes=list(item['routes'])) for item in self._stats.values()]
+        for item in stats:
+            item['mean_ms'] = round(item['total_ms'] / item['count'], 3)
+            item['total_ms'] = round(item['total_ms'], 3)
+        return sorted(stats, key=lambda item: item[order], reverse=True)[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._explained_at.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_slow_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if slow_query_log.threshold is not None:
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def check_slow_query(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('slow_query_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    if slow_query_log.threshold is not None and duration >= slow_query_log.threshold:
+        slow_query_log.record(conn, statement, parameters, executemany, duration)
+
+
+@event.listens_for(Engine, 'handle_error')
+def drop_slow_query_timer(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('slow_query_start'):
+        connection.info['slow_query_start'].pop()
+
+
+def init_slow_query_log(app):
+    """Configure the slow-query log from the app config"""
+    app.config.setdefault('SLOW_QUERY_MS', 250)
+    app.config.setdefault('SLOW_QUERY_LOG', os.path.join(app.root_path, 'logs', 'slow_queries.log'))
+    app.config.setdefault('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024)
+    app.config.setdefault('SLOW_QUERY_LOG_BACKUPS', 5)
+    app.config.setdefault('SLOW_QUERY_EXPLAIN_INTERVAL', 60)
+
+    slow_query_log.configure(
+        app.config['SLOW_QUERY_MS'],
+        app.config['SLOW_QUERY_LOG'],
+        app.config['SLOW_QUERY_LOG_MAX_BYTES'],
+        app.config['SLOW_QUERY_LOG_BACKUPS'],
+        app.config['SLOW_QUERY_EXPLAIN_INTERVAL']
+    )
@@ -0,0 +1,143 @@
+"""
+Static asset layer for the SPA catch-all route
+
+The static folder is scanned once at startup into an in-memory manifest, so a
+request is a dict lookup instead of filesystem checks. Precompressed .br/.gz
+siblings are served when the client accepts them, content-hashed build assets
+get immutable cache headers and index.html is served from memory.
+"""
+import gzip
+import mimetypes
+import os
+import re
+import zlib
+
+from flask import Response, request, send_file
+
+# Encodings in order of preference, with the suffix of the precompressed file
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Next.js build output and file names carrying a content hash (app.3f9a1c2b.js)
+HASHED_ASSET_PATTERN = re.compile(r'(^|/)_next/static/|[.-][0-9a-f]{8,}\.[a-z0-9]+$')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class StaticAsset:
+    """A file in the static folder and its precompressed variants"""
+
+    def __init__(self, path, filename, stat):
+        self.path = path
+        self.filename = filename
+        self.size = stat.st_size
+        self.mtime = int(stat.st_mtime)
+        self.etag = f'{self.mtime:x}-{self.size:x}'
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.immutable = bool(HASHED_ASSET_PATTERN.search(path))
+        self.variants = {}
+
+
+class StaticManifest:
+    """In-memory index of the static folder"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.assets = {}
+        self.index = None
+        self.index_variants = {}
+        self.index_etag = None
+        self.reload()
+
+    def reload(self):
+        """Scan the static folder and load index.html into memory"""
+        assets = {}
+
+        if self.folder and os.path.isdir(self.folder):
+            for root, _, files in os.walk(self.folder):
+                for name in files:
+                    filename = os.path.join(root, name)
+                    path = os.path.relpath(filename, self.folder).replace(os.sep, '/')
+                    assets[path] = StaticAsset(path, filename, os.stat(filename))
+
+        # Attach precompressed files to the asset they were built from
+        for path in list(assets):
+            for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                if path.endswith(suffix) and path[:-len(suffix)] in assets:
+                    assets[path[:-len(suffix)]].variants[encoding] = assets[path]
+
+        self.assets = assets
+        self._load_index()
+
+    def _load_index(self):
+        """Keep index.html and its compressed forms in memory"""
+        asset = self.assets.get('index.html')
+        if asset is None:
+            self.index = None
+            self.index_variants = {}
+            return
+
+        with open(asset.filename, 'rb') as f:
+            self.index = f.read()
+
+        self.index_variants = {}
+        for encoding, variant in asset.variants.items():
+            with open(variant.filename, 'rb') as f:
+                self.index_variants[encoding] = f.read()
+        if 'gzip' not in self.index_variants:
+            self.index_variants['gzip'] = gzip.compress(self.index, compresslevel=9)
+
+        self.index_etag = f'{zlib.crc32(self.index):08x}'
+
+    def _choose_encoding(self, available):
+        """Pick the best encoding the client accepts among the available ones"""
+        for encoding, _ in PRECOMPRESSED_ENCODINGS:
+            if encoding in available and request.accept_encodings[encoding]:
+                return encoding
+        return None
+
+    def serve(self, path):
+        """Serve a static file, falling back to index.html for client-side routes"""
+        asset = self.assets.get(path) if path else None
+        if asset is None or path == 'index.html':
+            return self.serve_index()
+
+        encoding = self._choose_encoding(asset.variants)
+        source = asset.variants[encoding] if encoding else asset
+
+        response = send_file(
+            source.filename,
+            mimetype=asset.mimetype,
+            conditional=True,
+            etag=f'{asset.etag}-{encoding}' if encoding else asset.etag,
+            last_modified=asset.mtime,
+            max_age=IMMUTABLE_MAX_AGE if asset.immutable else 0
+        )
+
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if asset.variants:
+            response.vary.add('Accept-Encoding')
+
+        if asset.immutable:
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+
+        return response
+
+    def serve_index(self):
+        """Serve index.html from memory"""
+        if self.index is None:
+            return "index.html not found", 404
+
+        encoding = self._choose_encoding(self.index_variants)
+        body = self.index_variants[encoding] if encoding else self.index
+
+        response = Response(body, mimetype='text/html')
+        response.set_etag(f'{self.index_etag}-{encoding}' if encoding else self.index_etag)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.no_cache = True
+
+        return response.make_conditional(request)
@@ -0,0 +1,331 @@
+"""
+Time-based partitioning and rollups for the application_tracking table
+
+On PostgreSQL application_tracking is a natively partitioned table with one
+range partition per month. On SQLite the table only holds recent events and
+closed months are moved into monthly shard tables with the same columns;
+each process caches the list of shards until maintenance touches the
+<database>.shards marker file.
+Partitions older than the rollup horizon are summarized into
+application_tracking_daily and dropped.
+
+A PostgreSQL database whose application_tracking predates partitioning keeps
+its plain table; partition creation is skipped for it.
+"""
+import logging
+import os
+import re
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import Column, Index, MetaData, Table, event, func, inspect, insert, select, text, union_all
+from sqlalchemy.orm import aliased
+
+from src.models.user import db, User, Application, ApplicationTracking, ApplicationTrackingDaily
+
+logger = logging.getLogger(__name__)
+TRACKING_TABLE = ApplicationTracking.__tablename__
+PARTITION_PATTERN = re.compile(r'^' + TRACKING_TABLE + r'_p(\d{4})_(\d{2})$')
+
+# Table objects for partitions/shards, built on demand
+_partition_metadata = MetaData()
+
+# SQLite shard lists per database file: {database: (marker mtime, partitions)}
+_shard_cache = {}
+
+
+def month_start(value):
+    """Return midnight on the first day of the month containing value"""
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    """Shift a month start by a number of months"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(start):
+    """Name of the partition (or shard) holding the month starting at start"""
+    return f'{TRACKING_TABLE}_p{start.year:04d}_{start.month:02d}'
+
+
+def partition_table(name):
+    """
+    Table object for a partition or shard
+    Shards carry no foreign keys so rows can outlive the SQLite FK checks of the hot table
+    """
+    if name in _partition_metadata.tables:
+        return _partition_metadata.tables[name]
+
+    base = ApplicationTracking.__table__
+    return Table(
+        name, _partition_metadata,
+        *[Column(column.name, column.type, primary_key=column.primary_key) for column in base.columns],
+        Index(f'idx_{name}_application_changed', 'application_id', 'changed_at')
+    )
+
+
+def list_partitions(connection):
+    """Return (month_start, name) for every existing partition or shard, oldest first"""
+    if connection.dialect.name == 'postgresql':
+        rows = connection.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = :parent"
+        ), {'parent': TRACKING_TABLE})
+    else:
+        rows = connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :prefix"
+        ), {'prefix': f'{TRACKING_TABLE}_p%'})
+
+    partitions = []
+    for (name,) in rows:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append((datetime(int(match.group(1)), int(match.group(2)), 1), name))
+
+    return sorted(partitions)
+
+
+def shard_marker(connection):
+    """
+    File touched whenever the shards of a SQLite database change, so every
+    process knows when to list them again; None for in-memory databases
+    """
+    database = connection.engine.url.database
+    if not database or database == ':memory:':
+        return None
+    return f'{database}.shards'
+
+
+def cached_partitions(connection):
+    """
+    list_partitions() of a SQLite database, kept per process until the shard
+    marker changes instead of querying sqlite_master on every call
+    """
+    marker = shard_marker(connection)
+    try:
+        version = os.stat(marker).st_mtime_ns if marker else 0
+    except FileNotFoundError:
+        version = 0
+
+    key = connection.engine.url.database
+    cached = _shard_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    partitions = list_partitions(connection)
+    _shard_cache[key] = (version, partitions)
+    return partitions
+
+
+def shards_changed(connection):
+    """Make every process list the SQLite shards again; call after the change committed"""
+    _shard_cache.pop(connection.engine.url.database, None)
+    marker = shard_marker(connection)
+    if marker:
+        with open(marker, 'a'):
+            os.utime(marker)
+
+
+def is_partitioned(connection):
+    """Whether application_tracking is a partitioned table (PostgreSQL relkind 'p')"""
+    return connection.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE relname = :name AND pg_table_is_visible(oid)"
+    ), {'name': TRACKING_TABLE}).scalar() or False
+
+
+def create_partitioned_table(connection):
+    """
+    Create application_tracking as a range-partitioned table on PostgreSQL
+    The primary key has to include the partition key, so it is (id, changed_at)
+    """
+    connection.execute(text(f"""
+        CREATE TABLE {TRACKING_TABLE} (
+            id SERIAL,
+            application_id INTEGER NOT NULL REFERENCES applications (id),
+            status VARCHAR(50) NOT NULL,
+            notes TEXT,
+            changed_by INTEGER REFERENCES users (id),
+            changed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+            PRIMARY KEY (id, changed_at)
+        ) PARTITION BY RANGE (changed_at)
+    """))
+    connection.execute(text(
+        f"CREATE TABLE {TRACKING_TABLE}_default PARTITION OF {TRACKING_TABLE} DEFAULT"
+    ))
+    connection.execute(text(
+        f"CREATE INDEX idx_application_tracking_application_changed "
+        f"ON {TRACKING_TABLE} (application_id, changed_at)"
+    ))
+
+
+def ensure_postgres_partitions(connection, start, months):
+    """Create monthly partitions from start for the given number of months"""
+    for offset in range(months):
+        lower = add_months(start, offset)
+        upper = add_months(lower, 1)
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(lower)} PARTITION OF {TRACKING_TABLE} "
+            f"FOR VALUES FROM ('{lower.date().isoformat()}') TO ('{upper.date().isoformat()}')"
+        ))
+
+
+def init_tracking_partitions(engine):
+    """
+    Prepare partitioning at application start
+    On PostgreSQL a fresh database gets a partitioned application_tracking table
+    and partitions for the upcoming months; existing tables are left untouched,
+    and a plain (unpartitioned) one gets no partitions
+    """
+    if engine.dialect.name != 'postgresql':
+        return
+
+    with engine.begin() as connection:
+        if not inspect(connection).has_table(TRACKING_TABLE):
+            # Parent tables first so the foreign keys resolve
+            dependencies = [User.__table__, Application.__table__]
+            db.metadata.create_all(connection, tables=dependencies)
+            create_partitioned_table(connection)
+        elif not is_partitioned(connection):
+            logger.warning('%s is not partitioned; skipping partition creation', TRACKING_TABLE)
+            return
+
+        months_ahead = current_app.config.get('TRACKING_PARTITIONS_AHEAD', 3)
+        ensure_postgres_partitions(connection, month_start(datetime.utcnow()), months_ahead + 1)
+
+
+def rotate_sqlite_shards(connection, before):
+    """Move events older than the month starting at before into monthly shard tables"""
+    hot = ApplicationTracking.__table__
+    oldest = connection.execute(
+        select(func.min(hot.c.changed_at)).where(hot.c.changed_at < before)
+    ).scalar()
+
+    if oldest is None:
+        return []
+
+    if isinstance(oldest, str):
+        oldest = datetime.fromisoformat(oldest)
+
+    rotated = []
+    lower = month_start(oldest)
+    while lower < before:
+        upper = add_months(lower, 1)
+        in_month = (hot.c.changed_at >= lower) & (hot.c.changed_at < upper)
+
+        # Skip empty months instead of creating empty shards
+        if connection.execute(select(hot.c.id).where(in_month).limit(1)).first():
+            shard = partition_table(partition_name(lower))
+            shard.create(connection, checkfirst=True)
+            connection.execute(
+                insert(shard).from_select(
+                    [column.name for column in hot.columns],
+                    select(*hot.columns).where(in_month)
+                )
+            )
+            connection.execute(hot.delete().where(in_month))
+            rotated.append(shard.name)
+
+        lower = upper
+
+    return rotated
+
+
+def rollup_partitions(connection, before):
+    """
+    Summarize partitions that end on or before the given month into daily rows
+    and drop them
+    """
+    daily = ApplicationTrackingDaily.__table__
+    rolled_up = []
+
+    for start, name in list_partitions(connection):
+        if add_months(start, 1) > before:
+            continue
+
+        partition = partition_table(name)
+        day = func.date(partition.c.changed_at)
+        connection.execute(
+            insert(daily).from_select(
+                ['day', 'application_id', 'status', 'event_count', 'first_changed_at', 'last_changed_at'],
+                select(
+                    day,
+                    partition.c.application_id,
+                    partition.c.status,
+                    func.count(),
+                    func.min(partition.c.changed_at),
+                    func.max(partition.c.changed_at)
+                ).group_by(day, partition.c.application_id, partition.c.status)
+            )
+        )
+        connection.execute(text(f'DROP TABLE {name}'))
+        _partition_metadata.remove(partition)
+        rolled_up.append(name)
+
+    return rolled_up
+
+
+def maintain_tracking_partitions(now=None):
+    """
+    Periodic maintenance: pre-create upcoming partitions (PostgreSQL), move closed
+    months out of the hot table (SQLite) and roll up partitions past the horizon
+    """
+    config = current_app.config
+    current_month = month_start(now or datetime.utcnow())
+    rollup_before = add_months(current_month, -config.get('TRACKING_ROLLUP_AFTER_MONTHS', 12))
+    result = {'created': [], 'rotated': [], 'rolled_up': []}
+
+    with db.engine.begin() as connection:
+        if connection.dialect.name == 'postgresql':
+            if not is_partitioned(connection):
+                logger.warning('%s is not partitioned; skipping partition maintenance', TRACKING_TABLE)
+                return result
+            existing = {name for _, name in list_partitions(connection)}
+            ensure_postgres_partitions(connection, current_month, config.get('TRACKING_PARTITIONS_AHEAD', 3) + 1)
+            result['created'] = [name for _, name in list_partitions(connection) if name not in existing]
+        else:
+            hot_before = add_months(current_month, 1 - config.get('TRACKING_HOT_MONTHS', 2))
+            result['rotated'] = rotate_sqlite_shards(connection, hot_before)
+
+        result['rolled_up'] = rollup_partitions(connection, rollup_before)
+
+    if connection.dialect.name != 'postgresql' and (result['rotated'] or result['rolled_up']):
+        shards_changed(connection)
+
+    return result
+
+
+def tracking_entity(start=None, end=None):
+    """
+    Entity to query tracking events with, optionally restricted to a time range
+    On SQLite this is a UNION ALL of the hot table and the overlapping shards;
+    PostgreSQL prunes partitions natively so the model is returned as is
+    """
+    if db.engine.dialect.name == 'postgresql':
+        return ApplicationTracking
+
+    shards = [
+        partition_table(name) for month, name in cached_partitions(db.session.connection())
+        if (end is None or month < end) and (start is None or add_months(month, 1) > start)
+    ]
+
+    if not shards:
+        return ApplicationTracking
+
+    hot = ApplicationTracking.__table__
+    sources = [select(*hot.columns)] + [select(*shard.columns) for shard in shards]
+    return aliased(ApplicationTracking, union_all(*sources).subquery(TRACKING_TABLE))
+
+
+@event.listens_for(Application, 'after_delete')
+def delete_sharded_tracking(mapper, connection, application):
+    """Remove an application's events from SQLite shards, which have no foreign keys"""
+    if connection.dialect.name == 'postgresql':
+        return
+
+    for _, name in cached_partitions(connection):
+        partition = partition_table(name)
+        connection.execute(partition.delete().where(partition.c.application_id == application.id))
@@ -0,0 +1,67 @@
+"""
+Shared fixtures: the app from main.py on a throwaway SQLite database
+
+main.py reads its configuration from the environment when it is imported, so
+the environment is set here first. Every test session gets a new database
+(migrated to head by the app start), upload folder and catalog path; tests
+create their own users so they do not depend on each other.
+"""
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+
+TEST_DIR = tempfile.mkdtemp(prefix='autointern-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TEST_DIR, 'app.db')}"
+os.environ['UPLOAD_FOLDER'] = os.path.join(TEST_DIR, 'uploads')
+os.environ['CATALOG_PATH'] = os.path.join(TEST_DIR, 'catalog', 'internships.bin')
+os.environ['SLOW_QUERY_LOG'] = os.path.join(TEST_DIR, 'slow_queries.log')
+os.environ['JOBS_EAGER'] = 'true'
+os.environ['DB_AUTO_MIGRATE'] = 'true'
+# .env values must not leak into the tests
+os.environ['GOOGLE_CLIENT_ID'] = ''
+os.environ.pop('DATABASE_REPLICA_URLS', None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app as flask_app  # noqa: E402
+from src.models.user import db, User  # noqa: E402
+from src.routes.auth import generate_token  # noqa: E402
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture(scope='session')
+def app():
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user and return (user_id, Authorization headers)"""
+    def create():
+        with app.app_context():
+            user = User(email=f'user{next(_emails)}@example.com', name='Test User')
+            user.set_password('password123')
+            db.session.add(user)
+            db.session.commit()
+            return user.id, {'Authorization': f'Bearer {generate_token(user.id)}'}
+    return create
+
+
+@pytest.fixture
+def apply(client):
+    """Apply to an internship as a user and return the application id"""
+    def submit(headers, internship_id=1, **fields):
+        response = client.post('/api/internships/apply', json={'internship_id': internship_id, **fields}, headers=headers)
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['id']
+    return submit
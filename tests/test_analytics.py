@@ -0,0 +1,76 @@
+"""Funnel folds: furthest stage, first response, order independence and the event watermark"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.utils.analytics import FunnelState, to_seconds
+
+START = datetime(2026, 1, 1)
+APPLICATIONS = [
+    (1, START, 'Acme', 'Intern'),
+    (2, START, 'Acme', 'Intern'),
+    (3, START, 'Globex', 'Analyst'),
+]
+# (event id, application id, status, hours after START)
+EVENTS = [
+    (1, 1, 'submitted', 0),
+    (2, 1, 'under_review', 4),
+    (3, 1, 'interview', 10),
+    (4, 1, 'accepted', 30),
+    (5, 2, 'submitted', 0),
+    (6, 2, 'rejected', 8),
+    (7, 3, 'submitted', 0),
+    (8, 3, 'withdrawn', 2),
+]
+
+
+def fold(state, events):
+    event_ids, application_ids, statuses, hours = zip(*events)
+    times = to_seconds([START + timedelta(hours=h) for h in hours])
+    state.fold_events(np.array(application_ids, dtype=np.int64), list(statuses), times,
+                      np.array(event_ids, dtype=np.int64))
+
+
+def folded(events):
+    state = FunnelState()
+    state.add_applications(APPLICATIONS)
+    fold(state, events)
+    state.advance()
+    return state
+
+
+def test_funnel_counts_the_furthest_stage_and_the_first_response():
+    state = folded(EVENTS)
+    acme, globex = state.groups('company')
+
+    assert acme['name'] == 'Acme'
+    assert acme['funnel'] == {'submitted': 2, 'under_review': 1, 'interview': 1, 'accepted': 1}
+    assert acme['rejected'] == 1
+    # Responses after 4 h (review) and 8 h (rejection)
+    assert (acme['responded'], acme['median_response_hours']) == (2, 6.0)
+    # Statuses outside the funnel are neither a stage nor a response
+    assert globex['funnel']['under_review'] == 0
+    assert (globex['responded'], globex['median_response_hours']) == (0, None)
+
+    assert state.overall()['funnel'] == {'submitted': 3, 'under_review': 1, 'interview': 1, 'accepted': 1}
+
+
+def test_folds_are_order_independent_and_idempotent():
+    expected = folded(EVENTS).groups('role')
+    assert folded(list(reversed(EVENTS))).groups('role') == expected
+    assert folded(EVENTS + EVENTS[2:5]).groups('role') == expected
+
+
+def test_events_of_unloaded_applications_stay_behind_the_watermark():
+    state = FunnelState()
+    state.add_applications(APPLICATIONS[:2])
+    fold(state, EVENTS)
+    state.advance()
+    # Application 3 was not loaded yet, so its events are read again next refresh
+    assert state.last_event_id == 6
+
+    state.add_applications(APPLICATIONS)
+    fold(state, [event for event in EVENTS if event[0] > state.last_event_id])
+    state.advance()
+    assert state.last_event_id == 8
+    assert state.overall()['applications'] == 3
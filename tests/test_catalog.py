@@ -0,0 +1,63 @@
+"""Shared catalog: file format, remapping a rebuilt file, staleness and serving lookups"""
+import json
+import os
+import time
+
+import pytest
+
+from src.utils.catalog import CatalogReader, CatalogSnapshot, build_catalog, catalog, write_catalog
+
+
+def records(*ids):
+    return [(internship_id, json.dumps({'id': internship_id}).encode()) for internship_id in ids]
+
+
+def test_snapshot_finds_records_by_id(tmp_path):
+    path = str(tmp_path / 'catalog.bin')
+    assert write_catalog(path, records(2, 5, 9)) == 3
+
+    snapshot = CatalogSnapshot(path)
+    assert snapshot.count == 3
+    assert json.loads(snapshot.get(5)) == {'id': 5}
+    assert snapshot.get(9) == b'{"id": 9}'
+    assert [snapshot.get(missing) for missing in (1, 6, 10)] == [None, None, None]
+
+
+def test_files_that_are_not_catalogs_are_refused(tmp_path):
+    path = tmp_path / 'catalog.bin'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        CatalogSnapshot(str(path))
+
+
+def test_reader_maps_rebuilt_files_and_ignores_stale_ones(tmp_path):
+    path = str(tmp_path / 'catalog.bin')
+    reader = CatalogReader()
+    reader.configure(path, check_interval=0, max_age=60)
+    assert reader.current() is None
+
+    write_catalog(path, records(1))
+    assert reader.current().get(2) is None
+    write_catalog(path, records(1, 2))
+    assert reader.current().get(2) == b'{"id": 2}'
+
+    reader.snapshot.built_at = time.time() - 120
+    assert reader.current() is None
+
+
+def test_lookups_are_served_from_the_catalog(app, client, make_user, monkeypatch):
+    _, headers = make_user()
+    path = app.config['CATALOG_PATH']
+    monkeypatch.setattr(catalog, 'check_interval', 0)
+
+    assert build_catalog(app) >= 5
+    body = client.get('/api/internships/1', headers=headers).get_data()
+    assert body == catalog.current().get(1)
+
+    # What the catalog holds is what the endpoint answers until the next build
+    write_catalog(path, [(1, b'{"id":1,"title":"from the catalog"}')])
+    assert client.get('/api/internships/1', headers=headers).get_json()['title'] == 'from the catalog'
+    assert client.get('/api/internships/2', headers=headers).get_json()['id'] == 2
+
+    os.unlink(path)
+    assert client.get('/api/internships/1', headers=headers).get_json()['title'] != 'from the catalog'
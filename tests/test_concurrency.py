@@ -0,0 +1,73 @@
+"""Optimistic concurrency: PATCH guarded by If-Match, versions in ETags, CORS for both"""
+from src.models.user import ApplicationTracking
+
+ORIGIN = 'http://localhost:3000'
+
+
+def test_patch_application_with_if_match(app, client, make_user, apply):
+    _, headers = make_user()
+    application_id = apply(headers)
+    url = f'/api/applications/{application_id}'
+    etag = client.get(url, headers=headers).headers['ETag']
+    assert etag == 'W/"1"'
+
+    response = client.patch(url, json={'status': 'interview'}, headers={**headers, 'If-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == 'W/"2"'
+    assert response.get_json()['status'] == 'interview'
+
+    # A second writer still holding the old version loses
+    stale = client.patch(url, json={'notes': 'late edit'}, headers={**headers, 'If-Match': etag})
+    assert stale.status_code == 409
+    assert stale.get_json()['version'] == 2
+    assert client.get(url, headers=headers).get_json()['notes'] == ''
+
+    # Without If-Match the update always applies
+    assert client.patch(url, json={'notes': 'edit'}, headers=headers).headers['ETag'] == 'W/"3"'
+
+    with app.app_context():
+        statuses = [t.status for t in ApplicationTracking.query.filter_by(application_id=application_id).order_by(ApplicationTracking.id)]
+    assert statuses == ['submitted', 'interview']
+
+
+def test_patch_application_of_another_user(client, make_user, apply):
+    _, owner = make_user()
+    application_id = apply(owner)
+    _, other = make_user()
+
+    assert client.patch(f'/api/applications/{application_id}', json={'notes': 'x'}, headers=other).status_code == 403
+    assert client.patch('/api/applications/999999', json={'notes': 'x'}, headers=other).status_code == 404
+
+
+def test_patch_profile_with_if_match(client, make_user):
+    user_id, headers = make_user()
+    url = f'/api/users/{user_id}/profile'
+
+    created = client.patch(url, json={'first_name': 'Ada'}, headers=headers)
+    assert created.status_code == 200
+    etag = created.headers['ETag']
+
+    assert client.patch(url, json={'last_name': 'Lovelace'}, headers={**headers, 'If-Match': etag}).status_code == 200
+    conflict = client.patch(url, json={'last_name': 'Byron'}, headers={**headers, 'If-Match': etag})
+    assert conflict.status_code == 409
+
+    profile = client.get(url, headers=headers).get_json()
+    assert (profile['first_name'], profile['last_name']) == ('Ada', 'Lovelace')
+
+
+def test_cors_allows_patch_with_if_match_and_exposes_etag(client, make_user, apply):
+    _, headers = make_user()
+    application_id = apply(headers)
+    url = f'/api/applications/{application_id}'
+
+    preflight = client.options(url, headers={
+        'Origin': ORIGIN,
+        'Access-Control-Request-Method': 'PATCH',
+        'Access-Control-Request-Headers': 'authorization, content-type, if-match'
+    })
+    assert 'PATCH' in preflight.headers['Access-Control-Allow-Methods']
+    assert 'if-match' in preflight.headers['Access-Control-Allow-Headers'].lower()
+
+    response = client.get(url, headers={**headers, 'Origin': ORIGIN})
+    assert response.headers['Access-Control-Allow-Origin'] == ORIGIN
+    assert 'etag' in response.headers['Access-Control-Expose-Headers'].lower()
@@ -0,0 +1,69 @@
+"""Delta sync tokens: late commits are not skipped and paging makes progress"""
+from datetime import datetime, timedelta
+
+from src.models.user import db, Application, Tombstone
+from src.utils.delta_sync import delta_page
+from src.utils.pagination import encode_cursor
+
+
+def sync(client, headers, token):
+    response = client.get(f'/api/applications?since={token}', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_row_committed_late_with_an_earlier_updated_at_is_not_skipped(app, client, make_user, apply):
+    user_id, headers = make_user()
+    apply(headers, internship_id=1)
+    token = client.get('/api/applications', headers=headers).get_json()['sync_token']
+
+    # A transaction that set updated_at before the listing above but committed after it
+    with app.app_context():
+        late = Application(
+            user_id=user_id, internship_id=2, status='submitted',
+            created_at=datetime.utcnow() - timedelta(seconds=5), updated_at=datetime.utcnow() - timedelta(seconds=5)
+        )
+        db.session.add(late)
+        db.session.commit()
+        late_id = late.id
+
+    assert late_id in [application['id'] for application in sync(client, headers, token)['applications']]
+
+
+def test_changes_past_the_overlap_window_are_not_sent_again(app, client, make_user, apply, monkeypatch):
+    monkeypatch.setitem(app.config, 'SYNC_OVERLAP_SECONDS', 0)
+    _, headers = make_user()
+    token = client.get('/api/applications', headers=headers).get_json()['sync_token']
+    application_id = apply(headers)
+
+    first = sync(client, headers, token)
+    assert [application['id'] for application in first['applications']] == [application_id]
+    assert sync(client, headers, first['sync_token'])['applications'] == []
+
+    assert client.delete(f'/api/applications/{application_id}', headers=headers).status_code == 200
+    second = sync(client, headers, first['sync_token'])
+    assert second['deleted'] == [application_id]
+    assert sync(client, headers, second['sync_token'])['deleted'] == []
+
+
+def test_paging_advances_and_the_last_page_rewinds(app, make_user, apply):
+    user_id, headers = make_user()
+    application_ids = [apply(headers, internship_id=internship_id) for internship_id in range(1, 6)]
+
+    with app.app_context():
+        query = Application.query.filter_by(user_id=user_id)
+        tombstones = Tombstone.query.filter_by(entity='application', user_id=user_id)
+        token, seen, pages = encode_cursor(datetime.min, 0, 0), [], 0
+        while True:
+            rows, _, token, has_more = delta_page(query, Application, tombstones, token, page_size=2)
+            seen += [row.id for row in rows]
+            pages += 1
+            if not has_more:
+                break
+        assert seen == application_ids
+        assert pages == 3
+
+        # Everything was changed within the overlap window, so the next sync repeats it
+        rows, _, _, has_more = delta_page(query, Application, tombstones, token, page_size=10)
+        assert [row.id for row in rows] == application_ids
+        assert not has_more
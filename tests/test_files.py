@@ -0,0 +1,107 @@
+"""Uploads: rejected uploads leave no files, shared content survives until its last reference"""
+import io
+import os
+import threading
+import uuid
+
+import pytest
+
+from src.routes import files
+from src.utils.file_storage import storage_path, stored_file_lock
+
+
+def pdf():
+    """A PDF body unique to the test, so stored files are not shared across tests"""
+    return b'%PDF-1.4\n' + uuid.uuid4().hex.encode() + b'\n%%EOF'
+
+
+def upload(client, headers, body, kind='resume', **fields):
+    data = {'file': (io.BytesIO(body), 'cv.pdf', 'application/pdf'), **fields}
+    return client.post(f'/api/files/{kind}', data=data, headers=headers, content_type='multipart/form-data')
+
+
+def stored_files(app):
+    """Paths of all stored files (temporary files and locks excluded)"""
+    folder = app.config['UPLOAD_FOLDER']
+    return {
+        os.path.join(root, name)
+        for root, dirs, names in os.walk(folder)
+        if os.path.relpath(root, folder).split(os.sep)[0] not in ('tmp', 'locks')
+        for name in names
+    }
+
+
+@pytest.mark.parametrize('application_id, status', [('abc', 400), ('999999', 404)])
+def test_rejected_upload_stores_nothing(app, client, make_user, application_id, status):
+    _, headers = make_user()
+    before = stored_files(app)
+
+    response = upload(client, headers, pdf(), application_id=application_id)
+    assert response.status_code == status
+    assert stored_files(app) == before
+    assert os.listdir(os.path.join(app.config['UPLOAD_FOLDER'], 'tmp')) == []
+
+
+def test_upload_attached_to_another_users_application_is_rejected(app, client, make_user, apply):
+    _, owner = make_user()
+    application_id = apply(owner)
+    _, other = make_user()
+    before = stored_files(app)
+
+    assert upload(client, other, pdf(), application_id=str(application_id)).status_code == 404
+    assert stored_files(app) == before
+
+
+def test_failed_insert_removes_the_stored_file(app, client, make_user, monkeypatch):
+    _, headers = make_user()
+    body = pdf()
+    before = stored_files(app)
+
+    class BrokenProfile:
+        @property
+        def query(self):
+            raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(files, 'UserProfile', BrokenProfile())
+    response = client.post(
+        '/api/files/avatar', headers=headers, content_type='multipart/form-data',
+        data={'file': (io.BytesIO(b'\x89PNG\r\n\x1a\n' + body), 'a.png', 'image/png')}
+    )
+    assert response.status_code == 500
+    assert stored_files(app) == before
+
+
+def test_shared_content_is_removed_with_its_last_reference(app, client, make_user):
+    body = pdf()
+    _, first = make_user()
+    _, second = make_user()
+    first_upload = upload(client, first, body).get_json()
+    second_upload = upload(client, second, body).get_json()
+    assert first_upload['sha256'] == second_upload['sha256']
+    path = storage_path(app.config['UPLOAD_FOLDER'], first_upload['sha256'])
+
+    assert client.delete(f"/api/files/{first_upload['id']}", headers=first).status_code == 200
+    assert os.path.exists(path)
+    assert client.delete(f"/api/files/{second_upload['id']}", headers=second).status_code == 200
+    assert not os.path.exists(path)
+
+
+def test_delete_waits_for_the_stored_file_lock(app, client, make_user):
+    _, headers = make_user()
+    stored = upload(client, headers, pdf()).get_json()
+    folder = app.config['UPLOAD_FOLDER']
+    responses = []
+
+    with stored_file_lock(folder, stored['sha256']):
+        deleter = threading.Thread(
+            target=lambda: responses.append(app.test_client().delete(f"/api/files/{stored['id']}", headers=headers))
+        )
+        deleter.start()
+        deleter.join(0.3)
+        # An upload of the same content holding the lock would commit its reference now
+        assert deleter.is_alive()
+        assert os.path.exists(storage_path(folder, stored['sha256']))
+
+    deleter.join(5)
+    assert responses[0].status_code == 200
+    assert not os.path.exists(storage_path(folder, stored['sha256']))
@@ -0,0 +1,96 @@
+"""Job queue: what stays in the request, deferred auto-apply, claiming and retries"""
+from datetime import datetime
+
+from src.models.user import db, ApplicationTracking, Job
+from src.utils.jobs import claim_jobs, enqueue, register_task, run_job, work
+
+@register_task('test_flaky')
+def flaky_task(fail):
+    if fail:
+        raise RuntimeError('boom')
+    return {'ok': True}
+
+
+def job_count(app):
+    with app.app_context():
+        return Job.query.count()
+
+
+def test_signup_and_apply_write_their_rows_without_a_worker(app, client, apply, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOBS_EAGER', False)
+    jobs_before = job_count(app)
+
+    signup = client.post('/api/auth/signup', json={'email': 'inline@example.com', 'password': 'secret123'})
+    assert signup.status_code == 201
+    body = signup.get_json()
+    headers = {'Authorization': f"Bearer {body['token']}"}
+    profile = client.get(f"/api/users/{body['user_id']}/profile", headers=headers)
+    assert profile.status_code == 200
+
+    application_id = apply(headers)
+    with app.app_context():
+        statuses = [t.status for t in ApplicationTracking.query.filter_by(application_id=application_id)]
+    assert statuses == ['submitted']
+    assert job_count(app) == jobs_before
+
+
+def test_large_auto_apply_runs_as_a_job(app, client, make_user, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOBS_EAGER', False)
+    monkeypatch.setitem(app.config, 'AUTO_APPLY_SYNC_LIMIT', 1)
+    _, headers = make_user()
+
+    response = client.post('/api/internships/auto-apply', json={'internship_ids': [2, 3]}, headers=headers)
+    assert response.status_code == 202
+    status_url = response.get_json()['status_url']
+    assert client.get(status_url, headers=headers).get_json()['status'] == 'queued'
+
+    with app.app_context():
+        work(once=True)
+
+    job = client.get(status_url, headers=headers).get_json()
+    assert job['status'] == 'done'
+    assert sorted(entry['internship_id'] for entry in job['result']['applied']) == [2, 3]
+
+
+def test_claimed_jobs_are_not_claimed_again(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOBS_EAGER', False)
+    with app.app_context():
+        job = enqueue('test_flaky', {'fail': False})
+        db.session.commit()
+        job_id = job.id
+        first = claim_jobs(limit=100)
+        assert job_id in [job.id for job in first]
+        assert job_id not in [job.id for job in claim_jobs(limit=100)]
+
+        for job in first:
+            run_job(job)
+        job = db.session.get(Job, job_id)
+        assert (job.status, job.result, job.locked_by) == ('done', {'ok': True}, None)
+        db.session.remove()
+
+
+def test_failed_jobs_are_retried_with_backoff_then_failed(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOBS_EAGER', False)
+    with app.app_context():
+        job = enqueue('test_flaky', {'fail': True}, max_attempts=2)
+        db.session.commit()
+        job_id = job.id
+
+        for attempt in (1, 2):
+            claimed = [job for job in claim_jobs(limit=100) if job.id == job_id]
+            assert len(claimed) == 1
+            assert run_job(claimed[0]) is False
+
+            job = db.session.get(Job, job_id)
+            assert job.attempts == attempt
+            assert job.last_error == 'RuntimeError: boom'
+            if attempt == 1:
+                assert job.status == 'queued'
+                assert job.run_at > datetime.utcnow()
+                # Make the retry due now instead of waiting for the backoff
+                job.run_at = datetime.utcnow()
+                db.session.commit()
+
+        assert job.status == 'failed'
+        assert job.finished_at is not None
+        db.session.remove()
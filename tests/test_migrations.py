@@ -0,0 +1,96 @@
+"""Schema migrations: databases from before the series, fresh ones and reruns all reach the models' schema"""
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+import pytest
+
+from src.models.user import db, text_hash
+from src.utils.migrations import alembic_config, migration_connection
+
+LETTER = 'Dear team, I would love to join.'
+
+
+@pytest.fixture
+def engine(app, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    with app.app_context():
+        yield engine
+    engine.dispose()
+
+
+def migrate(engine, revision, downgrade=False):
+    with migration_connection(engine) as connection:
+        config = alembic_config(connection)
+        (command.downgrade if downgrade else command.upgrade)(config, revision)
+
+
+def schema_differences(engine):
+    with engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection, opts={'compare_type': True}), db.metadata)
+
+
+def add_legacy_rows(engine):
+    """Rows as the release before the series wrote them, texts inline"""
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (id, email, name) VALUES (1, 'old@example.com', 'Old')"))
+        connection.execute(text('INSERT INTO user_profiles (id, user_id) VALUES (1, 1)'))
+        connection.execute(text("INSERT INTO internships (id, title, company) VALUES (1, 'Intern', 'Co')"))
+        connection.execute(text(
+            'INSERT INTO applications (id, user_id, internship_id, status, cover_letter, notes) VALUES '
+            "(1, 1, 1, 'submitted', :letter, 'first'), (2, 1, 1, 'submitted', :letter, NULL)"
+        ), {'letter': LETTER})
+
+
+def test_pre_series_database_is_upgraded_with_its_data(engine):
+    migrate(engine, '0001')
+    columns = {column['name'] for column in inspect(engine).get_columns('applications')}
+    assert 'cover_letter' in columns and 'cover_letter_hash' not in columns
+    add_legacy_rows(engine)
+
+    migrate(engine, 'head')
+
+    with engine.connect() as connection:
+        rows = connection.execute(text(
+            'SELECT id, version, cover_letter_hash, notes_hash FROM applications ORDER BY id'
+        )).all()
+        assert rows == [(1, 1, text_hash(LETTER), text_hash('first')), (2, 1, text_hash(LETTER), None)]
+        assert connection.execute(text('SELECT version FROM user_profiles')).scalar() == 1
+        assert connection.execute(text('SELECT COUNT(*) FROM text_blobs')).scalar() == 2
+        assert connection.execute(text('PRAGMA foreign_key_check')).all() == []
+
+    columns = {column['name']: column for column in inspect(engine).get_columns('applications')}
+    assert 'cover_letter' not in columns and 'notes' not in columns
+    assert columns['version']['nullable'] is False
+    assert schema_differences(engine) == []
+
+
+def test_fresh_database_matches_the_models(engine):
+    migrate(engine, 'head')
+    assert schema_differences(engine) == []
+
+
+def test_downgrade_restores_the_inline_texts(engine):
+    migrate(engine, '0001')
+    add_legacy_rows(engine)
+    migrate(engine, 'head')
+
+    migrate(engine, '0002', downgrade=True)
+    with engine.connect() as connection:
+        assert connection.execute(text('SELECT cover_letter, notes FROM applications ORDER BY id')).all() == [
+            (LETTER, 'first'), (LETTER, None)
+        ]
+
+    migrate(engine, 'head')
+    assert schema_differences(engine) == []
+
+
+def test_revisions_skip_what_already_exists(engine):
+    # A database stamped 0002 by the earlier head, whose tables already have every column
+    migrate(engine, 'head')
+    with migration_connection(engine) as connection:
+        command.stamp(alembic_config(connection), '0002')
+
+    migrate(engine, 'head')
+    assert schema_differences(engine) == []
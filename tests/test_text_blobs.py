@@ -0,0 +1,69 @@
+"""Cover letters and notes: stored once per content hash, strings only, pruned when unreferenced"""
+import importlib.util
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.user import db, Application, TextBlob, text_hash
+
+PRUNE_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts', 'prune_text_blobs.py')
+
+
+def load_prune():
+    spec = importlib.util.spec_from_file_location('prune_text_blobs', PRUNE_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.prune
+
+
+def test_same_cover_letter_is_stored_once(app, client, make_user, apply):
+    _, headers = make_user()
+    letter = f'Dear hiring team, {uuid.uuid4().hex}'
+    first = apply(headers, internship_id=1, cover_letter=letter)
+    second = apply(headers, internship_id=2, cover_letter=letter)
+
+    with app.app_context():
+        hashes = {application.cover_letter_hash for application in Application.query.filter(Application.id.in_([first, second]))}
+        assert hashes == {text_hash(letter)}
+        assert TextBlob.query.filter_by(hash=text_hash(letter)).count() == 1
+
+    assert client.get(f'/api/applications/{second}', headers=headers).get_json()['cover_letter'] == letter
+
+
+@pytest.mark.parametrize('field, value', [('cover_letter', 123), ('notes', ['a']), ('notes', {'a': 1})])
+def test_non_string_texts_are_rejected(client, make_user, apply, field, value):
+    _, headers = make_user()
+    response = client.post('/api/internships/apply', json={'internship_id': 3, field: value}, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == f'{field} must be a string'
+
+    application_id = apply(headers, internship_id=4)
+    url = f'/api/applications/{application_id}'
+    assert client.put(url, json={field: value}, headers=headers).status_code == 400
+    assert client.patch(url, json={field: value}, headers=headers).status_code == 400
+
+    batch = client.put('/api/applications/batch', json={'updates': [{'id': application_id, field: value}]}, headers=headers)
+    assert batch.status_code == 200
+    assert batch.get_json()['results'] == [{'id': application_id, 'success': False, 'error': f'{field} must be a string'}]
+
+
+def test_prune_keeps_referenced_and_recent_blobs(app, make_user, apply):
+    _, headers = make_user()
+    kept = f'referenced {uuid.uuid4().hex}'
+    apply(headers, internship_id=5, notes=kept)
+
+    old = datetime.utcnow() - timedelta(days=2)
+    orphan, recent = f'orphan {uuid.uuid4().hex}', f'recent {uuid.uuid4().hex}'
+    with app.app_context():
+        db.session.add(TextBlob(hash=text_hash(orphan), body=orphan, size=len(orphan), created_at=old))
+        db.session.add(TextBlob(hash=text_hash(recent), body=recent, size=len(recent)))
+        TextBlob.query.filter_by(hash=text_hash(kept)).update({'created_at': old})
+        db.session.commit()
+
+        with db.engine.connect() as connection:
+            assert load_prune()(connection, min_age_hours=24) >= 1
+
+        remaining = {blob.hash for blob in TextBlob.query.filter(TextBlob.hash.in_([text_hash(t) for t in (kept, orphan, recent)]))}
+        assert remaining == {text_hash(kept), text_hash(recent)}
@@ -0,0 +1,85 @@
+"""SQLite tracking shards: rotation, the per-process shard list and reads across shards"""
+import re
+from datetime import datetime
+
+from src.models.user import db, ApplicationTracking
+from src.utils.tracking_partitions import (
+    cached_partitions, maintain_tracking_partitions, partition_name, shards_changed, tracking_entity
+)
+
+# Hot months are the current and previous one, so March to May 2025 rotate out
+NOW = datetime(2026, 1, 15)
+OLD_MONTHS = (3, 4, 5)
+
+
+def add_old_events(app, application_id, user_id):
+    with app.app_context():
+        for month in OLD_MONTHS:
+            db.session.add(ApplicationTracking(
+                application_id=application_id, status=f'month-{month}', changed_by=user_id,
+                changed_at=datetime(2025, month, 10)
+            ))
+        db.session.commit()
+
+
+def test_rotation_moves_closed_months_into_shards(app, client, make_user, apply):
+    user_id, headers = make_user()
+    application_id = apply(headers)
+    add_old_events(app, application_id, user_id)
+
+    with app.app_context():
+        result = maintain_tracking_partitions(now=NOW)
+        assert {partition_name(datetime(2025, month, 1)) for month in OLD_MONTHS} <= set(result['rotated'])
+        assert ApplicationTracking.query.filter_by(application_id=application_id).count() == 1
+
+    # Reads span the hot table and the shards
+    response = client.get(f'/api/applications/{application_id}?tracking_limit=2', headers=headers)
+    body = response.get_json()
+    assert body['tracking_count'] == 1 + len(OLD_MONTHS)
+    assert [event['status'] for event in body['tracking']] == ['submitted', 'month-5']
+
+    statuses = [event['status'] for event in body['tracking']]
+    cursor = body['tracking_next_cursor']
+    while cursor:
+        page = client.get(f'/api/applications/{application_id}/tracking?limit=2&cursor={cursor}', headers=headers).get_json()
+        statuses += [event['status'] for event in page['tracking']]
+        cursor = page['next_cursor']
+    assert statuses == ['submitted', 'month-5', 'month-4', 'month-3']
+
+    # Deleting the application removes its events from the shards too
+    assert client.delete(f'/api/applications/{application_id}', headers=headers).status_code == 200
+    with app.app_context():
+        entity = tracking_entity()
+        assert db.session.query(entity).filter(entity.application_id == application_id).count() == 0
+
+
+def test_shard_list_is_cached_until_shards_change(app):
+    with app.app_context(), db.engine.connect() as connection:
+        first = cached_partitions(connection)
+        connection.exec_driver_sql('CREATE TABLE application_tracking_p2001_01 (id INTEGER PRIMARY KEY)')
+        connection.commit()
+        assert cached_partitions(connection) == first
+
+        shards_changed(connection)
+        assert (datetime(2001, 1, 1), 'application_tracking_p2001_01') in cached_partitions(connection)
+
+        connection.exec_driver_sql('DROP TABLE application_tracking_p2001_01')
+        connection.commit()
+        shards_changed(connection)
+        assert cached_partitions(connection) == first
+
+
+def test_event_stream_replays_rotated_events(app, client, make_user, apply, monkeypatch):
+    user_id, headers = make_user()
+    application_id = apply(headers)
+    add_old_events(app, application_id, user_id)
+    with app.app_context():
+        maintain_tracking_partitions(now=NOW)
+
+    monkeypatch.setitem(app.config, 'SSE_POLL_INTERVAL', 0.1)
+    monkeypatch.setitem(app.config, 'SSE_MAX_DURATION', 0.2)
+    token = headers['Authorization'][len('Bearer '):]
+    response = client.get(f'/api/applications/events?token={token}', headers={'Last-Event-ID': '0'})
+    statuses = re.findall(r'"status":"([^"]+)"', response.get_data(as_text=True))
+    # Events are replayed in id order; the old ones were inserted after the submission
+    assert statuses == ['submitted', 'month-3', 'month-4', 'month-5']